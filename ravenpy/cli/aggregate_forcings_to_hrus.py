@@ -67,7 +67,7 @@ def aggregate_forcings_to_hrus(
     import netCDF4 as nc4
     import numpy as np
 
-    gws = GridWeightsCommand.parse(Path(input_weight_file).read_text())
+    gws = GridWeightsCommand.read(input_weight_file)
 
     nHRU = gws.number_hrus
     # nCells = gws.number_grid_cells
@@ -85,15 +85,15 @@ def aggregate_forcings_to_hrus(
     # cell_id = ilat * nlon + ilon
     # ---> ilon = cell_id %  nlon
     # ---> ilat = cell_id // nlon
-    weights_data_lon_lat_ids = []
-    for iweights_data in weights_data:
-        cell_id = iweights_data[1]
-        ilon = cell_id % nlon
-        ilat = cell_id // nlon
-        weights_data_lon_lat_ids.append(
-            tuple([iweights_data[0], ilon, ilat, iweights_data[2]])
+    cell_id = weights_data["cell_id"]
+    weights_data_lon_lat_ids = np.column_stack(
+        (
+            weights_data["hru_id"],
+            cell_id % nlon,
+            cell_id // nlon,
+            weights_data["weight"],
         )
-    weights_data_lon_lat_ids = np.asarray(weights_data_lon_lat_ids)  # type: ignore
+    )
 
     # create new NetCDF that will contain aggregated data of listed variables
 
@@ -263,7 +263,7 @@ def aggregate_forcings_to_hrus(
     else:
         output_weight_file_path = Path(output_weight_file)
 
-    output_weight_file_path.write_text(gws_new.to_rv() + "\n")
+    gws_new.write(output_weight_file_path)
 
     click.echo(f"Created {output_nc_file_path}")
     click.echo(f"Created {output_weight_file_path}")
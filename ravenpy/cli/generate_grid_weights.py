@@ -130,6 +130,6 @@ def generate_grid_weights(
     else:
         output_file_path = Path(output)
 
-    output_file_path.write_text(gw_cmd.to_rv() + "\n")
+    gw_cmd.write(output_file_path)
 
     click.echo(f"Created {output_file_path}")
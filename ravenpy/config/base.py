@@ -1,4 +1,6 @@
+import functools
 from abc import ABC, abstractmethod
+from dataclasses import MISSING, fields
 from enum import Enum
 from typing import Sequence, Union
 
@@ -15,6 +17,34 @@ class RavenCommand(ABC):
     def __str__(self):
         return self.to_rv()
 
+    @classmethod
+    def construct(cls, **kwds):
+        """Create a command from trusted values, skipping validation.
+
+        Like `pydantic.BaseModel.construct`, values are neither validated nor converted, so they must already have
+        the types of the fields (e.g. Python floats rather than strings or NumPy scalars). Missing fields take their
+        default value. This is meant for bulk creation of commands by parsers and extractors.
+        """
+        values = {}
+        for name, default, default_factory in _field_defaults(cls):
+            if name in kwds:
+                values[name] = kwds[name]
+            elif default is not MISSING:
+                values[name] = default
+            elif default_factory is not MISSING:
+                values[name] = default_factory()
+            else:
+                raise TypeError(f"{cls.__name__} missing required field: {name}")
+
+        obj = object.__new__(cls)
+        obj.__dict__.update(values, __pydantic_initialised__=True)
+        return obj
+
+
+@functools.lru_cache(maxsize=None)
+def _field_defaults(cls):
+    return tuple((f.name, f.default, f.default_factory) for f in fields(cls))
+
 
 @dataclass
 class RavenOption(RavenCommand):
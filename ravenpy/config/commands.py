@@ -1,14 +1,16 @@
 import datetime as dt
+import io
 import itertools
 import re
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from copy import copy
 from dataclasses import asdict, field
 from itertools import chain
 from pathlib import Path
 from textwrap import dedent
-from typing import ClassVar, Dict, Optional, Sequence, Tuple, Union, no_type_check
+from typing import ClassVar, Dict, List, Optional, Sequence, Tuple, Union, no_type_check
 
+import numpy as np
 from pydantic import validator
 from pydantic.dataclasses import dataclass
 
@@ -335,16 +337,19 @@ class SubBasinsCommand(RavenCommand):
 
     subbasins: Tuple[Record, ...] = ()
 
-    def to_rv(self):
-        template = """
+    template: ClassVar[
+        str
+    ] = """
             :SubBasins
                 :Attributes   ID NAME DOWNSTREAM_ID PROFILE REACH_LENGTH  GAUGED
                 :Units      none none          none    none           km    none
             {subbasin_records}
             :EndSubBasins
         """
+
+    def to_rv(self):
         recs = [f"    {sb}" for sb in self.subbasins]
-        return dedent(template).format(subbasin_records="\n".join(recs))
+        return dedent(self.template).format(subbasin_records="\n".join(recs))
 
 
 @dataclass
@@ -379,16 +384,144 @@ class HRUsCommand(RavenCommand):
 
     hrus: Tuple[Record, ...] = ()
 
-    def to_rv(self):
-        template = """
+    template: ClassVar[
+        str
+    ] = """
             :HRUs
                 :Attributes      AREA  ELEVATION       LATITUDE      LONGITUDE BASIN_ID       LAND_USE_CLASS            VEG_CLASS      SOIL_PROFILE  AQUIFER_PROFILE TERRAIN_CLASS      SLOPE     ASPECT
                 :Units            km2          m            deg            deg     none                  none                none              none             none          none        deg       degN
             {hru_records}
             :EndHRUs
             """
+
+    def to_rv(self):
         recs = [f"    {hru}" for hru in self.hrus]
-        return dedent(template).format(hru_records="\n".join(recs))
+        return dedent(self.template).format(hru_records="\n".join(recs))
+
+
+class RecordTable:
+    """Columnar table of command records.
+
+    Tables store one NumPy array per record field instead of one record per row, and render all rows at once with
+    vectorized formatting. The output is identical to the record-based command. Records are only created when rows
+    are accessed, and are copies: modify `columns` to update the table.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, numpy structured array or dict of arrays
+      Columns named after the record fields. Missing columns are filled with the field default.
+    """
+
+    Record: ClassVar[type]
+    command: ClassVar[type]
+    padding: ClassVar[int]
+    # Fields of the records that are not rendered
+    hidden: ClassVar[Tuple[str, ...]] = ()
+
+    def __init__(self, data):
+        names = list(data.dtype.names if isinstance(data, np.ndarray) else data.keys())
+        fields = self.Record.__dataclass_fields__
+        unknown = set(names) - set(fields)
+        if unknown:
+            raise ValueError(f"Unknown {self.Record.__qualname__} fields: {unknown}")
+
+        n = len(data[names[0]]) if names else 0
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, f in fields.items():
+            col = np.asarray(data[name]) if name in names else np.full(n, f.default)
+            self.columns[name] = self._cast(col, f.type)
+
+    @staticmethod
+    def is_columnar(data) -> bool:
+        """Return whether `data` is a DataFrame or a structured array that can be converted to a table."""
+        if isinstance(data, np.ndarray):
+            return data.dtype.names is not None
+        return hasattr(data, "columns") and hasattr(data, "dtypes")
+
+    @staticmethod
+    def _cast(col: np.ndarray, typ) -> np.ndarray:
+        # Same conversions as the validation of the record fields
+        if typ in (int, float, bool):
+            return col.astype({int: np.int64, float: np.float64, bool: bool}[typ])
+        return np.array([v if v is None else str(v) for v in col], dtype=object)
+
+    @classmethod
+    def from_records(cls, records: Sequence):
+        """Create a table from a sequence of records."""
+        fields = cls.Record.__dataclass_fields__
+        data = {name: [getattr(r, name) for r in records] for name in fields}
+        if not records:
+            data = {name: np.array([], dtype=object) for name in fields}
+        return cls(data)
+
+    def to_records(self) -> Tuple:
+        """Return the rows as a tuple of records."""
+        return tuple(self)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, i: int):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        row = {k: v[i] for k, v in self.columns.items()}
+        # Columns already have the types of the fields
+        return self.Record.construct(
+            **{k: v.item() if isinstance(v, np.generic) else v for k, v in row.items()}
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _format_column(self, name: str) -> np.ndarray:
+        """Return the rendered values of a column."""
+        col = self.columns[name]
+        if col.dtype == bool:
+            col = col.astype(np.int64)
+        return col.astype(str)
+
+    def format_records(self) -> List[str]:
+        """Render the rows of the table, as `to_rv` renders each record."""
+        cols = [
+            self._format_column(name).tolist()
+            for name in self.columns
+            if name not in self.hidden
+        ]
+        fmt = " ".join([f"{{: <{self.padding}}}"] * len(cols))
+        return [fmt.format(*row) for row in zip(*cols)]
+
+    def to_rv(self):
+        recs = [f"    {rec}" for rec in self.format_records()]
+        field = re.search(r"{(\w+)}", self.command.template).group(1)
+        return dedent(self.command.template).format(**{field: "\n".join(recs)})
+
+    def __str__(self):
+        return self.to_rv()
+
+
+class HRUTable(RecordTable):
+    """Columnar table of HRUs, rendered as the :HRUs command (RVH)."""
+
+    Record = HRUsCommand.Record
+    command = HRUsCommand
+    padding = VALUE_PADDING * 2
+    hidden = ("hru_type",)
+
+
+class SubBasinTable(RecordTable):
+    """Columnar table of subbasins, rendered as the :SubBasins command (RVH)."""
+
+    Record = SubBasinsCommand.Record
+    command = SubBasinsCommand
+    padding = VALUE_PADDING
+    hidden = ("gauge_id",)
+
+    def _format_column(self, name: str) -> np.ndarray:
+        out = super()._format_column(name)
+        if name == "reach_length":
+            out = np.where(self.columns[name] == 0, "ZERO-", out)
+        return out
 
 
 @dataclass
@@ -608,6 +741,39 @@ class GaugeCommand(RavenCommand):
         d["data_cmds"] = "\n\n".join(map(str, self.data_cmds))  # type: ignore
         return dedent(template).format(**d)
 
+    @classmethod
+    def format_network(
+        cls, names, latitudes, longitudes, elevations, indices, data_cmds=(), **kwds
+    ) -> str:
+        """Render a network of gauges sharing the same data commands and corrections.
+
+        The gauge names, coordinates and station indices of the data commands are given as sequences with one
+        value per gauge, while the other fields in `kwds` are common to all gauges. The shared fields are validated
+        and rendered once into a template, which is then formatted for each gauge. The result is identical to
+        joining the rendered `GaugeCommand` of each gauge with newlines.
+        """
+        keys = ("name", "latitude", "longitude", "elevation", "index")
+        sentinels = {key: f"\x00{key}\x00" for key in keys}
+
+        gauge = cls(data_cmds=tuple(map(copy, data_cmds)), **kwds)
+        for key in keys[:4]:
+            setattr(gauge, key, sentinels[key])
+        for cmd in gauge.data_cmds:  # type: ignore
+            cmd.index = sentinels["index"]
+
+        template = gauge.to_rv().replace("{", "{{").replace("}", "}}")
+        for key, sentinel in sentinels.items():
+            template = template.replace(sentinel, f"{{{key}}}")
+
+        rows = zip(
+            map(str, names),
+            np.asarray(latitudes, dtype=float).tolist(),
+            np.asarray(longitudes, dtype=float).tolist(),
+            np.asarray(elevations, dtype=float).tolist(),
+            np.asarray(indices, dtype=int).tolist(),
+        )
+        return "\n".join(template.format(**dict(zip(keys, row))) for row in rows)
+
 
 @dataclass
 class ObservationDataCommand(DataCommand):
@@ -629,48 +795,159 @@ class ObservationDataCommand(DataCommand):
         return dedent(template).format(**d)
 
 
-@dataclass
+GRID_WEIGHTS_DTYPE = np.dtype(
+    [("hru_id", np.int64), ("cell_id", np.int64), ("weight", np.float64)]
+)
+
+
+def _as_grid_weights(data) -> np.ndarray:
+    """Return grid weights as a structured array with dtype `GRID_WEIGHTS_DTYPE`.
+
+    `data` can be a sequence of (hru_id, cell_id, weight) rows, an array of shape (n, 3) or a structured array.
+    """
+    if isinstance(data, np.ndarray):
+        if data.dtype == GRID_WEIGHTS_DTYPE:
+            return data
+        if data.dtype.names:
+            return data.astype(GRID_WEIGHTS_DTYPE)
+        out = np.empty(len(data), dtype=GRID_WEIGHTS_DTYPE)
+        if len(data):
+            for name, col in zip(GRID_WEIGHTS_DTYPE.names, np.asarray(data).T):
+                out[name] = col
+        return out
+    return np.array([tuple(row) for row in data], dtype=GRID_WEIGHTS_DTYPE)
+
+
+class _ArrayConfig:
+    arbitrary_types_allowed = True
+
+
+@dataclass(config=_ArrayConfig)
 class GridWeightsCommand(RavenCommand):
     """GridWeights command.
 
     Important note: this command can be embedded in both a `GriddedForcingCommand` or a `StationForcingCommand`.
     The default is to have a single cell that covers an entire single HRU, with a weight of 1.
+
+    The weights are stored in a NumPy structured array with fields `hru_id`, `cell_id` and `weight`. Sequences of
+    (hru_id, cell_id, weight) tuples are converted on instantiation. Use `read` and `write` to stream large tables
+    from and to files by chunks of `chunk_size` rows.
     """
 
     number_hrus: int = 1
     number_grid_cells: int = 1
-    data: Tuple[Tuple[int, int, float], ...] = ((1, 0, 1.0),)
+    data: np.ndarray = field(
+        default_factory=lambda: np.array([(1, 0, 1.0)], dtype=GRID_WEIGHTS_DTYPE)
+    )
+
+    chunk_size: ClassVar[int] = 100_000
+
+    @validator("data", pre=True)
+    def as_array(cls, v):
+        return _as_grid_weights(v)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.number_hrus == other.number_hrus
+            and self.number_grid_cells == other.number_grid_cells
+            and np.array_equal(
+                _as_grid_weights(self.data), _as_grid_weights(other.data)
+            )
+        )
 
     @classmethod
     def parse(cls, s):
-        pat = r"""
-        :GridWeights
-            :NumberHRUs (\d+)
-            :NumberGridCells (\d+)
-            (.+)
-        :EndGridWeights
+        return cls.read(io.StringIO(s))
+
+    @classmethod
+    def read(cls, f, chunk_size=None):
+        """Read a :GridWeights command from a file, parsing the weights by chunks.
+
+        Parameters
+        ----------
+        f : str, Path or file object
+          Path to the file or text stream positioned before the :GridWeights command.
+        chunk_size : int, optional
+          Number of rows parsed at once. Defaults to `GridWeightsCommand.chunk_size`.
         """
-        m = re.match(dedent(pat).strip(), s, re.DOTALL)
-        n_hrus, n_grid_cells, data = m.groups()  # type: ignore
-        data = [d.strip().split() for d in data.split("\n")]
-        data = tuple((int(h), int(c), float(w)) for h, c, w in data)
-        return cls(
-            number_hrus=int(n_hrus), number_grid_cells=int(n_grid_cells), data=data
+        if isinstance(f, (str, Path)):
+            with open(f) as fh:
+                return cls.read(fh, chunk_size)
+
+        chunk_size = chunk_size or cls.chunk_size
+        lines = filter(None, (line.split("#")[0].strip() for line in f))
+
+        header = {}
+        for line in lines:
+            key, *values = line.split()
+            if key == ":GridWeights":
+                header[key] = None
+            elif key in (":NumberHRUs", ":NumberGridCells") and header:
+                header[key] = int(values[0])
+            elif header:
+                break
+        else:
+            line = ":EndGridWeights"
+
+        if len(header) != 3:
+            raise ValueError("Could not parse :GridWeights command header.")
+
+        rows = itertools.takewhile(
+            lambda x: x != ":EndGridWeights", itertools.chain([line], lines)
         )
+        chunks = [np.empty(0, dtype=GRID_WEIGHTS_DTYPE)]
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            chunks.append(np.loadtxt(chunk, dtype=GRID_WEIGHTS_DTYPE, ndmin=1))
 
-    def to_rv(self, indent_level=0):
-        template = """
-        {indent}:GridWeights
-        {indent}    :NumberHRUs {number_hrus}
-        {indent}    :NumberGridCells {number_grid_cells}
-        {data}
-        {indent}:EndGridWeights
+        return cls.construct(
+            number_hrus=header[":NumberHRUs"],
+            number_grid_cells=header[":NumberGridCells"],
+            data=np.concatenate(chunks),
+        )
+
+    def write(self, f, indent_level=0, chunk_size=None):
+        """Write the command to a file, formatting the weights by chunks.
+
+        Parameters
+        ----------
+        f : str, Path, RedirectToFileCommand or file object
+          Path to the file, command redirecting to it, or text stream.
+        indent_level : int
+          Indentation level of the command.
+        chunk_size : int, optional
+          Number of rows formatted at once. Defaults to `GridWeightsCommand.chunk_size`.
         """
+        if isinstance(f, RedirectToFileCommand):
+            f = f.path
+        if isinstance(f, (str, Path)):
+            with open(f, "w") as fh:
+                return self.write(fh, indent_level, chunk_size)
+
+        chunk_size = chunk_size or self.chunk_size
         indent = INDENT * indent_level
-        d = asdict(self)
-        d["indent"] = indent
-        d["data"] = "\n".join(f"{indent}    {p[0]} {p[1]} {p[2]}" for p in self.data)
-        return dedent(template).strip().format(**d)
+        data = _as_grid_weights(self.data)
+
+        f.write(
+            f"{indent}:GridWeights\n"
+            f"{indent}    :NumberHRUs {self.number_hrus}\n"
+            f"{indent}    :NumberGridCells {self.number_grid_cells}\n"
+        )
+        fmt = f"{indent}    {{}} {{}} {{}}\n".format
+        for i in range(0, len(data), chunk_size):
+            chunk = data[i : i + chunk_size]
+            cols = (chunk[name].tolist() for name in GRID_WEIGHTS_DTYPE.names)
+            f.write("".join(map(fmt, *cols)))
+        f.write(f"{indent}:EndGridWeights\n")
+
+    def to_rv(self, indent_level=0):
+        buf = io.StringIO()
+        self.write(buf, indent_level=indent_level)
+        return buf.getvalue().rstrip("\n")
 
 
 @dataclass
@@ -768,24 +1045,112 @@ class HRUStateVariableTableCommand(RavenCommand):
 
     @classmethod
     def parse(cls, sol):
-        pat = re.compile(
-            r"^:HRUStateVariableTable$\s*:Attributes,(?P<atts>.+)$\s*:Units,.*$\s*(?:(?P<vars>.+)$)+\s*:EndHRUStateVariableTable",
-            re.MULTILINE,
-        )
-
-        matches = pat.findall(sol)
-        d = defaultdict(dict)
-        for m in matches:
-            atts = [a.strip() for a in m[0].strip(",").split(",")]
-            vals = [re.split(r",|\s+", line.strip(",")) for line in m[1:]]
-            for val in vals:
-                idx, *values = val
-                d[idx].update(dict(zip(atts, values)))
+        return cls.from_arrays(*cls.parse_arrays(sol))
 
+    @classmethod
+    def from_arrays(cls, index, names, values):
+        """Create the table from HRU indices, state variable names and values of shape (hru, var)."""
         hru_states = {}
-        for idx, values in d.items():
-            hru_states[idx] = cls.Record(index=idx, data=values)
-        return cls(hru_states)
+        for idx, row in zip(np.asarray(index).tolist(), np.asarray(values).tolist()):
+            hru_states[idx] = cls.Record.construct(
+                index=idx, data=dict(zip(names, row))
+            )
+        return cls.construct(hru_states=hru_states)
+
+    @staticmethod
+    def parse_arrays(sol: str) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Parse the HRU state variable tables of a solution in a single pass.
+
+        Raven splits the state variables over multiple tables when there are many of them; their columns are
+        concatenated.
+
+        Returns
+        -------
+        index : ndarray
+          HRU indices, shape (hru,).
+        names : list of str
+          State variable names.
+        values : ndarray
+          State variable values, shape (hru, var).
+        """
+        index = np.zeros(0, dtype=int)
+        names: List[str] = []
+        columns = []
+
+        table = atts = None
+        for line in sol.splitlines():
+            line = line.strip()
+            if line.startswith(":HRUStateVariableTable"):
+                table, atts = [], None
+            elif table is None:
+                continue
+            elif line.startswith(":Attributes"):
+                atts = [a.strip() for a in line.split(",")[1:]]
+                atts = [a for a in atts if a]
+            elif line.startswith(":Units"):
+                continue
+            elif line.startswith(":EndHRUStateVariableTable"):
+                if atts is None:
+                    raise ValueError(
+                        "HRUStateVariableTable is missing its :Attributes line."
+                    )
+                data = np.array(
+                    " ".join(table).replace(",", " ").split(), dtype=float
+                ).reshape(len(table), len(atts) + 1)
+                idx = data[:, 0].astype(int)
+                cols = data[:, 1:]
+
+                if not names:
+                    index = idx
+                elif not np.array_equal(idx, index):
+                    # Align rows on the HRUs of the first table.
+                    if sorted(idx.tolist()) != sorted(index.tolist()):
+                        raise ValueError(
+                            "HRUStateVariableTable tables do not list the same HRUs."
+                        )
+                    pos = {v: i for i, v in enumerate(idx.tolist())}
+                    cols = cols[[pos[v] for v in index.tolist()]]
+
+                names.extend(atts)
+                columns.append(cols)
+                table = None
+            elif line:
+                table.append(line)
+
+        values = np.hstack(columns) if columns else np.zeros((0, 0))
+        return index, names, values
+
+    @staticmethod
+    def format_arrays(
+        index: Sequence[int], names: Sequence[str], values: np.ndarray
+    ) -> str:
+        """Render an HRU state variable table directly from arrays, as `to_rv` would from records.
+
+        Parameters
+        ----------
+        index : sequence of int
+          HRU indices, shape (hru,).
+        names : sequence of str
+          State variable names.
+        values : ndarray
+          State variable values, shape (hru, var).
+        """
+        template = """
+            :HRUStateVariableTable
+                :Attributes,{names}
+                {values}
+            :EndHRUStateVariableTable
+            """
+        order = sorted(range(len(names)), key=lambda i: names[i])
+        values = np.asarray(values, dtype=float)[:, order]
+        rows = [
+            ",".join(map(str, [idx] + row))
+            for idx, row in zip(np.asarray(index).tolist(), values.tolist())
+        ]
+        return dedent(template).format(
+            names=",".join(names[i] for i in order),
+            values="\n    ".join(rows),
+        )
 
     def to_rv(self):
         template = """
@@ -831,9 +1196,12 @@ class BasinIndexCommand(RavenCommand):
         """
         m = re.search(dedent(pat).strip(), s, re.DOTALL)
         index_name = re.split(r",|\s+", m.group(1).strip())
-        rec_values = {"index": index_name[0], "name": index_name[1]}
+        rec_values = {"index": int(index_name[0]), "name": index_name[1]}
         for line in m.group(2).strip().splitlines():
-            all_values = filter(None, re.split(r",|\s+", line.strip()))
+            all_values = list(filter(None, re.split(r",|\s+", line.strip())))
+            if not all_values:
+                # Empty lines are left by `to_rv` when `qin` or `qlat` are not set
+                continue
             cmd, *values = all_values
             if cmd == ":ChannelStorage":
                 assert len(values) == 1
@@ -842,8 +1210,8 @@ class BasinIndexCommand(RavenCommand):
                 assert len(values) == 1
                 rec_values["rivulet_storage"] = float(values[0])
             else:
-                rec_values[cmd[1:].lower()] = tuple(values)
-        return cls(**rec_values)
+                rec_values[cmd[1:].lower()] = tuple(map(float, values))
+        return cls.construct(**rec_values)
 
     def to_rv(self):
         template = """
@@ -883,7 +1251,7 @@ class BasinStateVariablesCommand(RavenCommand):
         for bi_string in bi_strings:
             bi = BasinIndexCommand.parse(f":BasinIndex {bi_string}")
             basin_states[bi.index] = bi
-        return cls(basin_states)
+        return cls.construct(basin_states=basin_states)
 
     def to_rv(self):
         template = """
@@ -0,0 +1,195 @@
+"""
+Metadata of the NetCDF forcing files, cached to configure models without reopening the files.
+"""
+import http.client
+import os
+import threading
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import cf_xarray  # noqa: F401
+import xarray as xr
+
+from ravenpy.utilities.coords import infer_time_frequency
+
+# Timeout of the HTTP requests checking whether remote datasets have changed, in seconds
+HTTP_TIMEOUT = 10
+
+
+@dataclass
+class VariableMetadata:
+    """Name, dimensions, shape, size and attributes of a NetCDF variable."""
+
+    name: str
+    dims: Tuple[str, ...]
+    size: int
+    shape: Tuple[int, ...] = ()
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def units(self) -> Optional[str]:
+        return self.attrs.get("units")
+
+
+@dataclass
+class NcMetadata:
+    """Metadata of a NetCDF forcing file.
+
+    Attributes
+    ----------
+    source : str
+      Path or URL of the dataset.
+    variables : dict
+      Data variables, keyed by name.
+    latitude, longitude, elevation, station_id : xr.DataArray, optional
+      Station or grid coordinates, loaded in memory. `latitude`, `longitude` and `elevation` are identified from
+      their CF attributes, `elevation` falling back on a variable named "elevation".
+    ntime : int
+      Number of time steps.
+    start, end : datetime-like, optional
+      First and last time steps.
+    calendar : str
+      Calendar of the time coordinate.
+    freq : str, optional
+      Time frequency inferred from the time coordinate.
+    """
+
+    source: str
+    variables: Dict[str, VariableMetadata] = field(default_factory=dict)
+    latitude: Optional[xr.DataArray] = None
+    longitude: Optional[xr.DataArray] = None
+    elevation: Optional[xr.DataArray] = None
+    station_id: Optional[xr.DataArray] = None
+    ntime: int = 0
+    start: Any = None
+    end: Any = None
+    calendar: str = "standard"
+    freq: Optional[str] = None
+
+    @classmethod
+    def from_dataset(cls, ds: xr.Dataset, source: str) -> "NcMetadata":
+        """Extract the metadata from an open dataset."""
+        meta = cls(source=source)
+        meta.variables = {
+            str(name): VariableMetadata(
+                name=str(name),
+                dims=da.dims,
+                size=da.size,
+                shape=da.shape,
+                attrs=dict(da.attrs),
+            )
+            for name, da in ds.data_vars.items()
+        }
+
+        for key in ("latitude", "longitude"):
+            try:
+                setattr(meta, key, _load(ds.cf[key]))
+            except KeyError:
+                pass
+
+        try:
+            meta.elevation = _load(ds.cf["vertical"])
+        except KeyError:
+            if "elevation" in ds:
+                meta.elevation = _load(ds["elevation"])
+
+        if "station_id" in ds:
+            meta.station_id = _load(ds["station_id"])
+
+        if "time" in ds.coords:
+            time = ds.indexes["time"]
+            meta.ntime = len(time)
+            if len(time):
+                meta.start, meta.end = time[0], time[-1]
+            meta.calendar = ds.time.encoding.get("calendar", "standard")
+            meta.freq = infer_time_frequency(time)
+
+        return meta
+
+
+def _load(da: xr.DataArray) -> xr.DataArray:
+    """Return a copy of `da` in memory, without its coordinates."""
+    return xr.DataArray(da.values, dims=da.dims, name=da.name, attrs=dict(da.attrs))
+
+
+# Metadata of the datasets opened by this process, keyed by path or URL
+_NC_METADATA: Dict[str, Tuple[Any, NcMetadata]] = {}
+_NC_METADATA_LOCK = threading.Lock()
+
+
+def _is_url(fn) -> bool:
+    return isinstance(fn, str) and fn.startswith("http")
+
+
+def _version(source: str):
+    """Return a value identifying the version of a dataset.
+
+    For local files, this is their modification time and size. For URLs, this is the ETag or Last-Modified
+    header returned by a HEAD request, or None if the server provides neither. An `OSError` is raised if the file
+    does not exist or the request fails.
+    """
+    if not _is_url(source):
+        st = os.stat(source)
+        return st.st_mtime_ns, st.st_size
+
+    req = urllib.request.Request(source, method="HEAD")
+    try:
+        with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT) as r:
+            return r.headers.get("ETag") or r.headers.get("Last-Modified")
+    except (ValueError, http.client.HTTPException) as err:
+        raise urllib.error.URLError(err) from err
+
+
+def get_nc_metadata(fn: Union[str, Path], revalidate: bool = False) -> NcMetadata:
+    """Return the metadata of a NetCDF file or OPeNDAP URL.
+
+    Metadata are cached for the lifetime of the process, keyed by the real path of local files and the URL of
+    remote datasets. Cached metadata of local files are reused as long as their modification time and size are
+    unchanged. Cached metadata of remote datasets are reused without contacting the server, unless `revalidate` is
+    True, in which case they are reused as long as the ETag or Last-Modified header of the URL is unchanged, or if
+    the server cannot be reached. Remote datasets without such headers are assumed not to change; call
+    `clear_nc_metadata` to force them to be read again.
+
+    Parameters
+    ----------
+    fn : str or Path
+      Path to the NetCDF file or URL of the dataset.
+    revalidate : bool
+      Whether to check that a remote dataset has not changed since its metadata were cached, with a HEAD request.
+    """
+    is_url = _is_url(fn)
+    source = str(fn) if is_url else os.path.realpath(fn)
+
+    with _NC_METADATA_LOCK:
+        cached = _NC_METADATA.get(source)
+    if cached is not None and is_url and not revalidate:
+        return cached[1]
+
+    try:
+        version = _version(source)
+    except OSError:
+        if not is_url:
+            raise
+        if cached is not None:
+            # The server could not be reached, the cached metadata are used
+            return cached[1]
+        version = None
+
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with xr.open_dataset(source) as ds:
+        meta = NcMetadata.from_dataset(ds, source=source)
+
+    with _NC_METADATA_LOCK:
+        _NC_METADATA[source] = (version, meta)
+    return meta
+
+
+def clear_nc_metadata():
+    """Clear the cache of NetCDF metadata."""
+    with _NC_METADATA_LOCK:
+        _NC_METADATA.clear()
@@ -0,0 +1,525 @@
+"""
+Parser for Raven configuration (RV) files.
+
+RV files are parsed into a tree of nodes, one for each command line, block commands (closed by an :End<name> line)
+holding the nodes of the lines they enclose. Nodes keep their source lines, so that files are rendered back
+identically. Commands known to RavenPy are converted on access into the command classes of
+`ravenpy.config.commands`, and replacing the command of a node only re-renders this node.
+
+Commands without a command class in RavenPy, such as the :HydrologicProcesses block of RVI files, are kept as nodes
+whose `command` is None. Their arguments and enclosed lines remain available through `args`, `children` and `rows`.
+"""
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ravenpy.config import commands
+from ravenpy.config.base import (
+    Alias,
+    GlobalParameter,
+    RavenCommand,
+    RavenOption,
+    RavenOptionList,
+    RavenSwitch,
+    RavenValue,
+)
+
+_SEPARATORS = re.compile(r"[\s,]+")
+
+
+def split(line: str) -> List[str]:
+    """Return the values of a line, separated by whitespace or commas, ignoring comments."""
+    return [v for v in _SEPARATORS.split(line.split("#", 1)[0]) if v]
+
+
+def tokenize(line: str) -> Optional[Tuple[str, List[str]]]:
+    """Return the name and arguments of a command line, or None for other lines (data, comments, blank lines)."""
+    if not line.lstrip().startswith(":"):
+        return None
+    name, *args = split(line)
+    return name[1:], args
+
+
+class Node:
+    """Command of an RV file, or run of consecutive lines that are not commands if `name` is None.
+
+    Attributes
+    ----------
+    name : str, optional
+      Command name, without the leading colon.
+    args : list of str
+      Command arguments.
+    start, stop : int
+      Range of the source lines of the node, including the :End line of blocks.
+    children : list of Node, optional
+      Nodes of the lines enclosed by a block command, None for other nodes.
+    """
+
+    __slots__ = (
+        "file",
+        "name",
+        "args",
+        "start",
+        "stop",
+        "children",
+        "modified",
+        "_command",
+    )
+
+    def __init__(self, file, name, args, start, stop, children=None):
+        self.file = file
+        self.name = name
+        self.args = args
+        self.start = start
+        self.stop = stop
+        self.children: Optional[List["Node"]] = children
+        self.modified = False
+        self._command = None
+
+    def __repr__(self):
+        return f"<Node {self.name} lines {self.start}-{self.stop}>"
+
+    @property
+    def is_block(self) -> bool:
+        return self.children is not None
+
+    @property
+    def lines(self) -> List[str]:
+        """Source lines of the node."""
+        return self.file.lines[self.start : self.stop]
+
+    @property
+    def text(self) -> str:
+        out: List[str] = []
+        self.render(out)
+        return "".join(out)
+
+    def find(self, name: str) -> Optional["Node"]:
+        """Return the first node named `name` enclosed by this block, at any depth."""
+        return next(self.iter(name), None)
+
+    def iter(self, name: str = None) -> Iterator["Node"]:
+        """Iterate over the command nodes enclosed by this block, at any depth, optionally filtered by name."""
+        for child in self.children or ():
+            if child.name is not None and name in (None, child.name):
+                yield child
+            yield from child.iter(name)
+
+    def rows(self) -> Iterator[List[str]]:
+        """Iterate over the values of the lines of a block that are not commands, skipping comments and blank lines."""
+        lines = self.file.lines
+        for child in self.children or ():
+            if child.name is None:
+                for line in lines[child.start : child.stop]:
+                    values = split(line)
+                    if values:
+                        yield values
+
+    @property
+    def command(self) -> Optional[RavenCommand]:
+        """Command object, or None if the command is not known to RavenPy.
+
+        Commands are parsed on first access. Setting the command marks the node as modified: it is then rendered
+        from the command instead of its source lines.
+        """
+        if self._command is None:
+            func = PARSERS.get(self.name) or _simple_parser(self.name)
+            if func is not None:
+                self._command = func(self)
+        return self._command
+
+    @command.setter
+    def command(self, cmd: RavenCommand):
+        self._command = cmd
+        self.modified = self.file.modified = True
+
+    def render(self, out: List[str]):
+        """Append the lines of the node to `out`."""
+        if self.modified:
+            text = str(self._command)
+            out.append(text if text.endswith("\n") else text + "\n")
+        elif self.children is None:
+            out.extend(self.file.lines[self.start : self.stop])
+        else:
+            out.append(self.file.lines[self.start])
+            for child in self.children:
+                child.render(out)
+            out.append(self.file.lines[self.stop - 1])
+
+
+class RVFile:
+    """Raven configuration file parsed into command nodes.
+
+    Parsing is done in linear time, in two passes over the lines: the first one tokenizes command lines and
+    collects the names of the :End lines, the second one builds the tree of nodes. Commands are only converted to
+    command objects when accessed.
+
+    Parameters
+    ----------
+    lines : list of str
+      Lines of the file, including line endings.
+
+    Examples
+    --------
+    >>> rvh = RVFile.read("model.rvh")  # doctest: +SKIP
+    >>> hrus = rvh["HRUs"]  # HRUTable
+    >>> hrus.columns["area"] *= 2
+    >>> rvh["HRUs"] = hrus
+    >>> rvh.to_rv()  # Only the :HRUs command is rendered again
+    """
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        # Whether commands were replaced
+        self.modified = False
+
+        cmds = []
+        for i, line in enumerate(lines):
+            token = tokenize(line)
+            if token is not None:
+                cmds.append((i, token))
+        ends = {name[3:] for _, (name, _) in cmds if name.startswith("End")}
+
+        root = Node(self, None, [], 0, len(lines), children=[])
+        stack = [root]
+        opened: Counter = Counter()
+        done = 0  # Lines before `done` are assigned to nodes
+
+        for i, (name, args) in cmds:
+            if i > done:
+                stack[-1].children.append(Node(self, None, [], done, i))
+            done = i + 1
+
+            if name.startswith("End") and opened[name[3:]]:
+                while True:
+                    node = stack.pop()
+                    opened[node.name] -= 1
+                    if node.name == name[3:]:
+                        node.stop = i + 1
+                        break
+                    self._unwrap(node, stack[-1])
+                continue
+
+            node = Node(self, name, args, i, i + 1)
+            stack[-1].children.append(node)
+            if name in ends:
+                node.children = []
+                stack.append(node)
+                opened[name] += 1
+
+        if len(lines) > done:
+            stack[-1].children.append(Node(self, None, [], done, len(lines)))
+        while len(stack) > 1:
+            self._unwrap(stack.pop(), stack[-1])
+
+        self.root = root
+
+    @staticmethod
+    def _unwrap(node: Node, parent: Node):
+        """Turn a command without :End line into a simple command, moving the nodes it enclosed to its parent."""
+        parent.children.extend(node.children)  # type: ignore
+        node.children = None
+
+    @classmethod
+    def read(cls, fn: Union[str, Path]) -> "RVFile":
+        """Parse an RV file."""
+        with open(fn) as f:
+            return cls(f.readlines())
+
+    @classmethod
+    def parse(cls, s: str) -> "RVFile":
+        """Parse the content of an RV file."""
+        return cls(s.splitlines(keepends=True))
+
+    @property
+    def nodes(self) -> List[Node]:
+        """Top-level nodes."""
+        return self.root.children  # type: ignore
+
+    def iter(self, name: str = None) -> Iterator[Node]:
+        """Iterate over the command nodes, at any depth, optionally filtered by name."""
+        return self.root.iter(name)
+
+    def find(self, name: str) -> Optional[Node]:
+        """Return the first command node named `name`, at any depth."""
+        return self.root.find(name)
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def __getitem__(self, name: str) -> Optional[RavenCommand]:
+        node = self.find(name)
+        if node is None:
+            raise KeyError(name)
+        return node.command
+
+    def __setitem__(self, name: str, cmd: RavenCommand):
+        """Replace the first command named `name`, or append the command at the end of the file."""
+        node = self.find(name)
+        if node is None:
+            node = Node(self, name, [], len(self.lines), len(self.lines))
+            self.nodes.append(node)
+        node.command = cmd
+
+    def to_rv(self) -> str:
+        if not self.modified:
+            return "".join(self.lines)
+        out: List[str] = []
+        for node in self.nodes:
+            node.render(out)
+        return "".join(out)
+
+    def __str__(self):
+        return self.to_rv()
+
+
+# Functions converting nodes into command objects, keyed by command name
+PARSERS: Dict[str, Callable[[Node], RavenCommand]] = {}
+
+
+def parser(*names: str):
+    """Register a function converting nodes into command objects."""
+
+    def decorator(func):
+        for name in names:
+            PARSERS[name] = func
+        return func
+
+    return decorator
+
+
+def _simple_parser(name: str) -> Optional[Callable[[Node], RavenCommand]]:
+    """Return a parser for commands rendered as `:<name> [<args>]`, or None if `name` is not such a command."""
+    cls = getattr(commands, name or "", None)
+    if not isinstance(cls, type):
+        return None
+    if issubclass(cls, RavenSwitch):
+        return lambda node: cls(True)
+    if issubclass(cls, RavenOptionList):
+        return lambda node: cls(node.args)
+    if issubclass(cls, RavenOption):
+        return lambda node: cls(node.args[0])
+    if issubclass(cls, RavenValue):
+        return lambda node: cls(" ".join(node.args))
+    return None
+
+
+@parser("Alias")
+def _alias(node):
+    return Alias(*node.args[:2])
+
+
+@parser("GlobalParameter")
+def _global_parameter(node):
+    return GlobalParameter(*node.args[:2])
+
+
+@parser("RedirectToFile")
+def _redirect_to_file(node):
+    return commands.RedirectToFileCommand(Path(" ".join(node.args)))
+
+
+@parser("GridWeights")
+def _grid_weights(node):
+    return commands.GridWeightsCommand.read(iter(node.lines))
+
+
+@parser("HRUStateVariableTable")
+def _hru_state_variable_table(node):
+    return commands.HRUStateVariableTableCommand.parse(node.text)
+
+
+@parser("BasinStateVariables")
+def _basin_state_variables(node):
+    return commands.BasinStateVariablesCommand.parse(node.text)
+
+
+def _record_table(node, table, aliases):
+    """Return the columnar table of a block with an :Attributes line, the first column being the ID."""
+    names = node.find("Attributes").args
+    if names[:1] != ["ID"]:
+        names = ["ID"] + names
+    fields = [aliases.get(name, name.lower()) for name in names]
+    types = {k: f.type for k, f in table.Record.__dataclass_fields__.items()}
+    unknown = set(fields) - set(types)
+    if unknown:
+        raise ValueError(f"Unknown {node.name} attributes: {unknown}")
+
+    values = np.array(list(node.rows()), dtype=str).reshape(-1, len(names))
+    data = {}
+    for field, col in zip(fields, values.T):
+        typ = types[field]
+        if typ is float:
+            col = np.where(col == "ZERO-", "0", col)
+        if typ is bool:
+            data[field] = col.astype(np.float64) != 0
+        elif typ in (int, float):
+            data[field] = col.astype({int: np.int64, float: np.float64}[typ])
+        else:
+            data[field] = col
+    return table(data)
+
+
+@parser("HRUs")
+def _hrus(node):
+    return _record_table(
+        node, commands.HRUTable, {"ID": "hru_id", "BASIN_ID": "subbasin_id"}
+    )
+
+
+@parser("SubBasins")
+def _subbasins(node):
+    return _record_table(node, commands.SubBasinTable, {"ID": "subbasin_id"})
+
+
+@parser("SoilClasses")
+def _soil_classes(node):
+    cls = commands.SoilClassesCommand
+    return cls(tuple(cls.Record(row[0]) for row in node.rows()))
+
+
+@parser("VegetationClasses")
+def _vegetation_classes(node):
+    cls = commands.VegetationClassesCommand
+    return cls(tuple(cls.Record(*row[:4]) for row in node.rows()))
+
+
+@parser("LandUseClasses")
+def _land_use_classes(node):
+    cls = commands.LandUseClassesCommand
+    return cls(tuple(cls.Record(*row[:3]) for row in node.rows()))
+
+
+@parser("SoilProfiles")
+def _soil_profiles(node):
+    cls = commands.SoilProfilesCommand
+    records = []
+    for name, n, *horizons in node.rows():
+        horizons = horizons[: 2 * int(n)]
+        records.append(cls.Record(name, horizons[::2], horizons[1::2]))
+    return cls(tuple(records))
+
+
+@parser("SoilParameterList", "VegetationParameterList", "LandUseParameterList")
+def _parameter_list(node):
+    cls = getattr(commands, f"{node.name}Command")
+    records = [
+        cls.Record(row[0], [None if v == "_DEFAULT" else v for v in row[1:]])
+        for row in node.rows()
+    ]
+    return cls(node.find("Parameters").args, records)
+
+
+@parser("EvaluationPeriod")
+def _evaluation_period(node):
+    return commands.EvaluationPeriod(*node.args[:3])
+
+
+@parser("CustomOutput")
+def _custom_output(node):
+    args = node.args
+    # The HISTOGRAM statistic takes the bounds and the number of bins
+    n = 4 if args[1] == "HISTOGRAM" else 1
+    stat = " ".join(args[1 : 1 + n])
+    time_per, variable, space_agg, *filename = [args[0]] + args[1 + n :]
+    return commands.CustomOutput(
+        time_per, stat, variable, space_agg, " ".join(filename)
+    )
+
+
+# Fields of data commands set by the commands they enclose
+_DATA_FIELDS = {
+    "FileNameNC": "file_name_nc",
+    "VarNameNC": "var_name_nc",
+    "StationIdx": "index",
+    "TimeShift": "time_shift",
+    "LatitudeVarNameNC": "latitude_var_name_nc",
+    "LongitudeVarNameNC": "longitude_var_name_nc",
+    "ElevationVarNameNC": "elevation_var_name_nc",
+    "ForcingType": "data_type",
+}
+
+
+def _data_fields(node) -> dict:
+    """Return the fields of a data command set by the commands it encloses, at any depth."""
+    out: dict = {}
+    for child in node.iter():
+        if child.name in _DATA_FIELDS:
+            out[_DATA_FIELDS[child.name]] = " ".join(child.args)
+        elif child.name == "DimNamesNC":
+            out["dim_names_nc"] = tuple(child.args)
+        elif child.name == "LinearTransform":
+            out["scale"], out["offset"] = child.args[:2]
+        elif child.name == "Deaccumulate":
+            out["deaccumulate"] = True
+        elif child.name in ("GridWeights", "RedirectToFile"):
+            out["grid_weights"] = child.command
+    return out
+
+
+@parser("Data")
+def _data(node):
+    # The site is optional
+    data_type, *rest = node.args
+    site, units = " ".join(rest[:-1]), " ".join(rest[-1:])
+    return commands.DataCommand(
+        data_type=data_type, site=site, units=units, **_data_fields(node)
+    )
+
+
+@parser("ObservationData")
+def _observation_data(node):
+    data_type, subbasin_id, units = node.args[:3]
+    return commands.ObservationDataCommand(
+        data_type=data_type,
+        subbasin_id=subbasin_id,
+        units=units,
+        **_data_fields(node),
+    )
+
+
+@parser("GriddedForcing")
+def _gridded_forcing(node):
+    return commands.GriddedForcingCommand(
+        name=" ".join(node.args), **_data_fields(node)
+    )
+
+
+@parser("StationForcing")
+def _station_forcing(node):
+    name, *units = node.args
+    return commands.StationForcingCommand(
+        name=name, units=" ".join(units), **_data_fields(node)
+    )
+
+
+# Fields of gauges set by the commands they enclose
+_GAUGE_FIELDS = {
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+    "Elevation": "elevation",
+    "RainCorrection": "rain_correction",
+    "SnowCorrection": "snow_correction",
+}
+
+
+@parser("Gauge")
+def _gauge(node):
+    # Corrections are not applied when they are not set
+    kwds: dict = dict(rain_correction=None, snow_correction=None)
+    data_cmds = []
+    for child in node.children or ():
+        if child.name in _GAUGE_FIELDS:
+            kwds[_GAUGE_FIELDS[child.name]] = child.args[0]
+        elif child.name == "MonthlyAveEvaporation":
+            kwds["monthly_ave_evaporation"] = tuple(child.args)
+        elif child.name == "MonthlyAveTemperature":
+            kwds["monthly_ave_temperature"] = tuple(child.args)
+        elif child.name == "Data":
+            data_cmds.append(child.command)
+    return commands.GaugeCommand(
+        name=" ".join(node.args), data_cmds=tuple(data_cmds), **kwds
+    )
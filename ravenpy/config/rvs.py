@@ -1,11 +1,12 @@
 import collections
 import datetime as dt
 from abc import ABC, abstractmethod
-from copy import deepcopy
+from copy import copy
 from dataclasses import replace
+from itertools import chain
 from pathlib import Path
 from textwrap import dedent
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
 
 import cf_xarray
 import cftime
@@ -28,6 +29,7 @@ from ravenpy.config.commands import (
     HRUsCommand,
     HRUState,
     HRUStateVariableTableCommand,
+    HRUTable,
     LandUseClassesCommand,
     ObservationDataCommand,
     RedirectToFileCommand,
@@ -39,8 +41,11 @@ from ravenpy.config.commands import (
     Sub,
     SubBasinGroupCommand,
     SubBasinsCommand,
+    SubBasinTable,
     VegetationClassesCommand,
 )
+from ravenpy.config.metadata import get_nc_metadata
+from ravenpy.config.parser import RVFile
 
 
 class RV(ABC):
@@ -61,13 +66,38 @@ class RV(ABC):
 
         # This variable contains the RV file content when it was set from a file; if still
         # None at the moment Raven is called, it means the corresponding RV must be rendered
-        # with the `to_rv` method.
+        # with the `to_rv` method. Its commands can be edited through `rv_file`.
         self.content = None
 
         # This contains extra attributes that might be used with a customized template
         # (currently used with HBVEC and MOHYSE emulators, for values in their RVH)
         self._extra_attributes = {}
 
+    @property
+    def content(self) -> Optional[str]:
+        """Content of the RV file when it was set from a file, including the changes made to `rv_file`."""
+        if self._rv_file is not None:
+            return self._rv_file.to_rv()
+        return self._content
+
+    @content.setter
+    def content(self, value: Optional[str]):
+        self._content = value
+        self._rv_file = None
+
+    @property
+    def rv_file(self) -> Optional[RVFile]:
+        """Commands of the RV file when it was set from a file, parsed from `content`."""
+        if self._rv_file is None and self._content is not None:
+            self._rv_file = RVFile.parse(self._content)
+            self._content = None
+        return self._rv_file
+
+    @rv_file.setter
+    def rv_file(self, value: Optional[RVFile]):
+        self._content = None
+        self._rv_file = value
+
     def update(self, key, value):
         if hasattr(self, key):
             setattr(self, key, value)
@@ -141,18 +171,57 @@ class RVC(RV):
 
     def __init__(self, config):
         super().__init__(config)
-        self.hru_states: Dict[int, HRUState] = {}
+        self._hru_states: Dict[int, HRUState] = {}
+        # HRU states parsed from a solution, as (index, names, values) arrays. Records are only
+        # created if `hru_states` is accessed.
+        self._hru_table: Optional[Tuple[np.ndarray, List[str], np.ndarray]] = None
         self.basin_states: Dict[int, BasinIndexCommand] = {}
 
     def reset(self, **kwargs):
         self.hru_states = {}
         self.basin_states = {}
 
-    def set_hru_state(self, hru_state: HRUState):
-        self.hru_states[hru_state.index] = hru_state
+    @property
+    def hru_states(self) -> Dict[int, HRUState]:
+        if self._hru_table is not None:
+            self._hru_states = HRUStateVariableTableCommand.from_arrays(
+                *self._hru_table
+            ).hru_states
+            self._hru_table = None
+        return self._hru_states
+
+    @hru_states.setter
+    def hru_states(self, value: Dict[int, HRUState]):
+        self._hru_states = value
+        self._hru_table = None
+
+    @property
+    def hru_state_arrays(self) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """HRU states as (index, names, values) arrays, with values of shape (hru, var)."""
+        if self._hru_table is not None:
+            return self._hru_table
+
+        states = list(self._hru_states.values())
+        names = sorted(set(chain(*[s.data.keys() for s in states])))
+        index = np.array([s.index for s in states], dtype=int)
+        values = np.array(
+            [[s.data.get(n, 0.0) for n in names] for s in states], dtype=float
+        ).reshape(len(states), len(names))
+        return index, names, values
+
+    def set_hru_state(self, hru_state: Union[HRUState, "EnsembleState"]):
+        """Set the state of an HRU, or of all HRUs from a single-member `EnsembleState`."""
+        if isinstance(hru_state, EnsembleState):
+            self._hru_table = hru_state.hru_state_arrays()
+        else:
+            self.hru_states[hru_state.index] = hru_state
 
-    def set_basin_state(self, basin_state: BasinIndexCommand):
-        self.basin_states[basin_state.index] = basin_state
+    def set_basin_state(self, basin_state: Union[BasinIndexCommand, "EnsembleState"]):
+        """Set the state of a basin, or of all basins from a single-member `EnsembleState`."""
+        if isinstance(basin_state, EnsembleState):
+            self.basin_states = basin_state.basin_state_commands()
+        else:
+            self.basin_states[basin_state.index] = basin_state
 
     @classmethod
     def create_solution(cls, solution_str):
@@ -161,13 +230,23 @@ class RVC(RV):
         return rvc
 
     def parse_solution(self, solution_str):
-        self.hru_states = HRUStateVariableTableCommand.parse(solution_str).hru_states
+        self._hru_table = HRUStateVariableTableCommand.parse_arrays(solution_str)
         self.basin_states = BasinStateVariablesCommand.parse(solution_str).basin_states
 
     def to_rv(self):
+        if self._hru_table is not None:
+            hru_states = HRUStateVariableTableCommand.format_arrays(*self._hru_table)
+        else:
+            hru_states = HRUStateVariableTableCommand.construct(
+                hru_states=self._hru_states
+            )
+
         d = {
-            "hru_states": HRUStateVariableTableCommand(self.hru_states),
-            "basin_states": BasinStateVariablesCommand(self.basin_states),
+            "hru_states": hru_states,
+            # States are already commands, there is no need to validate them again
+            "basin_states": BasinStateVariablesCommand.construct(
+                basin_states=self.basin_states
+            ),
         }
 
         d.update(self._extra_attributes)
@@ -175,6 +254,211 @@ class RVC(RV):
         return super().to_rv(dedent(self.tmpl.lstrip("\n")).format(**d), "RVC")
 
 
+class EnsembleState:
+    """Model states of an ensemble of simulations, stored in NumPy arrays.
+
+    Parameters
+    ----------
+    hru_index : array_like
+      HRU indices, shape (hru,).
+    hru_names : sequence of str
+      HRU state variable names, shape (var,).
+    hru_values : array_like
+      HRU state variable values, shape (member, hru, var).
+    basin_index : array_like
+      Basin indices, shape (basin,).
+    basin_names : sequence of str
+      Basin names, shape (basin,).
+    basin_fields : sequence of str
+      Basin state fields, shape (field,). Storages are named `channel_storage` and `rivulet_storage`, and the
+      flows of the `qout`, `qin` and `qlat` sequences, following their leading count, `qout[0]`, `qout[1]`, etc.
+    basin_values : array_like
+      Basin state values, shape (member, basin, field). Missing elements are NaN.
+    basin_counts : array_like
+      Leading integer counts of the `qout`, `qin` and `qlat` sequences (e.g. the number of segments of `qout`),
+      shape (member, basin, 3). A sequence that is not set has a count of -1.
+
+    Notes
+    -----
+    An ensemble state can be passed directly as the `hru_state` and `basin_state` parallel parameters of a model,
+    each member setting the state of all HRUs and basins of one simulation::
+
+        state = EnsembleState.from_solutions(model.solution)
+        state.hru_values[:, :, state.hru_names.index("SOIL[0]")] *= 1.1
+        model(ts, parallel=dict(hru_state=state, basin_state=state))
+    """
+
+    # Basin state sequences, starting with an integer count that is kept in `basin_counts`
+    sequences = ("qout", "qin", "qlat")
+
+    def __init__(
+        self,
+        hru_index,
+        hru_names,
+        hru_values,
+        basin_index,
+        basin_names,
+        basin_fields,
+        basin_values,
+        basin_counts,
+    ):
+        self.hru_index = np.asarray(hru_index, dtype=int)
+        self.hru_names = list(hru_names)
+        self.hru_values = np.asarray(hru_values, dtype=float)
+        self.basin_index = np.asarray(basin_index, dtype=int)
+        self.basin_names = list(basin_names)
+        self.basin_fields = list(basin_fields)
+        self.basin_values = np.asarray(basin_values, dtype=float)
+        self.basin_counts = np.asarray(basin_counts, dtype=int)
+
+        if self.hru_values.shape[1:] != (len(self.hru_index), len(self.hru_names)):
+            raise ValueError("`hru_values` should have shape (member, hru, var).")
+        if self.basin_values.shape[1:] != (
+            len(self.basin_index),
+            len(self.basin_fields),
+        ):
+            raise ValueError("`basin_values` should have shape (member, basin, field).")
+        if self.basin_counts.shape[1:] != (
+            len(self.basin_index),
+            len(self.sequences),
+        ):
+            raise ValueError("`basin_counts` should have shape (member, basin, 3).")
+        if not len(self.hru_values) == len(self.basin_values) == len(self.basin_counts):
+            raise ValueError("HRU and basin states should have the same members.")
+
+    def __len__(self):
+        return len(self.hru_values)
+
+    def __getitem__(self, member):
+        """Return an ensemble state with the selected member(s)."""
+        if isinstance(member, (int, np.integer)):
+            member = slice(member, member + 1 or None)
+        return EnsembleState(
+            self.hru_index,
+            self.hru_names,
+            self.hru_values[member],
+            self.basin_index,
+            self.basin_names,
+            self.basin_fields,
+            self.basin_values[member],
+            self.basin_counts[member],
+        )
+
+    @classmethod
+    def from_solutions(cls, solutions: Sequence[Union[str, RVC]]) -> "EnsembleState":
+        """Create an ensemble state from the solution of each member.
+
+        Parameters
+        ----------
+        solutions : sequence of str or RVC
+          Content of the solution (.rvc) files, or RVC objects, one per member. A single RVC is also accepted.
+        """
+        if isinstance(solutions, (str, RVC)):
+            solutions = [solutions]
+        rvcs = [
+            RVC.create_solution(sol) if isinstance(sol, str) else sol
+            for sol in solutions
+        ]
+
+        tables = [rvc.hru_state_arrays for rvc in rvcs]
+        hru_index, hru_names, _ = tables[0]
+        for index, names, _ in tables[1:]:
+            if names != hru_names or not np.array_equal(index, hru_index):
+                raise ValueError("All members should have the same HRU states.")
+
+        basins = [list(rvc.basin_states.values()) for rvc in rvcs]
+        records = [[cls._basin_record(b) for b in members] for members in basins]
+        basin_fields = ["channel_storage", "rivulet_storage"]
+        for key in cls.sequences:
+            n = max(
+                (
+                    sum(f.startswith(f"{key}[") for f in record)
+                    for members in records
+                    for record in members
+                ),
+                default=0,
+            )
+            basin_fields += [f"{key}[{i}]" for i in range(n)]
+
+        basin_values = np.full((len(rvcs), len(basins[0]), len(basin_fields)), np.nan)
+        for m, members in enumerate(records):
+            for b, record in enumerate(members):
+                for f, field in enumerate(basin_fields):
+                    basin_values[m, b, f] = record.get(field, np.nan)
+
+        return cls(
+            hru_index=hru_index,
+            hru_names=hru_names,
+            hru_values=np.stack([values for _, _, values in tables]),
+            basin_index=[b.index for b in basins[0]],
+            basin_names=[b.name for b in basins[0]],
+            basin_fields=basin_fields,
+            basin_values=basin_values,
+            basin_counts=[
+                [cls._basin_counts(b) for b in members] for members in basins
+            ],
+        )
+
+    @classmethod
+    def _basin_record(cls, basin: BasinIndexCommand) -> Dict[str, float]:
+        record = {
+            "channel_storage": basin.channel_storage,
+            "rivulet_storage": basin.rivulet_storage,
+        }
+        for key in cls.sequences:
+            for i, v in enumerate((getattr(basin, key) or ())[1:]):
+                record[f"{key}[{i}]"] = v
+        return record
+
+    @classmethod
+    def _basin_counts(cls, basin: BasinIndexCommand) -> List[int]:
+        counts = []
+        for key in cls.sequences:
+            q = getattr(basin, key)
+            counts.append(int(q[0]) if q else -1)
+        return counts
+
+    def hru_state_arrays(self, member: int = 0):
+        """Return the HRU states of a member as (index, names, values) arrays, see `RVC.hru_state_arrays`."""
+        return self.hru_index, self.hru_names, self.hru_values[member]
+
+    def basin_state_commands(self, member: int = 0) -> Dict[int, BasinIndexCommand]:
+        """Return the basin states of a member as commands, keyed by basin index."""
+        out = {}
+        for b, (index, name) in enumerate(zip(self.basin_index, self.basin_names)):
+            values = dict(zip(self.basin_fields, self.basin_values[member, b].tolist()))
+            counts = self.basin_counts[member, b].tolist()
+            kwds = {}
+            for key, count in zip(self.sequences, counts):
+                if count < 0:
+                    continue
+                q = [
+                    v
+                    for f, v in values.items()
+                    if f.startswith(f"{key}[") and not np.isnan(v)
+                ]
+                kwds[key] = (count, *q)
+            out[int(index)] = BasinIndexCommand.construct(
+                index=int(index),
+                name=name,
+                channel_storage=values["channel_storage"],
+                rivulet_storage=values["rivulet_storage"],
+                **kwds,
+            )
+        return out
+
+    def to_rvc(self, member: int = 0) -> RVC:
+        """Return the state of a member as an RVC object."""
+        rvc = RVC(None)
+        rvc.set_hru_state(self[member])
+        rvc.set_basin_state(self[member])
+        return rvc
+
+    def to_rv(self, member: int = 0) -> str:
+        """Return the state of a member as the content of an RVC file."""
+        return self.to_rvc(member).to_rv()
+
+
 #########
 # R V H #
 #########
@@ -199,8 +483,8 @@ class RVH(RV):
 
     def __init__(self, config):
         super().__init__(config)
-        self.hrus: Tuple[HRU, ...] = ()
-        self.subbasins: Tuple[Sub, ...] = ()
+        self._hrus: Union[Tuple[HRU, ...], HRUTable] = ()
+        self._subbasins: Union[Tuple[Sub, ...], SubBasinTable] = ()
         self.land_subbasin_ids: Tuple[int, ...] = ()
         self.land_subbasin_property_multiplier: Optional[
             SBGroupPropertyMultiplierCommand
@@ -211,10 +495,38 @@ class RVH(RV):
         ] = None
         self.reservoirs: Tuple[ReservoirCommand, ...] = ()
 
+    @property
+    def hrus(self) -> Union[Tuple[HRU, ...], HRUTable]:
+        """HRU records, or an `HRUTable` for large configurations.
+
+        A pandas DataFrame or a NumPy structured array with columns named after the `HRUsCommand.Record` fields is
+        converted to an `HRUTable`, rendered with vectorized formatting.
+        """
+        return self._hrus
+
+    @hrus.setter
+    def hrus(self, value):
+        self._hrus = HRUTable(value) if HRUTable.is_columnar(value) else value
+
+    @property
+    def subbasins(self) -> Union[Tuple[Sub, ...], SubBasinTable]:
+        """Subbasin records, or a `SubBasinTable` for large configurations (see `hrus`)."""
+        return self._subbasins
+
+    @subbasins.setter
+    def subbasins(self, value):
+        self._subbasins = (
+            SubBasinTable(value) if SubBasinTable.is_columnar(value) else value
+        )
+
     def to_rv(self):
         d = {
-            "subbasins": SubBasinsCommand(self.subbasins),
-            "hrus": HRUsCommand(self.hrus),
+            "subbasins": self.subbasins
+            if isinstance(self.subbasins, SubBasinTable)
+            else SubBasinsCommand(self.subbasins),
+            "hrus": self.hrus
+            if isinstance(self.hrus, HRUTable)
+            else HRUsCommand(self.hrus),
             "land_subbasin_group": SubBasinGroupCommand("Land", self.land_subbasin_ids),
             "land_subbasin_property_multiplier": self.land_subbasin_property_multiplier
             or "",
@@ -257,7 +569,7 @@ class RVI(RV):
     :WriteNetcdfFormat     yes
     :SilentMode
     :PavicsMode
-    {suppress_output}{write_forcing_functions}{custom_output}
+    {suppress_output}{write_watershed_storage}{write_forcing_functions}{custom_output}
 
     :NetCDFAttribute title Simulated river discharge
     :NetCDFAttribute history Created on {now} by Raven
@@ -301,13 +613,24 @@ class RVI(RV):
         ]
         self._evaluation_periods = []
         self._suppress_output = False
+        self._write_watershed_storage = True
         self._write_forcing_functions = False
         self._custom_output = []
 
     def configure_from_nc_data(self, fns):
-        with xr.open_mfdataset(fns, combine="by_coords") as ds:
-            start, end = ds.indexes["time"][0], ds.indexes["time"][-1]
-            cal = ds.time.encoding.get("calendar", "standard")
+        # Files without time coordinate (e.g. static fields) do not constrain the simulation period
+        metas = [m for m in map(get_nc_metadata, fns) if m.start is not None]
+        if not metas:
+            return
+
+        calendars = {m.calendar.upper() for m in metas}
+        if len(calendars) > 1:
+            raise ValueError(
+                f"Forcing files use different calendars: {', '.join(sorted(calendars))}"
+            )
+        cal = calendars.pop()
+        start = min(meta.start for meta in metas)
+        end = max(meta.end for meta in metas)
 
         if self.start_date in [None, dt.datetime(1, 1, 1)]:
             self.start_date = start
@@ -315,7 +638,7 @@ class RVI(RV):
         if self.end_date in [None, dt.datetime(1, 1, 1)]:
             self.end_date = end
 
-        self.calendar = options.Calendar(cal.upper())
+        self.calendar = options.Calendar(cal)
 
     @property
     def raven_version(self):
@@ -425,6 +748,18 @@ class RVI(RV):
             raise ValueError
         self._suppress_output = value
 
+    @property
+    def write_watershed_storage(self):
+        # Already included in the :SuppressOutput tag
+        skip = not self._write_watershed_storage and not self._suppress_output
+        return ":DontWriteWatershedStorage\n" if skip else ""
+
+    @write_watershed_storage.setter
+    def write_watershed_storage(self, value):
+        if not isinstance(value, bool):
+            raise ValueError
+        self._write_watershed_storage = value
+
     @property
     def write_forcing_functions(self):
         tag = ":WriteForcingFunctions\n"
@@ -686,7 +1021,7 @@ class RVT(RV):
         self._auto_nc_configure = False
 
     def configure_from_nc_data(self, fns):
-        from ravenpy.utilities.coords import infer_scale_and_offset
+        from ravenpy.utilities.coords import scale_and_offset
 
         assert self._auto_nc_configure is True
 
@@ -695,57 +1030,55 @@ class RVT(RV):
         for fn in fns:
             if isinstance(fn, str) and not fn.startswith("http"):
                 fn = Path(fn)
-            with xr.open_dataset(fn) as ds:
-                try:
-                    self._nc_latitude = ds.cf["latitude"]
-                    self._nc_longitude = ds.cf["longitude"]
+            meta = get_nc_metadata(fn)
+
+            latitude_var_name_nc = ""
+            longitude_var_name_nc = ""
+            if meta.latitude is not None:
+                self._nc_latitude = meta.latitude
+                if meta.longitude is not None:
+                    self._nc_longitude = meta.longitude
                     latitude_var_name_nc = self._nc_latitude.name
                     longitude_var_name_nc = self._nc_longitude.name
-                except KeyError:
-                    # Will try to compute values later from first HRU (in self.to_rv)
-                    latitude_var_name_nc = ""
-                    longitude_var_name_nc = ""
-
-                try:
-                    self._nc_elevation = ds.cf["vertical"]
-                    elevation_var_name_nc = self._nc_elevation.name
-                except KeyError:
-                    if "elevation" in ds:
-                        self._nc_elevation = ds["elevation"]
-                        elevation_var_name_nc = "elevation"
-                    else:
-                        elevation_var_name_nc = ""
-
-                if "station_id" in ds:
-                    self._station_id = ds["station_id"]
-
-                # Check if any alternate variable name is in the file.
-                for std_name in RVT.NC_VARS:
-                    for var_name in [std_name] + RVT.NC_VARS[std_name]["alts"]:  # type: ignore
-                        if var_name not in ds.data_vars:
-                            continue
-                        nc_var = ds[var_name]
-                        data_type = RVT.NC_VARS[std_name]["raven"]
-                        specs = dict(
-                            name=std_name,
-                            file_name_nc=fn,
-                            data_type=data_type,
-                            var_name_nc=var_name,
-                            latitude_var_name_nc=latitude_var_name_nc,
-                            longitude_var_name_nc=longitude_var_name_nc,
-                            elevation_var_name_nc=elevation_var_name_nc,
-                            dim_names_nc=nc_var.dims,
-                            units=nc_var.attrs.get("units"),
+            # Otherwise, will try to compute values later from first HRU (in self.to_rv)
+
+            elevation_var_name_nc = ""
+            if meta.elevation is not None:
+                self._nc_elevation = meta.elevation
+                elevation_var_name_nc = self._nc_elevation.name
+
+            if meta.station_id is not None:
+                self._station_id = meta.station_id
+
+            # Check if any alternate variable name is in the file.
+            for std_name in RVT.NC_VARS:
+                for var_name in [std_name] + RVT.NC_VARS[std_name]["alts"]:  # type: ignore
+                    if var_name not in meta.variables:
+                        continue
+                    nc_var = meta.variables[var_name]
+                    data_type = RVT.NC_VARS[std_name]["raven"]
+                    specs = dict(
+                        name=std_name,
+                        file_name_nc=fn,
+                        data_type=data_type,
+                        var_name_nc=var_name,
+                        latitude_var_name_nc=latitude_var_name_nc,
+                        longitude_var_name_nc=longitude_var_name_nc,
+                        elevation_var_name_nc=elevation_var_name_nc,
+                        dim_names_nc=nc_var.dims,
+                        units=nc_var.units,
+                    )
+                    # Infer scale and offset parameters for unit conversion.
+                    if specs["units"] is not None:
+                        specs["scale"], specs["offset"] = scale_and_offset(
+                            nc_var.units, data_type, meta.freq
                         )
-                        # Infer scale and offset parameters for unit conversion.
-                        if specs["units"] is not None:
-                            specs["scale"], specs["offset"] = infer_scale_and_offset(
-                                nc_var, data_type
-                            )
 
-                        self._add_nc_variable(**specs)
-                        self._number_grid_cells = int(nc_var.size / len(ds["time"]))
-                        break
+                    self._add_nc_variable(**specs)
+                    # Values per time step, the variable may have no time dimension
+                    ntime = dict(zip(nc_var.dims, nc_var.shape)).get("time") or 1
+                    self._number_grid_cells = nc_var.size // ntime
+                    break
 
     def update(self, key, value):
         if key in self._var_specs:
@@ -756,6 +1089,24 @@ class RVT(RV):
             key = "meteo_idx"
         return super().update(key, value)
 
+    @staticmethod
+    def _gauge_values(da, idx, default):
+        """Return the values of station variable `da` at indices `idx`.
+
+        Indices beyond the length of `da`, or all of them if `da` is missing or scalar, take the value returned by
+        `default`, either a scalar or a sequence with one value per index.
+        """
+        n = len(da) if da is not None and da.shape else 0
+        inside = idx < n
+        if inside.all():
+            return da.values[idx]
+
+        out = np.empty(len(idx), dtype=object)
+        out[:] = default()
+        if inside.any():
+            out[inside] = da.values[idx[inside]]
+        return out
+
     def to_rv(self):
         """
         IMPORTANT NOTE: as this method is called at the last moment in the model lifecycle,
@@ -771,65 +1122,37 @@ class RVT(RV):
 
         use_gauge = any(type(cmd) is DataCommand for cmd in self._var_cmds.values())
         if use_gauge:
-            gauges = []
-            for idx in np.atleast_1d(self.meteo_idx):
-                data_cmds = []
-                for var, cmd in self._var_cmds.items():
-                    if cmd and not isinstance(cmd, ObservationDataCommand):
-                        cmd = deepcopy(cast(DataCommand, cmd))
-                        cmd.index = idx + 1  # Python index to Raven index
-                        data_cmds.append(cmd)
-
-                if (
-                    self._nc_latitude is not None
-                    and self._nc_latitude.shape
-                    and len(self._nc_latitude) > idx
-                ):
-                    lat = self._nc_latitude.values[idx]
-                else:
-                    lat = self._config.rvh.hrus[0].latitude
-
-                if (
-                    self._nc_longitude is not None
-                    and self._nc_longitude.shape
-                    and len(self._nc_longitude) > idx
-                ):
-                    lon = self._nc_longitude.values[idx]
-                else:
-                    lon = self._config.rvh.hrus[0].longitude
-
-                if (
-                    self._nc_elevation is not None
-                    and self._nc_elevation.shape
-                    and len(self._nc_elevation) > idx
-                ):
-                    elev = self._nc_elevation.values[idx]
-                else:
-                    elev = self._config.rvh.hrus[0].elevation
-
-                if (
-                    self._station_id is not None
-                    and self._station_id.shape
-                    and len(self._station_id) > idx
-                ):
-                    name = str(self._station_id.values[idx])
-                else:
-                    name = f"default_{idx + 1}"
-
-                gauges.append(
-                    GaugeCommand(
-                        name=name,
-                        latitude=lat,
-                        longitude=lon,
-                        elevation=elev,
-                        rain_correction=self.rain_correction,
-                        snow_correction=self.snow_correction,
-                        monthly_ave_evaporation=self.monthly_ave_evaporation,
-                        monthly_ave_temperature=self.monthly_ave_temperature,
-                        data_cmds=tuple(data_cmds),
-                    ),
-                )  # type: ignore
-            d["gauge"] = "\n".join([str(g) for g in gauges])
+            idx = np.atleast_1d(self.meteo_idx).astype(int)
+
+            def hru():
+                # Only needed when the forcing files lack station coordinates
+                return self._config.rvh.hrus[0]
+
+            data_cmds = [
+                cmd
+                for cmd in self._var_cmds.values()
+                if cmd and not isinstance(cmd, ObservationDataCommand)
+            ]
+            d["gauge"] = GaugeCommand.format_network(
+                names=self._gauge_values(
+                    self._station_id, idx, lambda: [f"default_{i + 1}" for i in idx]
+                ),
+                latitudes=self._gauge_values(
+                    self._nc_latitude, idx, lambda: hru().latitude
+                ),
+                longitudes=self._gauge_values(
+                    self._nc_longitude, idx, lambda: hru().longitude
+                ),
+                elevations=self._gauge_values(
+                    self._nc_elevation, idx, lambda: hru().elevation
+                ),
+                indices=idx + 1,  # Python index to Raven index
+                data_cmds=data_cmds,
+                rain_correction=self.rain_correction,
+                snow_correction=self.snow_correction,
+                monthly_ave_evaporation=self.monthly_ave_evaporation,
+                monthly_ave_temperature=self.monthly_ave_temperature,
+            )
         else:
             # Construct default grid weights applying equally to all HRUs
             data = [(hru.hru_id, self.meteo_idx, 1.0) for hru in self._config.rvh.hrus]
@@ -867,10 +1190,10 @@ class RVT(RV):
                     )
 
                 for idx, sb_id in zip(self.hydro_idx, self.gauged_sb_ids):
-                    cmd = deepcopy(cast(ObservationDataCommand, cmd))
-                    cmd.index = idx + 1  # Python index to Raven index
-                    cmd.subbasin_id = sb_id
-                    observed_data.append(cmd)
+                    obs = copy(cast(ObservationDataCommand, cmd))
+                    obs.index = idx + 1  # Python index to Raven index
+                    obs.subbasin_id = sb_id
+                    observed_data.append(obs)
 
                 d["observed_data"] = "\n".join(map(str, observed_data))  # type: ignore
 
@@ -906,6 +1229,7 @@ class OST(RV):
 
         self._max_iterations = None
         self._random_seed = None
+        self._warm_start = False
         self.lowerBounds = None
         self.upperBounds = None
         self.algorithm = None
@@ -947,6 +1271,17 @@ class OST(RV):
         else:
             self._random_seed = None
 
+    @property
+    def warm_start(self):
+        """Whether Ostrich restarts from the evaluations listed in the OstModel files of its working directory."""
+        if self._warm_start:
+            return "OstrichWarmStart   yes"
+        return ""
+
+    @warm_start.setter
+    def warm_start(self, value):
+        self._warm_start = bool(value)
+
     @property
     def evaluation_metric_multiplier(self):
         """For Ostrich."""
@@ -1021,7 +1356,10 @@ class Config:
         else:
             rvx = fn.suffixes[0][1:]  # get first suffix: eg.g. .rvt[.tpl]
             rvo = getattr(self, rvx, None) or self.ost
-            rvo.content = fn.read_text()
+            if rvo is self.ost:
+                rvo.content = fn.read_text()
+            else:
+                rvo.rv_file = RVFile.read(fn)
             rvo.is_ostrich_tmpl = fn.suffixes[-1] == ".tpl"
             # This is a sorry hack: I want to have rvi.run_name have a default of "run"
             # because I don't want to burden the user with setting it.. but the problem
@@ -18,6 +18,7 @@ import netCDF4 as nc4
 import numpy as np
 
 from ravenpy.config.commands import (
+    GRID_WEIGHTS_DTYPE,
     ChannelProfileCommand,
     GridWeightsCommand,
     HRUsCommand,
@@ -161,14 +162,15 @@ class RoutingProductShapefileExtractor:
         gauged = row[has_gauge_field] > 0 or (
             is_lake and RoutingProductShapefileExtractor.USE_LAKE_AS_GAUGE
         )
-        gauge_id = row["Obs_NM"] if gauged else ""
-        rec = SubBasinsCommand.Record(
+        gauge_id = str(row["Obs_NM"]) if gauged else ""
+        # Values are converted here, so that records can be created without validation
+        rec = SubBasinsCommand.Record.construct(
             subbasin_id=subbasin_id,
             name=f"sub_{subbasin_id}",
             downstream_id=downstream_id,
             profile=f"chn_{subbasin_id}",
-            reach_length=river_length_in_kms,
-            gauged=gauged,
+            reach_length=float(river_length_in_kms),
+            gauged=bool(gauged),
             gauge_id=gauge_id,
         )
 
@@ -177,14 +179,14 @@ class RoutingProductShapefileExtractor:
     def _extract_reservoir(self, row) -> ReservoirCommand:
         lake_id = int(row["HyLakeId"])
 
-        return ReservoirCommand(
+        return ReservoirCommand.construct(
             subbasin_id=int(row["SubId"]),
             hru_id=int(row["HRU_ID"]),
             name=f"Lake_{lake_id}",
-            weir_coefficient=RoutingProductShapefileExtractor.WEIR_COEFFICIENT,
-            crest_width=row["BkfWidth"],
-            max_depth=row["LakeDepth"],
-            lake_area=row["HRU_Area"],
+            weir_coefficient=float(RoutingProductShapefileExtractor.WEIR_COEFFICIENT),
+            crest_width=float(row["BkfWidth"]),
+            max_depth=float(row["LakeDepth"]),
+            lake_area=float(row["HRU_Area"]),
         )
 
     def _extract_channel_profile(self, row) -> ChannelProfileCommand:
@@ -267,32 +269,33 @@ class RoutingProductShapefileExtractor:
         else:
             assert False
 
+        # Values are converted here, so that records can be created without validation
         attrs = dict(
             hru_id=int(row["HRU_ID"]),
-            area=row["HRU_Area"] / 1_000_000,
-            elevation=row["HRU_E_mean"],
-            latitude=row["HRU_CenY"],
-            longitude=row["HRU_CenX"],
+            area=float(row["HRU_Area"] / 1_000_000),
+            elevation=float(row["HRU_E_mean"]),
+            latitude=float(row["HRU_CenY"]),
+            longitude=float(row["HRU_CenX"]),
             subbasin_id=int(row["SubId"]),
             aquifer_profile="[NONE]",
             terrain_class="[NONE]",
-            slope=row["HRU_S_mean"],
-            aspect=aspect,
+            slope=float(row["HRU_S_mean"]),
+            aspect=float(aspect),
         )
 
         if self.model_cls is not None:
             # Instantiate HRUs with emulator specific land_use_class, veg_class and soil_profile names.
             if row["LAND_USE_C"] == "Landuse_Land_HRU":
-                return self.model_cls.LandHRU(**attrs)
+                return self.model_cls.LandHRU.construct(**attrs)
 
             if row["LAND_USE_C"] == "Landuse_Lake_HRU":
-                return self.model_cls.LakeHRU(**attrs)
+                return self.model_cls.LakeHRU.construct(**attrs)
 
         # Instantiate HRUs with generic land_use_class, veg_class and soil_profile names.
-        return HRUsCommand.Record(
-            land_use_class=row["LAND_USE_C"],
-            veg_class=row["VEG_C"],
-            soil_profile=row["SOIL_PROF"],
+        return HRUsCommand.Record.construct(
+            land_use_class=str(row["LAND_USE_C"]),
+            veg_class=str(row["VEG_C"]),
+            soil_profile=str(row["SOIL_PROF"]),
             **attrs,
         )
 
@@ -495,8 +498,8 @@ class RoutingProductGridWeightExtractor:
 
                     if area_intersect > 0:
                         hru_id = int(row[self._routing_id_field])
-                        cell_id = ilat * self._nlon + ilon
-                        weight = area_intersect / area_basin
+                        cell_id = int(ilat * self._nlon + ilon)
+                        weight = float(area_intersect / area_basin)
                         row_grid_weights.append((hru_id, cell_id, weight))
 
             # mismatch between area of subbasin (routing product) and sum of all contributions of grid cells (model output)
@@ -510,17 +513,17 @@ class RoutingProductGridWeightExtractor:
             else:
                 # adjust such that weights sum up to 1.0
                 for hru_id, cell_id, weight in row_grid_weights:
-                    corrected_weight = weight * 1.0 / (1.0 - error)
+                    corrected_weight = float(weight * 1.0 / (1.0 - error))
                     grid_weights.append((hru_id, cell_id, corrected_weight))
 
                 # if error < 1.0:
                 #     area_all *= 1.0 / (1.0 - error)
                 # error = 0.0
 
-        return GridWeightsCommand(
+        return GridWeightsCommand.construct(
             number_hrus=len(self._routing_data),
-            number_grid_cells=self._nlon * self._nlat,
-            data=tuple(grid_weights),
+            number_grid_cells=int(self._nlon * self._nlat),
+            data=np.array(grid_weights, dtype=GRID_WEIGHTS_DTYPE),
         )
 
     def _prepare_input_data(self):
@@ -1,5 +1,47 @@
-import os
+"""Raven model wrappers and emulators.
 
-from .base import Ostrich, Raven, RavenError, RavenWarning, get_average_annual_runoff
-from .emulators import *
-from .multimodel import RavenMultiModel
+Attributes are imported on first access (PEP 562), so that importing this package does not import the emulators and
+their dependencies.
+"""
+import importlib
+
+from .emulators import __all__ as _EMULATORS
+
+# Names defined by the submodules, keyed by submodule
+_SUBMODULES = {
+    ".base": [
+        "Ostrich",
+        "Raven",
+        "RavenError",
+        "RavenWarning",
+        "get_average_annual_runoff",
+    ],
+    ".multimodel": ["RavenMultiModel"],
+}
+_ATTRIBUTES = {name: module for module, names in _SUBMODULES.items() for name in names}
+
+__all__ = sorted(_ATTRIBUTES) + _EMULATORS
+
+
+def __getattr__(name):
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(_ATTRIBUTES[name], __name__), name)
+    else:
+        # Emulators and their modules' public names are re-exported from `emulators`
+        emulators = importlib.import_module(".emulators", __name__)
+        try:
+            value = getattr(emulators, name)
+        except AttributeError:
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}"
+            ) from None
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -6,20 +6,25 @@ The `Raven` class is the base class that implements model setup, execution and o
 class is the base class adapting `Raven` to work with the Ostrich calibration tool.
 
 """
+import asyncio
 import collections
 import csv
 import datetime as dt
+import functools
 import os
+import pickle
 import re
 import shutil
 import stat
 import subprocess
 import tempfile
+import threading
 import zipfile
 from collections import OrderedDict
+from copy import deepcopy
 from dataclasses import astuple, fields, is_dataclass, replace
 from pathlib import Path
-from typing import Any, Dict, List, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
 from warnings import warn
 
 import numpy as np
@@ -29,19 +34,39 @@ from numpy.distutils.misc_util import is_sequence
 from ravenpy.config.commands import RedirectToFileCommand
 from ravenpy.config.rvs import RVC, Config
 
+from .cache import ResultCache
+from .evaluations import EvaluationStore, config_hash, objective_name
+from .profiling import Profiler, timed
+from .scheduler import (
+    RavenProcess,
+    RetryPolicy,
+    WorkerPool,
+    merge_raven_messages,
+    parse_raven_messages,
+)
+
 RAVEN_EXEC_PATH = os.getenv("RAVENPY_RAVEN_BINARY_PATH") or shutil.which("raven")
 OSTRICH_EXEC_PATH = os.getenv("RAVENPY_OSTRICH_BINARY_PATH") or shutil.which("ostrich")
 
 RAVEN_NO_DATA_VALUE = -1.2345
 
+# Versions of the Raven executables probed by this process, keyed by real path and modification time
+_RAVEN_VERSIONS: Dict[Tuple[str, int], str] = {}
+_RAVEN_VERSIONS_LOCK = threading.Lock()
+
 
 class RavenError(Exception):
     """
     This is an error that is meant to be raised whenever a message of type "ERROR" is found
     in the Raven_errors.txt file resulting from a Raven (i.e. the C program) run.
+
+    The `failures` attribute holds the processes that did not complete, keyed by their index along the parallel
+    dimension.
     """
 
-    pass
+    def __init__(self, *args, failures: Dict[int, RavenProcess] = None):
+        super().__init__(*args)
+        self.failures = failures or {}
 
 
 class RavenWarning(Warning):
@@ -72,11 +97,42 @@ class Raven:
         workdir: Union[str, Path] = None,
         identifier: str = "raven-generic",
         description: str = None,
+        max_workers: int = None,
+        share_rv: bool = False,
+        virtual_merge: bool = False,
+        timeout: float = None,
+        retry: RetryPolicy = None,
+        fail_fast: bool = False,
+        errors: str = "raise",
+        strict: bool = False,
     ):
         """Initialize the RAVEN model.
 
         Directory for the model configuration and outputs. If None, a temporary directory will be created.
+
+        `max_workers` is the maximum number of Raven processes running at the same time during parallel
+        simulations. It defaults to the number of CPUs.
+
+        If `share_rv` is True, RV files that are identical across parallel simulations are rendered once and
+        hard-linked into the directory of every simulation.
+
+        If `virtual_merge` is True, the outputs of parallel simulations are not merged in a new file, but exposed
+        as a single dataset lazily reading the individual output files.
+
+        `timeout` is the maximum wall-clock time in seconds of each Raven process, after which it is killed, and
+        `retry` is a `RetryPolicy` for running failed processes again. If `fail_fast` is True, the remaining
+        processes are cancelled as soon as one of them fails.
+
+        If `errors` is "raise", a `RavenError` is raised when any process fails. If it is "warn", failures are
+        reported as warnings and in `failures`. In both cases, the outputs of the completed processes are parsed.
+
+        Processes fail when Raven reports errors, when they are killed by a signal and when they time out. If
+        `strict` is True, processes exiting with a non-zero status or whose simulation is not reported as complete
+        also fail. Otherwise, their outputs are parsed, but simulations not reported as complete are still reported
+        according to `errors`.
         """
+        if errors not in ("raise", "warn"):
+            raise ValueError(f"`errors` should be 'raise' or 'warn': {errors}")
 
         if not RAVEN_EXEC_PATH:
             raise RuntimeError(
@@ -91,30 +147,27 @@ class Raven:
         self.raven_exec = RAVEN_EXEC_PATH
         self.ostrich_exec = OSTRICH_EXEC_PATH
 
-        # Get version from Raven binary CLI output
-        out = subprocess.check_output([self.raven_exec], input="\n", text=True)
-        match = re.search(r"Version (\S+) ", out)
-        if match:
-            self.raven_version = match.groups()[0]
-        else:
-            raise AttributeError(f"Raven version not found: {out}")
-
-        # Remove this file that has been produced by the previous raven call to get the version
-        try:
-            os.remove("Raven_errors.txt")
-        except OSError:
-            pass
-
         self.workdir = Path(os.path.realpath(workdir or tempfile.mkdtemp()))
 
         # Individual files for all simulations
         self.ind_outputs: Dict[str, List[Path]] = {}
         # Aggregated files
-        self.outputs: Dict[str, Union[Path, str]] = {}
+        self.outputs: Dict[str, Union[Path, str, xr.Dataset]] = {}
+        self.virtual_merge = virtual_merge
+        # Open datasets and arrays read from the outputs, reset by `parse_results`
+        self._output_handles: Dict[str, Any] = {}
 
         # Explicit paths of every rendered RV file
         self._rv_paths: List[Path] = []
 
+        # Rendered content of the RV files of the current simulation, keyed by extension
+        self._rv_contents: Dict[str, str] = {}
+
+        # Share RV files that do not vary across parallel simulations
+        self.share_rv = share_rv
+        # State fingerprint, path and content of the last rendered RV files, keyed by extension
+        self._rv_shared: Dict[str, Any] = {}
+
         # Directory logic
         # Top directory inside workdir. This is where Ostrich and its config and templates are stored.
         self.model_dir = "model"  # Path to the model configuration files.
@@ -136,8 +189,37 @@ class Raven:
         self._psim = 0
         self._pdim = ""  # Parallel dimension (either initparam, params or region)
 
+        # Maximum number of concurrent Raven processes
+        self.max_workers = max_workers
+
+        # Failure handling of the Raven processes
+        self.timeout = timeout
+        self.retry = retry
+        self.fail_fast = fail_fast
+        self.errors = errors
+        self.strict = strict
+        # Pool running the processes of the current simulation, if any
+        self._pool: Optional[WorkerPool] = None
+
+        # Processes launched by the last call to `_execute`, one per parallel simulation
+        self.processes: List[RavenProcess] = []
+
+        # Opt-in cache of simulation outputs
+        self.cache: Optional[ResultCache] = None
+
+        # Opt-in store of the objective function of evaluated parameter sets
+        self.store: Optional[EvaluationStore] = None
+
+        # Opt-in instrumentation of the simulation phases
+        self.profiler: Optional[Profiler] = None
+
         self.config = Config(model=self)
 
+    @property
+    def raven_version(self) -> str:
+        """Version of the Raven executable, probed on first access."""
+        return get_raven_version(self.raven_exec)
+
     @property
     def output_path(self):
         return self.model_path / self.output_dir
@@ -181,6 +263,43 @@ class Raven:
         """Subclassed by emulators. Defines model parameters that are a function of other parameters."""
         return
 
+    def clone(self, workdir: Union[str, Path] = None) -> "Raven":
+        """Return a copy of the model with its own working directory.
+
+        The configuration is copied, so the clone can be modified and run independently, e.g. in another thread or
+        process. The result cache, evaluation store and profiler are shared with the original model, and the outputs
+        of previous runs are not copied.
+
+        Parameters
+        ----------
+        workdir : str or Path, optional
+          Working directory of the clone. If None, a temporary directory will be created.
+        """
+        # Objects shared with the clone instead of being copied (outputs are reset below)
+        shared = (
+            self.cache,
+            self.store,
+            self.profiler,
+            self._pool,
+            self.outputs,
+            self._output_handles,
+        )
+        memo = {id(obj): obj for obj in shared}
+        new = deepcopy(self, memo)
+
+        new.workdir = Path(os.path.realpath(workdir or tempfile.mkdtemp()))
+        new.exec_path = new.workdir / "exec"
+        new.final_path = new.workdir / new.final_dir
+        new.ind_outputs = {}
+        new.outputs = {}
+        new._output_handles = {}
+        new._rv_paths = []
+        new._rv_contents = {}
+        new._rv_shared = {}
+        new._pool = None
+        new.processes = []
+        return new
+
     def configure(self, fns):
         """Set configuration from existing RV files. The `self.identifier` attribute will be updated
         as the stem of the input files (which must be common to the set).
@@ -199,10 +318,12 @@ class Raven:
         for fn in map(Path, fns):
             self.config.set_rv_file(fn)
 
+    @timed("dump_rv", member=True, size=lambda self, _: _rv_size(self))
     def _dump_rv(self):
         """Write configuration files to disk."""
 
         # identifier = self.config.identifier
+        self._rv_contents = {}
 
         for rvx in ["rvt", "rvh", "rvp", "rvc", "rvi"]:
             rvo = getattr(self.config, rvx)
@@ -210,14 +331,57 @@ class Raven:
                 fn = self.exec_path / f"{self.identifier}.{rvx}.tpl"
             else:
                 fn = self.model_path / f"{self.identifier}.{rvx}"
+            self._rv_paths.append(fn)
+
+            # Never write through a link shared with another simulation
+            if not rvo.is_ostrich_tmpl and (fn.exists() or fn.is_symlink()):
+                fn.unlink()
+
+            state = self._rv_state(rvx) if self.share_rv else None
+            shared = self._rv_shared.get(rvx)
+            if state is not None and shared and shared[0] == state:
+                _, src, content = shared
+                try:
+                    os.link(src, fn)
+                except OSError:
+                    os.symlink(src, fn)
+                self._rv_contents[rvx] = content
+                continue
+
             with open(fn, "w") as f:
-                self._rv_paths.append(fn)
                 content = rvo.content or rvo.to_rv()
                 assert (
                     content.strip()
                 ), f"{rvx} has no content! (did you forget to use `RV.set_tmpl`?)"
                 f.write(content)
+                self._rv_contents[rvx] = content
+
+            if state is not None and not rvo.is_ostrich_tmpl:
+                # Rendering may fill in defaults (e.g. RVT gauged subbasins), so the state is
+                # recorded after rendering.
+                self._rv_shared[rvx] = (self._rv_state(rvx), fn, content)
+
+    def _rv_state(self, rvx) -> Optional[bytes]:
+        """Return a fingerprint of the state an RV file is rendered from, or None if it cannot be computed.
 
+        Two calls returning the same value mean the RV file would be rendered identically.
+        """
+        rvs = ["rvh", "rvt"] if rvx == "rvt" else [rvx]
+        try:
+            return pickle.dumps(
+                [
+                    {
+                        k: v
+                        for k, v in vars(getattr(self.config, r)).items()
+                        if k != "_config"
+                    }
+                    for r in rvs
+                ]
+            )
+        except Exception:
+            return None
+
+    @timed("setup")
     def setup(self, overwrite=False):
         """Create directory structure to store model input files, executable and output results.
 
@@ -242,6 +406,7 @@ class Raven:
         if not self.final_path.exists():
             os.makedirs(str(self.final_path))  # workdir/final
 
+    @timed("setup_model_run", member=True)
     def setup_model_run(self, ts):
         """Create directory structure to store model input files, executable and output results.
 
@@ -280,6 +445,7 @@ class Raven:
 
         return self.bash_cmd
 
+    @timed("run")
     def run(self, ts, overwrite=False, parallel={}, **kwds):
         """Run the model.
 
@@ -295,8 +461,13 @@ class Raven:
           Raven parameters used to fill configuration file templates.
 
         Create a work directory with a model/ and output/ subdirectories, write the configuration files in model/ and
-        launch the Raven executable. If the configuration files are templates, values can be formatted by passing
-        dictionaries keyed by their extension.
+        return the Raven processes to launch, one for each parallel simulation. If the configuration files are
+        templates, values can be formatted by passing dictionaries keyed by their extension.
+
+        Returns
+        -------
+        list of RavenProcess
+          Processes to be launched, see `_execute`.
 
         Examples
         --------
@@ -305,20 +476,6 @@ class Raven:
         >>> r.run(ts, start_date=dt.datetime(2000, 1, 1), area=1000, X1=67)
 
         """
-        if isinstance(ts, (str, Path)):
-            ts = [ts]
-
-        # Support legacy interface for single HRU emulator
-        hru_attrs = {}
-        for k in ["area", "latitude", "longitude", "elevation"]:
-            v = kwds.pop(k, None)
-            if v:
-                # It seems that `v` is a list when running via a WPS interface
-                hru_attrs[k] = v[0] if isinstance(v, list) else v
-        if hru_attrs:
-            assert len(self.config.rvh.hrus) == 1
-            self.config.rvh.hrus = (replace(self.config.rvh.hrus[0], **hru_attrs),)
-
         # Parallel parameters handling
         plen = {p: len(v) for (p, v) in parallel.items()}
         if len(set(plen.values())) > 1:
@@ -335,26 +492,18 @@ class Raven:
         else:
             self._pdim = "pdim"
 
-        # Use rvc file to set model state, if any
-        rvc = kwds.pop("rvc", None)
-        if rvc:
-            self.resume(solution=rvc)
+        ts = self._configure(ts, **kwds)
 
-        # Update non-parallel parameter objects
-        for key, val in kwds.items():
-            self.config.update(key, val)
-
-        ts_ncs = [f for f in ts if Path(f).suffix.startswith(".nc")]
-
-        if ts_ncs:
-            self.config.rvi.configure_from_nc_data(ts_ncs)
-
-        if ts_ncs and self.config.rvt._auto_nc_configure:
-            self.config.rvt.configure_from_nc_data(ts_ncs)
+        # Emulators derive the initial states from the parameters when they are not set, so that every
+        # parameter set starts from the states set before the run, rather than those derived for the first one
+        rvc_state = self._rvc_state() if "params" in parallel else None
 
         # Loop over parallel parameters - sets self.rvi.run_index
+        self._rv_shared = {}
         procs = []
         for self.psim in range(nloops):
+            if rvc_state is not None:
+                self._set_rvc_state(rvc_state)
             for key, val in parallel.items():
                 if val[self.psim] is not None:
                     if key == "hru_state":
@@ -367,45 +516,463 @@ class Raven:
             cmd = self.setup_model_run(ts)
 
             procs.append(
-                subprocess.Popen(
-                    cmd,
+                RavenProcess(
+                    index=self.psim,
+                    cmd=cmd,
                     cwd=self.cmd_path,
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    universal_newlines=True,
+                    output_path=self.output_path,
+                    cache_key=self._cache_key(ts),
+                    strict=self.strict,
                 )
             )
 
         return procs
 
+    def _configure(self, ts, **kwds) -> List:
+        """Update the configuration with the parameters of the run and the metadata of the forcing files.
+
+        This is the part of `run` common to all parallel simulations. Applying it again with the same arguments
+        leaves the configuration unchanged.
+
+        Returns
+        -------
+        list
+          Paths of the forcing files.
+        """
+        if isinstance(ts, (str, Path)):
+            ts = [ts]
+
+        # Support legacy interface for single HRU emulator
+        hru_attrs = {}
+        for k in ["area", "latitude", "longitude", "elevation"]:
+            v = kwds.pop(k, None)
+            if v:
+                # It seems that `v` is a list when running via a WPS interface
+                hru_attrs[k] = v[0] if isinstance(v, list) else v
+        if hru_attrs:
+            assert len(self.config.rvh.hrus) == 1
+            self.config.rvh.hrus = (replace(self.config.rvh.hrus[0], **hru_attrs),)
+
+        # Use rvc file to set model state, if any
+        rvc = kwds.pop("rvc", None)
+        if rvc:
+            self.resume(solution=rvc)
+
+        # Update non-parallel parameter objects
+        for key, val in kwds.items():
+            self.config.update(key, val)
+
+        ts_ncs = [f for f in ts if Path(f).suffix.startswith(".nc")]
+
+        if ts_ncs:
+            self.config.rvi.configure_from_nc_data(ts_ncs)
+
+        if ts_ncs and self.config.rvt._auto_nc_configure:
+            self.config.rvt.configure_from_nc_data(ts_ncs)
+
+        return ts
+
+    def _rvc_state(self):
+        """Return a copy of the initial states."""
+        rvc = self.config.rvc
+        return deepcopy((rvc._hru_states, rvc._hru_table, rvc.basin_states))
+
+    def _set_rvc_state(self, state):
+        """Restore the initial states returned by `_rvc_state`."""
+        rvc = self.config.rvc
+        rvc._hru_states, rvc._hru_table, rvc.basin_states = deepcopy(state)
+
+    @timed("execute")
     def _execute(self, ts, overwrite=False, parallel={}, **kwds):
         """
         parallel : {}
           Parameters that should be distributed across parallel simulations.
+
+        At most `max_workers` Raven processes are running at the same time, the others being queued until a worker
+        becomes available. The exit status and messages of each process are stored in `self.processes`.
         """
+        # The output files of the previous run are about to be overwritten
+        self._close_outputs()
         self.setup(overwrite)
 
         procs = self.run(ts, overwrite, parallel=parallel, **kwds)
 
+        pending = self._restore_cached(procs)
+        self._pool = self._worker_pool()
+        try:
+            self._pool.run(pending)
+        finally:
+            self._pool = None
+        self._complete(procs, pending)
+
+    def __call__(self, ts, overwrite=False, parallel={}, **kwds):
+        try:
+            self._execute(ts, overwrite=overwrite, parallel=parallel, **kwds)
+        except RavenError:
+            self._parse_completed()
+            raise
+        self.parse_results()
+
+    def _parse_completed(self):
+        """Parse the outputs of the processes that completed in a simulation that failed, so that they are not
+        discarded when the error is raised.
+
+        Errors raised while parsing are reported as warnings, so that they do not replace the simulation error.
+        """
+        if any(p.status == "completed" for p in self.processes):
+            try:
+                self.parse_results()
+            except Exception as err:
+                warn(
+                    f"Outputs of the completed simulations could not be parsed: {err!r}",
+                    RavenWarning,
+                )
+
+    def evaluate(
+        self,
+        ts,
+        params,
+        diagnostic="DIAG_NASH_SUTCLIFFE",
+        q_sim=False,
+        obj_func=None,
+        **kwds,
+    ):
+        """Run the model for a population of parameter sets and return their objective function.
+
+        The parameter sets are distributed across parallel simulations in a single run, at most `max_workers` Raven
+        processes running at the same time. Outputs are read from the directory of each simulation, without being
+        merged.
+
+        If an evaluation store is set in `store`, parameter sets found in it are not run again, unless the simulated
+        streamflows are requested, and the objective function of the parameter sets run successfully is added to it.
+        Evaluations are keyed by the configuration, excluding the parameters, and by the name of the objective
+        function, see `ravenpy.models.evaluations.objective_name`.
+
+        Parameters
+        ----------
+        ts : path or sequence
+          Input forcing files.
+        params : array_like
+          Parameter sets, of shape (n_candidates, n_params).
+        diagnostic : str
+          Name of the Raven diagnostic used as objective function.
+        q_sim : bool
+          If True, also return the simulated streamflows.
+        obj_func : callable, optional
+          Objective function computed from the simulated and observed streamflows instead of the Raven diagnostic,
+          see `ravenpy.utilities.metrics.objective`. It is called once with the simulated streamflows of all
+          parameter sets, of shape (n_candidates, time, nbasins), and the observed streamflows, of shape
+          (time, nbasins), and should return an array of shape (n_candidates,).
+        **kwds : dict
+          Other parameters of the run, see `run`.
+
+        Returns
+        -------
+        np.ndarray
+          Objective function of each parameter set. If `errors` is "warn", it is NaN for failed simulations.
+        np.ndarray, optional
+          Simulated streamflows, of shape (n_candidates, time, nbasins), if `q_sim` is True. They are NaN for failed
+          simulations.
+        """
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        if params.ndim != 2:
+            raise ValueError(f"`params` should be a 2D array: {params.shape}")
+
+        if self.store is None or q_sim:
+            out = self._evaluate(ts, params, diagnostic, q_sim, obj_func, **kwds)
+            if self.store is not None:
+                config = self._evaluation_config(ts, diagnostic, obj_func, **kwds)
+                for p, v in zip(params, out[0]):
+                    if not np.isnan(v):
+                        self.store.put(config, p, v)
+            return out
+
+        config = self._evaluation_config(ts, diagnostic, obj_func, **kwds)
+
+        # Index of the first occurrence of each parameter set, so that duplicates are only run once
+        keys = [self.store.key(config, p) for p in params]
+        first: Dict[Any, int] = {}
+        for i, key in enumerate(keys):
+            first.setdefault(key, i)
+
+        obj = np.full(len(params), np.nan)
+        todo = []
+        for i in first.values():
+            value = self.store.get(config, params[i])
+            if value is None:
+                todo.append(i)
+            else:
+                obj[i] = value
+
+        if todo:
+            obj[todo] = self._evaluate(
+                ts, params[todo], diagnostic, False, obj_func, **kwds
+            )
+            for i in todo:
+                # Failed simulations are run again
+                if not np.isnan(obj[i]):
+                    self.store.put(config, params[i], obj[i])
+
+        return obj[[first[key] for key in keys]]
+
+    def _evaluation_config(self, ts, diagnostic, obj_func, **kwds) -> str:
+        """Return the hash of the configuration identifying the evaluations of `store`.
+
+        The configuration is updated with the parameters of the run first, so that the hash does not depend on
+        whether the model has already been run.
+        """
+        rvc_state = self._rvc_state()
+        try:
+            ts = self._configure(ts, **kwds)
+            return self._config_hash(ts, objective_name(diagnostic, obj_func))
+        finally:
+            self._set_rvc_state(rvc_state)
+
+    def _config_hash(self, ts, *extra) -> str:
+        """Return the hash of the current configuration, excluding the model parameters.
+
+        The RVP file holding the parameters is left out, the model class identifying its other content.
+        """
+        contents = []
+        for rvx in ["rvt", "rvh", "rvc", "rvi"]:
+            rvo = getattr(self.config, rvx)
+            contents.append(rvo.content or rvo.to_rv())
+
+        forcings = list(ts)
+        if isinstance(self.config.rvt.grid_weights, RedirectToFileCommand):
+            forcings.append(self.config.rvt.grid_weights.path)
+
+        return config_hash(
+            contents, forcings, self.raven_version, type(self).__qualname__, *extra
+        )
+
+    def _evaluate(self, ts, params, diagnostic, q_sim, obj_func, **kwds):
+        """Run the parameter sets and return their objective function, see `evaluate`."""
+        # Initial states derived from the parameters are not kept for the next evaluations
+        rvc_state = self._rvc_state()
+        try:
+            self._execute(
+                ts, overwrite=True, parallel=dict(params=list(params)), **kwds
+            )
+        finally:
+            self._set_rvc_state(rvc_state)
+
+        run_name = self.config.rvi.run_name or ""
+        read_q = q_sim or obj_func is not None
+        obj = np.full(len(params), np.nan)
+        if obj_func is None:
+            diagnostics = self._member_outputs(f"{run_name}*Diagnostics.csv")
+            self._check_member_outputs(
+                diagnostics,
+                "diagnostics",
+                "Observed streamflows are needed to compute the Raven diagnostics.",
+            )
+            for i, fn in diagnostics.items():
+                values = read_diagnostics(fn)
+                if diagnostic not in values:
+                    raise RavenError(f"Diagnostic {diagnostic} not found in {fn}.")
+                obj[i] = values[diagnostic][0]
+
+        if not read_q:
+            return obj
+
+        hydrographs = self._member_outputs(f"{run_name}*Hydrographs.nc")
+        self._check_member_outputs(hydrographs, "hydrographs")
+        if not hydrographs:
+            raise RavenError("All simulations failed.", failures=self.failures)
+        qs = {i: read_variable(fn, "q_sim") for i, fn in hydrographs.items()}
+        shape = next(iter(qs.values())).shape
+        q = np.full((len(params),) + shape, np.nan)
+        for i, values in qs.items():
+            q[i] = values.reshape(shape)
+
+        if obj_func is not None:
+            q_obs = read_variable(next(iter(hydrographs.values())), "q_obs")
+            obj = np.asarray(obj_func(q, q_obs.reshape(shape)), dtype=float)
+            obj[[i for i in range(len(params)) if i not in hydrographs]] = np.nan
+
+        return (obj, q) if q_sim else obj
+
+    async def arun(self, ts, overwrite=False, parallel={}, **kwds):
+        """Coroutine version of `run`.
+
+        The configuration files are written in a worker thread so the event loop is not blocked.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(self.run, ts, overwrite, parallel=parallel, **kwds),
+        )
+
+    async def _aexecute(self, ts, overwrite=False, parallel={}, timeout=None, **kwds):
+        """Coroutine version of `_execute`.
+
+        timeout : float, optional
+          Maximum wall-clock time in seconds for each Raven process. Defaults to the model's `timeout`.
+
+        If the coroutine is cancelled, running processes are killed and the exception is propagated.
+        """
+        self._close_outputs()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.setup, overwrite)
+
+        procs = await self.arun(ts, overwrite, parallel=parallel, **kwds)
+
+        pending = self._restore_cached(procs)
+        self._pool = self._worker_pool()
+        try:
+            await self._pool.arun(pending, timeout=timeout)
+        finally:
+            self._pool = None
+        self._complete(procs, pending)
+
+    async def acall(self, ts, overwrite=False, parallel={}, timeout=None, **kwds):
+        """Coroutine version of `__call__`.
+
+        Since `Raven` instances are also called synchronously from environments already running an event loop (e.g.
+        notebooks), the asynchronous entry point is a distinct method::
+
+          await model.acall(ts, params=...)
+
+        Output files are parsed in a worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await self._aexecute(
+                ts, overwrite=overwrite, parallel=parallel, timeout=timeout, **kwds
+            )
+        except RavenError:
+            await loop.run_in_executor(None, self._parse_completed)
+            raise
+        await loop.run_in_executor(None, self.parse_results)
+
+    def _worker_pool(self) -> WorkerPool:
+        return WorkerPool(
+            self.max_workers,
+            timeout=self.timeout,
+            retry=self.retry,
+            fail_fast=self.fail_fast,
+        )
+
+    def cancel(self):
+        """Cancel the running simulation, killing its Raven processes.
+
+        This method is meant to be called from another thread (or task) than the one running the simulation. The
+        cancelled processes are reported as failures.
+        """
+        if self._pool is not None:
+            self._pool.cancel()
+
+    @property
+    def failures(self) -> Dict[int, RavenProcess]:
+        """Processes of the last simulation that did not complete, keyed by their index along the parallel
+        dimension. Their status and `reason` describe the failure."""
+        return {p.index: p for p in self.processes if p.failed}
+
+    def _cache_key(self, ts) -> Optional[str]:
+        """Return the cache key of the current simulation, or None if caching is disabled."""
+        if self.cache is None:
+            return None
+
+        forcings = list(ts)
+        if isinstance(self.config.rvt.grid_weights, RedirectToFileCommand):
+            forcings.append(self.config.rvt.grid_weights.path)
+
+        return self.cache.key(
+            [self._rv_contents[k] for k in sorted(self._rv_contents)],
+            forcings,
+            self.raven_version,
+        )
+
+    def _restore_cached(self, procs: List[RavenProcess]) -> List[RavenProcess]:
+        """Copy cached outputs in the output directory of processes found in the cache.
+
+        Returns the processes that still need to be run.
+        """
+        if self.cache is None:
+            return procs
+
+        pending = []
         for proc in procs:
-            # When Raven errors right away (for instance if it's missing an RV file)
-            # it asks for a RETURN to exit
-            proc.communicate(input="\n")
-            proc.wait()
+            if proc.cache_key and self.cache.get(proc.cache_key, proc.output_path):
+                proc.restore()
+            else:
+                pending.append(proc)
+        return pending
 
-        messages = self.extract_raven_messages()
+    def _store_cached(self, procs: List[RavenProcess]):
+        """Store the outputs of successful processes in the cache."""
+        if self.cache is None:
+            return
 
-        if messages["ERROR"]:
-            raise RavenError("\n".join(messages["ERROR"]))
+        for proc in procs:
+            if (
+                proc.cache_key
+                and proc.status == "completed"
+                and proc.returncode == 0
+                and proc.messages["SIMULATION COMPLETE"]
+            ):
+                self.cache.put(proc.cache_key, proc.output_path)
+
+    def _complete(self, procs: List[RavenProcess], ran: List[RavenProcess]):
+        """Store the processes of the simulation once they have exited, and check their messages."""
+        self.processes = procs
+        self._store_cached(ran)
+
+        if self.profiler is not None:
+            for proc in procs:
+                self.profiler.record(
+                    "process",
+                    duration=proc.duration or 0.0,
+                    member=proc.index,
+                    returncode=proc.returncode,
+                    status=proc.status,
+                    attempts=proc.attempts,
+                    cached=proc.cached,
+                    size=proc.bytes_written,
+                    **proc.rusage,
+                )
 
-        for msg in messages["WARNING"]:
+        self._check_messages()
+
+    def _check_messages(self):
+        """Raise errors and warnings found in the Raven_errors.txt files of the last processes.
+
+        Processes that did not complete are reported in a single `RavenError`, or as warnings if `errors` is "warn".
+        Unless `strict` is True, simulations that exited without being reported as complete are not failures, so
+        that their outputs are parsed, but they are reported in the same way.
+        """
+        messages = merge_raven_messages([p.messages for p in self.processes])
+        failures = self.failures
+        incomplete = [
+            p.index
+            for p in self.processes
+            if p.status == "completed" and not p.messages.get("SIMULATION COMPLETE")
+        ]
+
+        if failures:
+            if len(self.processes) == 1:
+                msg = failures[self.processes[0].index].reason
+            else:
+                msg = "\n".join(
+                    f"Simulation {i} {p.status}: {p.reason}"
+                    for i, p in failures.items()
+                )
+            if self.errors == "raise":
+                raise RavenError(msg, failures=failures)
             warn(msg, category=RavenWarning)
 
-        assert messages["SIMULATION COMPLETE"]
+        if incomplete:
+            if len(self.processes) == 1:
+                msg = "Simulation did not complete"
+            else:
+                msg = "\n".join(f"Simulation {i} did not complete" for i in incomplete)
+            if self.errors == "raise":
+                raise RavenError(msg, failures=failures)
+            warn(msg, category=RavenWarning)
 
-    def __call__(self, ts, overwrite=False, parallel={}, **kwds):
-        self._execute(ts, overwrite=overwrite, parallel=parallel, **kwds)
-        self.parse_results()
+        for msg in messages["WARNING"]:
+            warn(msg, category=RavenWarning)
 
     def resume(self, solution=None):
         """Set the initial state to the state at the end of the last run.
@@ -422,6 +989,7 @@ class Raven:
 
         self.config.rvc.parse_solution(Path(fn).read_text())
 
+    @timed("parse_results")
     def parse_results(self, path=None, run_name=None):
         """Store output files in the self.outputs dictionary."""
         # Output files default names. The actual output file names will be composed of the run_name and the default
@@ -429,6 +997,8 @@ class Raven:
         path = path or self.exec_path
         run_name = run_name or self.config.rvi.run_name or ""
 
+        self._close_outputs()
+
         patterns = {
             "hydrograph": f"{run_name}*Hydrographs.nc",
             "storage": f"{run_name}*WatershedStorage.nc",
@@ -447,28 +1017,59 @@ class Raven:
                     continue
                 fns = []
 
+            # Skip the outputs of failed simulations, which may be missing or incomplete
+            failed = [Path(p.cwd) for p in self.failures.values()]
+            fns = [f for f in fns if not any(d in f.parents for d in failed)]
+            if not fns and failed:
+                continue
+
             self.ind_outputs[key] = fns
-            self.outputs[key] = self._merge_output(fns, pattern.replace("*", "_ALL_"))
+            # The outputs of failed members are filled with missing values when merged
+            members = self._member_indices(fns) if failed else None
+            self.outputs[key] = self._merge_output(
+                fns, pattern.replace("*", "_ALL_"), members=members
+            )
 
         self.outputs["rv_config"] = self._merge_output(self._rv_paths, "rv.zip")
 
-    def _merge_output(self, files, name):
-        """Merge multiple output files into one if possible, otherwise return a list of files."""
+    @timed("merge_output", size=lambda self, out: _file_size(out))
+    def _merge_output(self, files, name, members=None):
+        """Merge multiple output files into one if possible, otherwise return a zip archive of the files.
+
+        NetCDF files are merged along the parallel dimension without loading them in memory. If `virtual_merge` is
+        True, the lazily merged dataset is returned instead of being written to disk.
+
+        If `members` lists the index of the simulation that wrote each file, the merged dataset has one entry per
+        simulation along the parallel dimension, the members without output being filled with missing values.
+        """
         # If there is only one file, return its name directly.
         from .multimodel import RavenMultiModel
 
-        if len(files) == 1:
+        if len(files) == 1 and members is None:
             return files[0]
 
         # Otherwise try to create a new file aggregating all files.
         outfn = self.final_path / name
 
-        if name.endswith(".nc") and not isinstance(self, RavenMultiModel):
-            ds = [xr.open_dataset(fn) for fn in files]
+        if files and name.endswith(".nc") and not isinstance(self, RavenMultiModel):
             try:
-                # We aggregate along the pdim dimensions.
-                out = xr.concat(ds, self._pdim, data_vars="all")
-                out.to_netcdf(outfn)
+                # We aggregate along the pdim dimensions. Files are opened lazily, each one
+                # being a single dask chunk, so that members are never all loaded in memory.
+                out = xr.open_mfdataset(
+                    files,
+                    combine="nested",
+                    concat_dim=self._pdim,
+                    data_vars="all",
+                    compat="equals",
+                )
+                if members is not None:
+                    out = self._fill_members(out, members)
+                if self.virtual_merge:
+                    return out
+
+                # Chunks are written one after the other in the preallocated file
+                with out:
+                    out.to_netcdf(outfn)
                 return outfn
             except (ValueError, KeyError):
                 pass
@@ -491,35 +1092,77 @@ class Raven:
 
         return outfn
 
+    def _member_outputs(self, pattern) -> Dict[int, Path]:
+        """Return the output files matching `pattern` of the completed simulations, keyed by their index."""
+        try:
+            fns = self._get_output(pattern, path=self.exec_path)
+        except UserWarning:
+            return {}
+
+        completed = {p.index for p in self.processes if not p.failed}
+        out: Dict[int, Path] = {}
+        for i, fn in zip(self._member_indices(fns), fns):
+            if i not in completed:
+                continue
+            if i in out:
+                raise RavenError(
+                    f"Simulation {i} wrote several files matching {pattern}: {out[i]}, {fn}."
+                )
+            out[i] = fn
+        return out
+
+    def _check_member_outputs(self, outputs: Dict[int, Path], name: str, hint=""):
+        """Check that the completed simulations wrote their outputs, keyed by member index in `outputs`.
+
+        Raises a `RavenError`, followed by `hint`, if none of them did, and warns about the simulations without
+        output, whose results are then missing values.
+        """
+        missing = [
+            p.index for p in self.processes if not p.failed and p.index not in outputs
+        ]
+        if not missing:
+            return
+        if len(missing) == len(self.processes) - len(self.failures):
+            raise RavenError(
+                f"No {name} were written by the simulations. {hint}".strip()
+            )
+        msg = "\n".join(f"Simulation {i} did not write {name}" for i in missing)
+        warn(msg, category=RavenWarning)
+
+    def _member_indices(self, files) -> List[Optional[int]]:
+        """Return the index along the parallel dimension of the simulation that wrote each file, if any."""
+        dirs = {Path(p.cwd): p.index for p in self.processes}
+        out = []
+        for fn in files:
+            out.append(next((dirs[d] for d in fn.parents if d in dirs), None))
+        return out
+
+    def _fill_members(self, ds, members):
+        """Reindex the merged dataset `ds` on all the simulations, filling the missing members.
+
+        The dataset is returned unchanged if its entries along the parallel dimension are not one per member.
+        """
+        dim = self._pdim
+        if (
+            None in members
+            or len(set(members)) != len(members)
+            or ds.sizes.get(dim) != len(members)
+        ):
+            return ds
+
+        # Text variables, such as the basin names, are filled with empty strings
+        fill = {k: "" for k, v in ds.data_vars.items() if v.dtype.kind in "OSU"}
+        return (
+            ds.assign_coords({dim: members})
+            .reindex({dim: range(len(self.processes))}, fill_value=fill)
+            .drop_vars(dim)
+        )
+
     def extract_raven_messages(self):
         """
         Parse all the Raven_errors and extract the messages, structured by types.
         """
-        err_filepaths = self.exec_path.rglob("Raven_errors.txt")
-        messages = {
-            "ERROR": [],
-            "WARNING": [],
-            "ADVISORY": [],
-            "SIMULATION COMPLETE": False,
-        }
-        for p in err_filepaths:
-            # The error message for an unknown command is exceptionally on two lines
-            # (the second starts with a triple space)
-            for m in re.findall("^([A-Z ]+) :(.+)(?:\n   (.+))?", p.read_text(), re.M):
-                if m[0] == "SIMULATION COMPLETE":
-                    messages["SIMULATION COMPLETE"] = True
-                    continue
-                msg_type = m[0]
-                msg = f"{m[1]} {m[2]}".strip()
-                if (
-                    msg
-                    == "Errors found in input data. See Raven_errors.txt for details"
-                ):
-                    # Skip this one because it's a bit circular
-                    continue
-                messages[msg_type].append(msg)  # type: ignore
-
-        return messages
+        return parse_raven_messages(self.exec_path.rglob("Raven_errors.txt"))
 
     def _get_output(self, pattern, path):
         """Match actual output files to known expected files.
@@ -532,8 +1175,9 @@ class Raven:
             if not self.config.rvi.suppress_output:
                 raise UserWarning(f"No output files for {pattern} in {path}.")
 
+        # Files of parallel simulations are sorted by member index, so that p10 comes after p9
         fns = [f.absolute() for f in files]
-        fns.sort()
+        fns.sort(key=_natural_key)
         return fns
 
     @property
@@ -543,10 +1187,38 @@ class Raven:
         This view will be overwritten by successive calls to `run`. To make a copy of this DataArray that will
         persist in memory, use `q_sim.copy(deep=True)`.
         """
-        if isinstance(self.hydrograph, list):
-            return [h.q_sim for h in self.hydrograph]
+        hydrograph = self.hydrograph
+        if isinstance(hydrograph, list):
+            return [h.q_sim for h in hydrograph]
+
+        return hydrograph.q_sim
+
+    @property
+    def q_sim_values(self):
+        """Return the hydrograph time series as a read-only NumPy array.
+
+        Only the `q_sim` variable is read from the output file, without decoding the rest of the dataset. Missing
+        values are set to NaN. If outputs could not be merged, a list of arrays is returned.
+        """
+        key = "q_sim_values"
+        if key not in self._output_handles:
+            hydrograph = self.outputs["hydrograph"]
+            if isinstance(hydrograph, xr.Dataset):
+                values = hydrograph.q_sim.values
+            elif cast(Path, hydrograph).suffix == ".nc":
+                values = read_variable(hydrograph, "q_sim")
+            elif cast(Path, hydrograph).suffix == ".zip":
+                values = [
+                    read_variable(fn, "q_sim") for fn in self.ind_outputs["hydrograph"]
+                ]
+            else:
+                raise ValueError
+
+            for v in values if isinstance(values, list) else [values]:
+                v.flags.writeable = False
+            self._output_handles[key] = values
 
-        return self.hydrograph.q_sim
+        return self._output_handles[key]
 
     @property
     def hydrograph(self):
@@ -554,24 +1226,43 @@ class Raven:
 
         If the model is run multiple times, hydrograph will point to the latest version. To store the results of
         multiple runs, either create different model instances or explicitly copy the file to another disk location.
+
+        The dataset is opened once per run, and closed when the model is run again, as its file is overwritten. Call
+        its `load` method to keep its values in memory beyond the next run.
         """
-        hydrograph = cast(Path, self.outputs["hydrograph"])
-        if hydrograph.suffix == ".nc":
-            return xr.open_dataset(hydrograph)
-        elif hydrograph.suffix == ".zip":
-            return [xr.open_dataset(fn) for fn in self.ind_outputs["hydrograph"]]
-        else:
-            raise ValueError
+        return self._open_output("hydrograph")
 
     @property
     def storage(self):
-        storage = cast(Path, self.outputs["storage"])
-        if storage.suffix == ".nc":
-            return xr.open_dataset(storage)
-        elif storage.suffix == ".zip":
-            return [xr.open_dataset(fn) for fn in self.ind_outputs["storage"]]
-        else:
-            raise ValueError
+        """Return a view of the current storage output file, closed when the model is run again (see `hydrograph`)."""
+        return self._open_output("storage")
+
+    def _open_output(self, key):
+        """Return the dataset (or list of datasets if they could not be merged) of an output.
+
+        Files are opened once, and the datasets reused until the model is run again or the outputs are parsed again.
+        """
+        if key not in self._output_handles:
+            out = self.outputs[key]
+            if isinstance(out, xr.Dataset):
+                ds = out
+            elif cast(Path, out).suffix == ".nc":
+                ds = xr.open_dataset(out)
+            elif cast(Path, out).suffix == ".zip":
+                ds = [xr.open_dataset(fn) for fn in self.ind_outputs[key]]
+            else:
+                raise ValueError
+            self._output_handles[key] = ds
+
+        return self._output_handles[key]
+
+    def _close_outputs(self):
+        """Close the datasets opened from the outputs of the previous run."""
+        for handle in self._output_handles.values():
+            for ds in handle if isinstance(handle, list) else [handle]:
+                if isinstance(ds, xr.Dataset):
+                    ds.close()
+        self._output_handles = {}
 
     @property
     def solution(self):
@@ -604,6 +1295,36 @@ class Raven:
             ]
             return zip(*states)
 
+    @property
+    def resource_usage(self) -> xr.Dataset:
+        """Return the resources used by the process of each parallel simulation of the last run.
+
+        Values are NaN when they are not available, for instance for simulations restored from the result cache, or
+        CPU times and memory of processes launched with `acall`.
+        """
+        attrs = {
+            "max_rss": dict(long_name="Peak resident set size", units="B"),
+            "user_time": dict(long_name="User CPU time", units="s"),
+            "system_time": dict(long_name="System CPU time", units="s"),
+            "wall_time": dict(long_name="Wall-clock time", units="s"),
+            "bytes_written": dict(long_name="Size of output files", units="B"),
+        }
+
+        data = {key: [] for key in attrs}
+        for proc in self.processes:
+            for key in ["max_rss", "user_time", "system_time"]:
+                data[key].append(proc.rusage.get(key, np.nan))
+            data["wall_time"].append(np.nan if proc.cached else proc.duration)
+            data["bytes_written"].append(proc.bytes_written)
+
+        dim = self._pdim or "pdim"
+        return xr.Dataset(
+            {
+                key: (dim, np.array(values, dtype=float), attrs[key])
+                for key, values in data.items()
+            }
+        )
+
     @property
     def diagnostics(self):
         """Return a nested dictionary of performance metrics keyed by diagnostic name and period. The default period
@@ -612,23 +1333,8 @@ class Raven:
         run_name = self.config.rvi.run_name or ""
         pattern = f"{run_name}*Diagnostics.csv"
 
-        diag = []
-        out = collections.defaultdict(list)
         fns = self._get_output(pattern, path=self.exec_path)
-
-        for fn in fns:
-            with open(fn) as f:
-                reader = csv.reader(f.readlines())
-                header = next(reader)
-                for row in reader:
-                    for key, val in zip(header, row):
-                        if "DIAG" in key:
-                            val = float(val)  # type: ignore
-                        out[key].append(val)
-
-                out.pop("")
-
-            diag.append(out)
+        diag = [read_diagnostics(fn) for fn in fns]
         return diag if len(diag) > 1 else diag[0]
 
 
@@ -655,6 +1361,9 @@ class Ostrich(Raven):
         kwds["identifier"] = kwds.get("identifier", "ostrich-generic")
         super().__init__(*args, **kwds)
 
+        # Configuration hash of the evaluations of the current run in `store`
+        self._store_key: Optional[str] = None
+
     @property
     def model_path(self):
         return self.exec_path / self.model_dir
@@ -679,6 +1388,114 @@ class Ostrich(Raven):
         """Path to Ostrich parallel process directory."""
         return self.exec_path / "processor_0"  # /'model' / 'output' ?
 
+    def _cache_key(self, ts):
+        """Ostrich runs are not cached."""
+        return None
+
+    def run(self, ts, overwrite=False, parallel={}, **kwds):
+        """Run the model, see `Raven.run`.
+
+        If an evaluation store is set in `store`, the evaluations listed in the OstModel files of a previous run in
+        the working directory with the same configuration, e.g. killed before completion, are added to it. Ostrich is
+        then warm started from the stored evaluations, so that they are not run again.
+        """
+        self._store_key = None
+        if self.store is not None:
+            ts = self._configure(ts, **kwds)
+            metric = self.config.rvi._evaluation_metrics[0]
+            self._store_key = self._config_hash(
+                ts, objective_name(f"DIAG_{metric.value}")
+            )
+            self._import_evaluations()
+
+        return super().run(ts, overwrite, parallel=parallel, **kwds)
+
+    def _ost_param_names(self) -> List[str]:
+        """Names of the parameters calibrated by Ostrich, in the order of the BeginParams block."""
+        content = self.config.ost.content or self.config.ost.to_rv()
+        block = re.search(
+            r"^\s*BeginParams\s*$(.*?)^\s*EndParams", content, re.MULTILINE | re.DOTALL
+        )
+        if block is None:
+            return []
+        names = []
+        for line in block.group(1).splitlines():
+            values = line.split("#", 1)[0].split()
+            if values:
+                names.append(values[0])
+        return names
+
+    def _store_param_names(self) -> List[str]:
+        """Ostrich names of the parameters, in the order of the parameter sets of `store`."""
+        if hasattr(self, "Params"):
+            o2r = getattr(self, "ostrich_to_raven_param_conversion", {})
+            r2o = {r: o for o, r in o2r.items()}
+            return [r2o.get(f.name, f.name) for f in fields(self.Params)]
+        return self._ost_param_names()
+
+    def _import_evaluations(self):
+        """Add the evaluations listed in the OstModel files of the working directory to `store`.
+
+        The files are only read if they were written by a run with the current configuration.
+        """
+        fn = self.exec_path / "evaluations.key"
+        if not fn.exists() or fn.read_text().strip() != self._store_key:
+            return
+
+        names = self._store_param_names()
+        # Ostrich minimizes the diagnostic multiplied by this factor
+        multiplier = self.config.ost.evaluation_metric_multiplier
+        for fn in sorted(self.exec_path.glob("OstModel?.txt")):
+            with open(fn) as f:
+                header = f.readline().split()
+                if not set(names) <= set(header):
+                    continue
+                cols = [header.index(name) for name in names]
+                for line in f:
+                    try:
+                        values = [float(v) for v in line.split()]
+                    except ValueError:
+                        continue
+                    # Lines may be incomplete if Ostrich was killed
+                    if len(values) != len(header) or not np.isfinite(values[1]):
+                        continue
+                    self.store.put(
+                        self._store_key,
+                        [values[i] for i in cols],
+                        values[1] / multiplier,
+                    )
+
+    def _write_warm_start(self):
+        """Write the stored evaluations of the configuration in the OstModel file Ostrich is warm started from."""
+        (self.exec_path / "evaluations.key").write_text(self._store_key)
+
+        ost = self.config.ost
+        ost.warm_start = False
+        if ost.content or self._store_key not in self.store.configs:
+            # Ostrich configuration files are not templates
+            return
+
+        x, y = self.store.history(self._store_key)
+        if ost.lowerBounds is not None and ost.upperBounds is not None:
+            low = np.asarray(astuple(ost.lowerBounds), dtype=float)
+            high = np.asarray(astuple(ost.upperBounds), dtype=float)
+            inside = np.all((x >= low) & (x <= high), axis=1)
+            x, y = x[inside], y[inside]
+
+        ost_names = self._ost_param_names()
+        names = self._store_param_names()
+        if not len(y) or sorted(ost_names) != sorted(names):
+            return
+
+        multiplier = ost.evaluation_metric_multiplier
+        cols = [names.index(name) for name in ost_names]
+        lines = ["Run   obj.function   " + "  ".join(ost_names)]
+        for i, (p, v) in enumerate(zip(x, y)):
+            values = "  ".join(f"{p[j]:E}" for j in cols)
+            lines.append(f"{i:<4d}  {multiplier * v:E}  {values}")
+        (self.exec_path / "OstModel0.txt").write_text("\n".join(lines) + "\n")
+        ost.warm_start = True
+
     def write_save_best(self):
         fn = self.exec_path / "save_best.sh"
         fn.write_text(save_best)
@@ -735,6 +1552,9 @@ class Ostrich(Raven):
 
         super()._dump_rv()
 
+        if self._store_key is not None:
+            self._write_warm_start()
+
         # ostIn.txt
         fn = self.exec_path / "ostIn.txt"
         with open(fn, "w") as f:
@@ -770,6 +1590,9 @@ class Ostrich(Raven):
                 fns = fns[0]
             self.outputs[key] = fns
 
+        if self._store_key is not None:
+            self._import_evaluations()
+
         try:
             if is_dataclass(self.calibrated_params):
                 self.outputs["calibparams"] = ", ".join(
@@ -865,6 +1688,45 @@ class Ostrich(Raven):
         return np.loadtxt(self.outputs["params_seq"], skiprows=1)[-1, 2:]
 
 
+def _rv_size(model):
+    """Return the number of bytes of the RV files rendered for the current simulation."""
+    return sum(len(content.encode()) for content in model._rv_contents.values())
+
+
+def _file_size(fn):
+    """Return the size of a file in bytes, or None if `fn` is not a file path."""
+    if isinstance(fn, Path) and fn.is_file():
+        return fn.stat().st_size
+    return None
+
+
+def get_raven_version(raven_exec: Union[str, Path]) -> str:
+    """Return the version of a Raven executable.
+
+    The version is read from the output of the executable, which is run once per path and modification time for the
+    lifetime of the Python process.
+    """
+    path = os.path.realpath(raven_exec)
+    key = (path, os.stat(path).st_mtime_ns)
+
+    with _RAVEN_VERSIONS_LOCK:
+        if key not in _RAVEN_VERSIONS:
+            # Raven writes a Raven_errors.txt file in its working directory
+            with tempfile.TemporaryDirectory() as tmp:
+                out = subprocess.check_output([path], input="\n", text=True, cwd=tmp)
+            match = re.search(r"Version (\S+) ", out)
+            if not match:
+                raise AttributeError(f"Raven version not found: {out}")
+            _RAVEN_VERSIONS[key] = match.groups()[0]
+
+        return _RAVEN_VERSIONS[key]
+
+
+def _natural_key(fn):
+    """Sort key comparing the numbers in a path by their value."""
+    return [int(s) if s.isdigit() else s for s in re.split(r"(\d+)", str(fn))]
+
+
 def get_diff_level(files):
     """Return the lowest hierarchical file parts level at which there are differences among file paths."""
 
@@ -873,6 +1735,27 @@ def get_diff_level(files):
             return i
 
 
+def read_variable(fn, name):
+    """Read a single variable of a NetCDF file as a NumPy array, with missing values set to NaN."""
+    import netCDF4 as nc4
+
+    with nc4.Dataset(fn) as nc:
+        return np.ma.filled(nc.variables[name][:].astype(float), np.nan)
+
+
+def read_diagnostics(fn) -> Dict[str, list]:
+    """Read a Raven diagnostics file, returning the values of each column keyed by its name."""
+    out = collections.defaultdict(list)
+    with open(fn) as f:
+        reader = csv.reader(f.readlines())
+        header = next(reader)
+        for row in reader:
+            for key, val in zip(header, row):
+                out[key].append(float(val) if "DIAG" in key else val)
+    out.pop("", None)
+    return dict(out)
+
+
 def make_executable(fn):
     """Make file executable."""
     st = os.stat(fn)
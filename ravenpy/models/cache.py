@@ -0,0 +1,189 @@
+"""
+Result cache
+------------
+
+Content-addressed, on-disk cache of Raven simulation outputs. Simulations are identified by the rendered content of
+their RV files, the identity of their forcing files and the Raven version, so that re-running the exact same
+configuration (e.g. repeated calibration samples or regionalization donors) can reuse stored outputs instead of
+spawning Raven.
+
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+# Lines of rendered RV files that change from one rendering to the next without affecting the simulation.
+VOLATILE_LINES = re.compile(
+    r"^\s*(:CreationDate|:NetCDFAttribute history).*$", flags=re.MULTILINE
+)
+
+
+def file_identity(fn: Union[str, Path]) -> str:
+    """Return a string identifying the content of a forcing file without reading it.
+
+    Local files are identified by their real path, size and modification time, while URLs are identified by
+    themselves.
+    """
+    if isinstance(fn, str) and fn.startswith("http"):
+        return fn
+    path = os.path.realpath(fn)
+    st = os.stat(path)
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class ResultCache:
+    """On-disk cache of Raven outputs with size-based LRU eviction.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+      Cache directory. Defaults to the `RAVENPY_CACHE_DIR` environment variable, or `~/.raven_cache`.
+    max_size : int
+      Maximum size of the cache in bytes. When it is exceeded, least recently used entries are evicted until the
+      cache is below `low_water` times `max_size`, so that entries are not listed on every store.
+
+    Examples
+    --------
+    >>> model = GR4JCN()
+    >>> model.cache = ResultCache(max_size=2**30)
+    >>> model(ts, params=...)  # Runs Raven and stores outputs
+    >>> model(ts, params=...)  # Reuses stored outputs
+    >>> model.cache.hits
+    1
+    """
+
+    low_water = 0.9
+
+    def __init__(self, path: Union[str, os.PathLike] = None, max_size: int = 2**30):
+        path = path or os.getenv("RAVENPY_CACHE_DIR") or Path.home() / ".raven_cache"
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # Running total of the cache size, computed on the first store. Entries stored by other processes are only
+        # accounted for when entries are evicted.
+        self._total: Optional[int] = None
+
+    @staticmethod
+    def key(rv_contents: Sequence[str], forcings: Sequence, raven_version: str) -> str:
+        """Return the cache key of a simulation.
+
+        Parameters
+        ----------
+        rv_contents : sequence of str
+          Rendered content of the RV files.
+        forcings : sequence
+          Paths or URLs of the forcing files.
+        raven_version : str
+          Version of the Raven executable.
+        """
+        h = hashlib.sha256()
+        h.update(raven_version.encode())
+        for content in rv_contents:
+            h.update(b"\0")
+            h.update(VOLATILE_LINES.sub("", content).encode())
+        for fn in forcings:
+            h.update(b"\0")
+            h.update(file_identity(fn).encode())
+        return h.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.path / key
+
+    def get(self, key: str, dest: Union[str, os.PathLike]) -> bool:
+        """Copy the outputs stored under `key` in the `dest` directory.
+
+        Returns
+        -------
+        bool
+          Whether the key was found in the cache.
+        """
+        entry = self._entry(key)
+        if not entry.is_dir():
+            self.misses += 1
+            return False
+
+        dest = Path(dest)
+        dest.mkdir(parents=True, exist_ok=True)
+        try:
+            for fn in entry.iterdir():
+                shutil.copy2(fn, dest / fn.name)
+
+            # Mark the entry as recently used
+            os.utime(entry)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def put(self, key: str, src: Union[str, os.PathLike]):
+        """Store the files of the `src` directory under `key`, then evict entries if the cache is too large."""
+        entry = self._entry(key)
+        if entry.exists():
+            return
+
+        if self._total is None:
+            self._total = self.size
+
+        # Write in a temporary directory first so that concurrent readers never see partial entries
+        tmp = Path(tempfile.mkdtemp(dir=self.path, prefix=".tmp-"))
+        try:
+            for fn in Path(src).iterdir():
+                if fn.is_file():
+                    shutil.copy2(fn, tmp / fn.name)
+            os.replace(tmp, entry)
+            self._total += self._size(entry)
+        except OSError:
+            # Another process stored the same entry in the meantime
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        if self._total > self.max_size:
+            self.evict(int(self.low_water * self.max_size))
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached outputs in bytes."""
+        return sum(s for _, s in self._stats().values())
+
+    def evict(self, max_size: Optional[int] = None):
+        """Remove least recently used entries until the cache size is below `max_size`."""
+        max_size = self.max_size if max_size is None else max_size
+        stats = self._stats()
+        entries = sorted(stats, key=lambda e: stats[e][0])
+        total = sum(s for _, s in stats.values())
+        for entry in entries:
+            if total <= max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= stats[entry][1]
+        self._total = total
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        self.evict(max_size=0)
+        self.hits = self.misses = 0
+
+    def _entries(self):
+        return [p for p in self.path.iterdir() if p.is_dir() and p.name[0] != "."]
+
+    def _stats(self) -> Dict[Path, Tuple[float, int]]:
+        """Return the modification time and size of each entry, skipping entries removed by other processes."""
+        out = {}
+        for entry in self._entries():
+            try:
+                out[entry] = (entry.stat().st_mtime, self._size(entry))
+            except FileNotFoundError:
+                continue
+        return out
+
+    @staticmethod
+    def _size(entry: Path) -> int:
+        return sum(fn.stat().st_size for fn in entry.iterdir())
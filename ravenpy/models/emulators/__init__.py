@@ -1,11 +1,65 @@
-from .blended import *
-from .canadianshield import *
-from .gr4jcn import *
-from .hbvec import *
-from .hmets import *
-from .hypr import *
-from .mohyse import *
-from .sacsma import *
+"""Emulated models.
+
+Emulator modules are only imported when one of their classes is first accessed, so that importing this package is
+cheap.
+"""
+import importlib
+
+# Emulator classes, keyed by the module defining them
+_MODULES = {
+    "blended": ["BLENDED", "BLENDED_OST"],
+    "canadianshield": ["CANADIANSHIELD", "CANADIANSHIELD_OST"],
+    "gr4jcn": ["GR4JCN", "GR4JCN_OST"],
+    "hbvec": ["HBVEC", "HBVEC_OST"],
+    "hmets": ["HMETS", "HMETS_OST"],
+    "hypr": ["HYPR", "HYPR_OST"],
+    "mohyse": ["MOHYSE", "MOHYSE_OST"],
+    "sacsma": ["SACSMA", "SACSMA_OST"],
+}
+_EMULATORS = {name: module for module, names in _MODULES.items() for name in names}
+
+# Classes imported by the emulator modules, which used to be re-exported here, keyed by the module defining them
+_REEXPORTS = {
+    "ravenpy.config": ["ConfigError"],
+    "ravenpy.config.commands": [
+        "BaseDataCommand",
+        "BasinIndexCommand",
+        "HRU",
+        "HRUState",
+        "LU",
+        "Sub",
+    ],
+    "ravenpy.config.rvs": ["RVH", "RVI"],
+    "ravenpy.models.base": ["Ostrich", "Raven"],
+}
+_ATTRIBUTES = {name: module for module, names in _REEXPORTS.items() for name in names}
+
+# Modules imported by the emulator modules, which used to be re-exported here
+_SUBMODULES = {"options": "ravenpy.config.options"}
+
+__all__ = sorted(_EMULATORS) + ["get_model"]
+
+
+def __getattr__(name):
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if name in _EMULATORS:
+        module = importlib.import_module(f".{_EMULATORS[name]}", __name__)
+        value = getattr(module, name)
+    elif name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(_ATTRIBUTES[name]), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(_SUBMODULES[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 
 def get_model(name):
@@ -20,11 +74,7 @@ def get_model(name):
     -------
     Raven model instance
     """
-    from ravenpy.models import emulators
-
-    model_cls = getattr(emulators, name.upper(), None)
-
-    if model_cls is None:
+    if name.upper() not in _EMULATORS:
         raise ValueError(f"Model {name} is not recognized.")
 
-    return model_cls
+    return __getattr__(name.upper())
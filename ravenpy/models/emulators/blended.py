@@ -528,7 +528,7 @@ class BLENDED_OST(Ostrich, BLENDED):
         ObjectiveFunction   GCOP
         ModelExecutable     ./ostrich-runs-raven.sh
         PreserveBestModel   ./save_best.sh
-        #OstrichWarmStart   yes
+        {warm_start}
 
         ModelSubdir processor_
 
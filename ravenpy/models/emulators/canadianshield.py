@@ -457,7 +457,7 @@ class CANADIANSHIELD_OST(Ostrich, CANADIANSHIELD):
         ObjectiveFunction   GCOP
         ModelExecutable     ./ostrich-runs-raven.sh
         PreserveBestModel   ./save_best.sh
-        #OstrichWarmStart   yes
+        {warm_start}
 
         ModelSubdir processor_
 
@@ -346,7 +346,7 @@ class GR4JCN_OST(Ostrich, GR4JCN):
         ObjectiveFunction   GCOP
         ModelExecutable     ./ostrich-runs-raven.sh
         PreserveBestModel   ./save_best.sh
-        #OstrichWarmStart   yes
+        {warm_start}
 
         ModelSubdir processor_
 
@@ -483,7 +483,7 @@ class HBVEC_OST(Ostrich, HBVEC):
         ObjectiveFunction   GCOP
         ModelExecutable     ./ostrich-runs-raven.sh
         PreserveBestModel   ./save_best.sh
-        #OstrichWarmStart   yes
+        {warm_start}
 
         ModelSubdir processor_
 
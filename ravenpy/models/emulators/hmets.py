@@ -376,7 +376,7 @@ class HMETS_OST(Ostrich, HMETS):
         ObjectiveFunction   GCOP
         ModelExecutable     ./ostrich-runs-raven.sh
         PreserveBestModel   ./save_best.sh
-        #OstrichWarmStart   yes
+        {warm_start}
 
         ModelSubdir processor_
 
@@ -0,0 +1,298 @@
+"""
+Evaluation store
+----------------
+
+Persistent store of the objective function of the parameter sets evaluated during calibrations. Evaluations are
+keyed by a hash of the model configuration and by the parameter vector rounded to a number of significant digits, so
+that samplers revisiting nearly identical parameter sets reuse stored values instead of running Raven again.
+
+Evaluations are appended to a JSON lines file as soon as they complete. This file is the checkpoint of the
+calibration: when the store is opened again, its evaluations are loaded, so that a calibration killed before
+completion can be resumed without running completed evaluations again.
+
+"""
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from ravenpy.models.cache import ResultCache
+
+# Lines of rendered RV files that vary across the parallel simulations of a run without affecting their results
+RUN_LINES = re.compile(r"^\s*:RunName.*$", flags=re.MULTILINE)
+
+
+def config_hash(
+    rv_contents: Sequence[str], forcings: Sequence, raven_version: str, *extra
+) -> str:
+    """Return a short hash identifying a model configuration.
+
+    The run name, which depends on the index of the simulation in parallel runs, is ignored, as well as the lines
+    ignored by `ResultCache.key`.
+
+    Parameters
+    ----------
+    rv_contents : sequence of str
+      Rendered content of the RV files, excluding the model parameters.
+    forcings : sequence
+      Paths or URLs of the forcing files.
+    raven_version : str
+      Version of the Raven executable.
+    *extra
+      Other values identifying the evaluations, e.g. the name of the objective function.
+    """
+    contents = [RUN_LINES.sub("", c) for c in rv_contents] + [str(e) for e in extra]
+    return ResultCache.key(contents, forcings, raven_version)[:16]
+
+
+def objective_name(diagnostic: str, obj_func=None) -> str:
+    """Return the name identifying an objective function in the evaluation keys.
+
+    This is the name of the Raven diagnostic if `obj_func` is None, else the `name` attribute of `obj_func`, set by
+    `ravenpy.utilities.metrics.objective`, or its qualified name.
+    """
+    if obj_func is None:
+        return diagnostic
+    name = getattr(obj_func, "name", None)
+    if name is None:
+        name = f"{obj_func.__module__}.{getattr(obj_func, '__qualname__', obj_func)}"
+    return name
+
+
+class EvaluationStore:
+    """Persistent store of evaluated parameter sets and of their objective function.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+      JSON lines file the evaluations are appended to. Evaluations already in the file are loaded. If None,
+      evaluations are only kept in memory.
+    digits : int
+      Number of significant digits of the parameters in the keys: parameter sets that are equal once rounded are
+      considered duplicates.
+
+    Notes
+    -----
+    Several processes may append to the same file, e.g. the workers of a parallel sampler, but they only see the
+    evaluations of the others once the store is opened again.
+
+    Examples
+    --------
+    >>> model = GR4JCN()
+    >>> model.store = EvaluationStore("evaluations.jsonl")
+    >>> model.evaluate(ts, params)  # Runs Raven and stores the objective functions
+    >>> model.evaluate(ts, params)  # Reuses stored objective functions
+    >>> model.store.hits
+    1
+    >>> model.store.to_netcdf("history.nc")
+    """
+
+    def __init__(self, path: Union[str, os.PathLike] = None, digits: int = 8):
+        self.path = Path(path) if path else None
+        self.digits = digits
+        self.hits = 0
+        self.misses = 0
+
+        # Evaluations, in the order they were stored
+        self._configs: List[str] = []
+        self._params: List[Tuple[float, ...]] = []
+        self._objectives: List[float] = []
+        self._times: List[float] = []
+        # Index of the evaluations, keyed by configuration and rounded parameters
+        self._index: Dict[Tuple[str, Tuple[float, ...]], int] = {}
+        self._lock = threading.Lock()
+
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._objectives)
+
+    def key(self, config: str, params) -> Tuple[str, Tuple[float, ...]]:
+        """Return the key of a parameter set evaluated with the configuration identified by `config`."""
+        return config, tuple(float(f"{v:.{self.digits}g}") for v in params)
+
+    def __contains__(self, key) -> bool:
+        config, params = key
+        return self.key(config, params) in self._index
+
+    def get(self, config: str, params) -> Optional[float]:
+        """Return the objective function of a parameter set, or None if it was not evaluated."""
+        i = self._index.get(self.key(config, params))
+        if i is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._objectives[i]
+
+    def put(self, config: str, params, objective: float):
+        """Store the objective function of a parameter set, and append it to the file."""
+        params = tuple(map(float, params))
+        key = self.key(config, params)
+        with self._lock:
+            if key in self._index:
+                return
+            t = time.time()
+            self._add(key, config, params, float(objective), t)
+
+            if self.path is not None:
+                record = dict(
+                    config=config, params=params, objective=float(objective), time=t
+                )
+                line = (json.dumps(record) + "\n").encode()
+                # A single write in append mode, so that records of concurrent processes are not interleaved
+                fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    # Start on a new line if the file ends with an incomplete record
+                    size = os.fstat(fd).st_size
+                    if size and os.pread(fd, 1, size - 1) != b"\n":
+                        line = b"\n" + line
+                    os.write(fd, line)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def _add(self, key, config, params, objective, t):
+        self._index[key] = len(self._objectives)
+        self._configs.append(config)
+        self._params.append(params)
+        self._objectives.append(objective)
+        self._times.append(t)
+
+    def _load(self):
+        """Load the evaluations of the file, skipping the incomplete record written by a killed process, if any.
+
+        The file is left as is, since other processes may be appending to it.
+        """
+        data = self.path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                r = json.loads(line)
+                params = tuple(map(float, r["params"]))
+                record = (r["config"], params, float(r["objective"]), r["time"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            key = self.key(record[0], params)
+            if key not in self._index:
+                self._add(key, *record)
+
+    @property
+    def configs(self) -> List[str]:
+        """Hashes of the configurations of the stored evaluations."""
+        return list(dict.fromkeys(self._configs))
+
+    def history(self, config: str = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the parameter sets and objective functions evaluated with a configuration, in the order they were
+        stored.
+
+        Parameters
+        ----------
+        config : str, optional
+          Configuration hash. Only needed if evaluations of several configurations are stored.
+
+        Returns
+        -------
+        np.ndarray
+          Parameter sets, of shape (n_evaluations, n_params).
+        np.ndarray
+          Objective functions.
+        """
+        idx = self._select(config)
+        x = np.array([self._params[i] for i in idx], dtype=float)
+        y = np.array([self._objectives[i] for i in idx], dtype=float)
+        return (x if len(idx) else np.empty((0, 0))), y
+
+    def _select(self, config: str = None) -> List[int]:
+        if config is None:
+            configs = self.configs
+            if len(configs) > 1:
+                raise ValueError(
+                    f"Evaluations of {len(configs)} configurations are stored, `config` should be given."
+                )
+            return list(range(len(self)))
+        return [i for i, c in enumerate(self._configs) if c == config]
+
+    def to_dataframe(self, config: str = None, names: Sequence[str] = None):
+        """Return the evaluations of a configuration as a table, with one row per evaluation.
+
+        Parameters
+        ----------
+        config : str, optional
+          Configuration hash. Only needed if evaluations of several configurations are stored.
+        names : sequence of str, optional
+          Parameter names. Defaults to "x0", "x1", ...
+
+        Returns
+        -------
+        pd.DataFrame
+          Time the evaluation was stored, objective function and parameters.
+        """
+        x, y = self.history(config)
+        names = list(names or (f"x{i}" for i in range(x.shape[1])))
+        if len(names) != x.shape[1]:
+            raise ValueError(
+                f"Expected {x.shape[1]} parameter names, got {len(names)}."
+            )
+
+        idx = self._select(config)
+        df = pd.DataFrame(
+            {
+                "time": pd.to_datetime([self._times[i] for i in idx], unit="s"),
+                "objective": y,
+            }
+        )
+        for name, values in zip(names, x.T):
+            df[name] = values
+        df.index.name = "evaluation"
+        return df
+
+    def to_dataset(self, config: str = None, names: Sequence[str] = None) -> xr.Dataset:
+        """Return the evaluations of a configuration as a dataset, see `to_dataframe`.
+
+        Parameters are stored in a single (evaluation, param) variable.
+        """
+        df = self.to_dataframe(config, names)
+        names = list(df.columns[2:])
+        ds = xr.Dataset(
+            {
+                "objective": ("evaluation", df["objective"].to_numpy()),
+                "params": (("evaluation", "param"), df[names].to_numpy()),
+            },
+            coords={
+                "evaluation": df.index.to_numpy(),
+                "param": names,
+                "time": ("evaluation", df["time"].to_numpy()),
+            },
+        )
+        ds.attrs["config"] = config or (self.configs[0] if len(self) else "")
+        return ds
+
+    def to_netcdf(self, fn, config: str = None, names: Sequence[str] = None):
+        """Write the evaluations of a configuration to a NetCDF file, see `to_dataset`."""
+        ds = self.to_dataset(config, names)
+        encoding = {v: {"zlib": True} for v in ("objective", "params")}
+        ds.to_netcdf(fn, encoding=encoding)
+
+    def to_parquet(self, fn, config: str = None, names: Sequence[str] = None):
+        """Write the evaluations of a configuration to a Parquet file, see `to_dataframe`.
+
+        This requires `pyarrow` or `fastparquet`.
+        """
+        self.to_dataframe(config, names).to_parquet(fn)
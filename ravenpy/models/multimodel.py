@@ -80,6 +80,8 @@ class RavenMultiModel(Raven):
             "diagnostics": "*Diagnostics.csv",
         }
 
+        self._close_outputs()
+
         for key, pattern in patterns.items():
             # There are no diagnostics if a streamflow time series is not provided.
             try:
@@ -90,7 +92,6 @@ class RavenMultiModel(Raven):
                 else:
                     continue
 
-            fns.sort()
             self.ind_outputs[key] = fns
             self.outputs[key] = self._merge_output(fns, pattern[1:])
 
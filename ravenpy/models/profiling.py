@@ -0,0 +1,190 @@
+"""
+Profiling
+---------
+
+Opt-in instrumentation of the model lifecycle. When a `Profiler` is attached to a model, each phase of a simulation
+(RV rendering, process execution, output merging, etc.) emits a timing event, which is sent to pluggable sinks and
+aggregated into a summary.
+
+>>> model = GR4JCN()
+>>> model.profiler = Profiler(sinks=[LoggingSink(), JSONLinesSink("events.jsonl")])
+>>> model(ts, ...)
+>>> model.profiler.summary()["run"]["total"]
+
+"""
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+Event = Dict[str, Any]
+
+LOGGER = logging.getLogger("ravenpy.profiling")
+
+
+class LoggingSink:
+    """Send events to a logger.
+
+    Parameters
+    ----------
+    logger : logging.Logger, optional
+      Logger receiving the events. Defaults to the `ravenpy.profiling` logger.
+    level : int
+      Logging level.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level=logging.INFO):
+        self.logger = logger or LOGGER
+        self.level = level
+
+    def __call__(self, event: Event):
+        self.logger.log(self.level, json.dumps(event, default=str))
+
+
+class JSONLinesSink:
+    """Append events to a JSON-lines file, one event per line.
+
+    Parameters
+    ----------
+    path : str or Path
+      Path to the output file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event):
+        line = json.dumps(event, default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+class Profiler:
+    """Collect timing events for the phases of model simulations.
+
+    Parameters
+    ----------
+    sinks : sequence of callables
+      Functions called with each event, a dictionary with the `phase` name, the parallel `member` (None for phases
+      covering all members), the `start` time (seconds since the epoch), the `duration` in seconds, and for some
+      phases the `size` in bytes of the files written.
+    keep_events : bool
+      Whether to keep the events in memory, in `Profiler.events`.
+    """
+
+    def __init__(
+        self,
+        sinks: Sequence[Callable[[Event], Any]] = (),
+        keep_events: bool = True,
+    ):
+        self.sinks = list(sinks)
+        self.keep_events = keep_events
+        self.events: List[Event] = []
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str, member: Optional[int] = None, **info):
+        """Time the enclosed block as a phase. Entries added to the yielded dictionary are included in the event."""
+        extra: Dict[str, Any] = {}
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.record(
+                name,
+                duration=time.perf_counter() - t0,
+                member=member,
+                start=start,
+                **info,
+                **extra,
+            )
+
+    def record(
+        self,
+        name: str,
+        duration: float,
+        member: Optional[int] = None,
+        start: Optional[float] = None,
+        **info,
+    ):
+        """Record a phase timed elsewhere."""
+        event = dict(
+            phase=name,
+            member=member,
+            start=start if start is not None else time.time() - duration,
+            duration=duration,
+            **info,
+        )
+
+        with self._lock:
+            if self.keep_events:
+                self.events.append(event)
+
+            s = self._stats.setdefault(
+                name,
+                dict(count=0, total=0.0, min=float("inf"), max=0.0, size=0),
+            )
+            s["count"] += 1
+            s["total"] += duration
+            s["min"] = min(s["min"], duration)
+            s["max"] = max(s["max"], duration)
+            s["size"] += info.get("size") or 0
+
+        for sink in self.sinks:
+            sink(event)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return the number of events, total, mean, min and max durations and total size written, keyed by phase."""
+        with self._lock:
+            return {
+                name: dict(s, mean=s["total"] / s["count"])
+                for name, s in self._stats.items()
+            }
+
+    def reset(self):
+        """Discard collected events and statistics."""
+        with self._lock:
+            self.events = []
+            self._stats = {}
+
+
+def timed(
+    name: str,
+    member: bool = False,
+    size: Optional[Callable[[Any, Any], Optional[int]]] = None,
+):
+    """Decorate a model method so that it is timed as a phase when the model has a profiler.
+
+    Parameters
+    ----------
+    name : str
+      Phase name.
+    member : bool
+      Whether the phase applies to a single parallel member, identified by the model's `psim` attribute.
+    size : callable, optional
+      Function called with the model and the method's return value, returning the number of bytes written.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, "profiler", None)
+            if profiler is None:
+                return func(self, *args, **kwargs)
+
+            with profiler.phase(name, member=self.psim if member else None) as extra:
+                out = func(self, *args, **kwargs)
+                if size is not None:
+                    extra["size"] = size(self, out)
+            return out
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,566 @@
+"""
+Process scheduling
+------------------
+
+Tools to launch the Raven (or Ostrich) executable for each member of a parallel simulation while bounding the number
+of processes running at the same time.
+
+"""
+import asyncio
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Final status of processes that did not complete successfully
+FAILED = ("failed", "timeout", "cancelled")
+
+
+def parse_raven_messages(paths: Sequence[Path]) -> Dict[str, Any]:
+    """Parse Raven_errors.txt files and extract the messages, structured by types.
+
+    Parameters
+    ----------
+    paths : sequence of Path
+      Paths to Raven_errors.txt files.
+
+    Returns
+    -------
+    dict
+      Lists of messages keyed by type ("ERROR", "WARNING", "ADVISORY"), and a "SIMULATION COMPLETE" flag.
+    """
+    messages: Dict[str, Any] = {
+        "ERROR": [],
+        "WARNING": [],
+        "ADVISORY": [],
+        "SIMULATION COMPLETE": False,
+    }
+    for p in paths:
+        # The error message for an unknown command is exceptionally on two lines
+        # (the second starts with a triple space)
+        for m in re.findall("^([A-Z ]+) :(.+)(?:\n   (.+))?", p.read_text(), re.M):
+            if m[0] == "SIMULATION COMPLETE":
+                messages["SIMULATION COMPLETE"] = True
+                continue
+            msg_type = m[0]
+            msg = f"{m[1]} {m[2]}".strip()
+            if msg == "Errors found in input data. See Raven_errors.txt for details":
+                # Skip this one because it's a bit circular
+                continue
+            messages[msg_type].append(msg)
+
+    return messages
+
+
+def merge_raven_messages(messages: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the messages of multiple processes into a single structure."""
+    out: Dict[str, Any] = {
+        "ERROR": [],
+        "WARNING": [],
+        "ADVISORY": [],
+        "SIMULATION COMPLETE": False,
+    }
+    for m in messages:
+        for key in ["ERROR", "WARNING", "ADVISORY"]:
+            out[key].extend(m[key])
+        out["SIMULATION COMPLETE"] |= m["SIMULATION COMPLETE"]
+    return out
+
+
+@dataclass
+class RavenProcess:
+    """A single execution of the Raven (or Ostrich) executable.
+
+    Instances are created by `Raven.run` for every member of a parallel simulation, and are launched by a
+    `WorkerPool`, which fills in the results once the process has exited.
+    """
+
+    index: int
+    """Index of the member along the parallel dimension."""
+    cmd: List[Any]
+    """Command line arguments."""
+    cwd: Path
+    """Working directory of the process, searched recursively for Raven_errors.txt files."""
+    returncode: Optional[int] = None
+    """Exit status of the process, None if it has not been run."""
+    stdout: str = ""
+    """Standard output of the process."""
+    messages: Dict[str, Any] = field(default_factory=dict)
+    """Messages found in the Raven_errors.txt files, keyed by type."""
+    output_path: Optional[Path] = None
+    """Directory where Raven writes its outputs."""
+    cache_key: Optional[str] = None
+    """Key of the simulation in the result cache, if any."""
+    cached: bool = False
+    """Whether outputs were restored from the result cache instead of running the process."""
+    duration: Optional[float] = None
+    """Wall-clock time in seconds between the start and the exit of the process."""
+    rusage: Dict[str, float] = field(default_factory=dict)
+    """Resource usage of the process and its descendants: peak resident set size in bytes (`max_rss`), user and
+    system CPU time in seconds (`user_time` and `system_time`). Only available on Unix, for synchronous runs."""
+    bytes_written: Optional[int] = None
+    """Total size in bytes of the files in the output directory once the process has exited."""
+    status: str = "pending"
+    """One of "pending", "completed", "failed" (error messages or killed by a signal), "timeout" (killed after
+    exceeding its time limit) or "cancelled" (killed or never started)."""
+    strict: bool = False
+    """Whether a non-zero exit status or a simulation not reported as complete in Raven_errors.txt are also
+    failures."""
+    attempts: int = 0
+    """Number of times the process has been started."""
+    _popen: Optional[subprocess.Popen] = field(default=None, repr=False, compare=False)
+    _killed: Optional[str] = field(default=None, repr=False, compare=False)
+    _pending_kill: Optional[str] = field(default=None, repr=False, compare=False)
+    # Serializes signals sent by `kill` with the reaping of the process, so that a reaped pid is never signalled
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_popen"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def failed(self) -> bool:
+        """Whether the process has run without completing successfully."""
+        return self.status in FAILED
+
+    @property
+    def reason(self) -> str:
+        """Description of the failure, empty if the process did not fail."""
+        if self.status == "timeout":
+            return f"Timed out after {self.duration:.1f} s"
+        if self.status == "cancelled":
+            return "Cancelled"
+        if self.status != "failed":
+            return ""
+        if self.messages.get("ERROR"):
+            return "\n".join(self.messages["ERROR"])
+        if self.returncode is not None and self.returncode < 0:
+            return f"Killed by signal {-self.returncode}"
+        if self.returncode:
+            return f"Exited with status {self.returncode}"
+        return "Simulation did not complete"
+
+    def reset(self):
+        """Clear the results of a previous attempt."""
+        self.returncode = None
+        self.stdout = ""
+        self.messages = {}
+        self.status = "pending"
+        self._killed = None
+        self._pending_kill = None
+
+    def kill(self, reason: str = "cancelled"):
+        """Kill the process if it is running, and mark it with `reason` ("timeout" or "cancelled").
+
+        A process killed before being started exits as soon as it is launched. A process that has already exited
+        is left as is.
+        """
+        with self._lock:
+            proc = self._popen
+            if proc is None:
+                self._pending_kill = self._pending_kill or reason
+                return
+            if proc.returncode is not None:
+                return
+            try:
+                if hasattr(os, "wait4"):
+                    # `Popen.kill` may reap the process, which is done by `_communicate_wait4`
+                    os.kill(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+            except OSError:
+                return
+            self._killed = self._killed or reason
+
+    def launch(self) -> subprocess.Popen:
+        """Start the process."""
+        return subprocess.Popen(
+            self.cmd,
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+
+    def run(self, timeout: Optional[float] = None):
+        """Start the process and block until it exits.
+
+        Parameters
+        ----------
+        timeout : float, optional
+          Maximum wall-clock time in seconds. If it is exceeded, the process is killed and its status is "timeout".
+        """
+        t0 = time.perf_counter()
+        self.attempts += 1
+        with self._lock:
+            proc = self._popen = self.launch()
+        if self._pending_kill:
+            # Cancelled while being launched
+            self.kill(self._pending_kill)
+
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, self.kill, args=("timeout",))
+            timer.daemon = True
+            timer.start()
+
+        try:
+            if hasattr(os, "wait4"):
+                self.stdout, self.returncode, self.rusage = _communicate_wait4(
+                    proc, "\n", self._lock
+                )
+            else:
+                # When Raven errors right away (for instance if it's missing an RV file)
+                # it asks for a RETURN to exit
+                self.stdout, _ = proc.communicate(input="\n")
+                self.returncode = proc.returncode
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with self._lock:
+                self._popen = None
+
+        self.duration = time.perf_counter() - t0
+        self._finish()
+        return self
+
+    async def arun(self, timeout: Optional[float] = None):
+        """Coroutine version of `run`.
+
+        Parameters
+        ----------
+        timeout : float, optional
+          Maximum wall-clock time in seconds. If it is exceeded, the process is killed and its status is "timeout".
+
+        If the coroutine is cancelled, the process is killed, its status is "cancelled" and `asyncio.CancelledError`
+        is propagated.
+        """
+        t0 = time.perf_counter()
+        self.attempts += 1
+        proc = await asyncio.create_subprocess_exec(
+            *map(str, self.cmd),
+            cwd=self.cwd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(b"\n"), timeout)
+            self.stdout = stdout.decode()
+        except asyncio.TimeoutError:
+            try:
+                proc.kill()
+                self._killed = "timeout"
+            except ProcessLookupError:
+                # Exited as the time limit was reached
+                pass
+            await proc.wait()
+        except BaseException:
+            self.status = "cancelled"
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+
+        self.duration = time.perf_counter() - t0
+        self.returncode = proc.returncode
+        self._finish()
+        return self
+
+    def _finish(self):
+        """Collect the outputs and set the status of the process once it has exited."""
+        self.bytes_written = self.output_size()
+        self.messages = self.read_messages()
+        if self._killed and (self.returncode is None or self.returncode < 0):
+            # A process exiting by itself just before being killed is not affected by the signal
+            self.status = self._killed
+        elif self.messages["ERROR"] or (
+            self.returncode is not None and self.returncode < 0
+        ):
+            self.status = "failed"
+        elif self.strict and (
+            self.returncode != 0 or not self.messages["SIMULATION COMPLETE"]
+        ):
+            self.status = "failed"
+        else:
+            self.status = "completed"
+
+    def restore(self):
+        """Mark the process as completed from outputs restored from the result cache."""
+        self.cached = True
+        self.returncode = 0
+        self.status = "completed"
+        self.messages = self.read_messages()
+        return self
+
+    def output_size(self) -> Optional[int]:
+        """Return the total size in bytes of the files in the output directory."""
+        if self.output_path is None or not Path(self.output_path).exists():
+            return None
+        return sum(
+            f.stat().st_size for f in Path(self.output_path).rglob("*") if f.is_file()
+        )
+
+    def read_messages(self) -> Dict[str, Any]:
+        """Parse the Raven_errors.txt files written by this process."""
+        return parse_raven_messages(sorted(Path(self.cwd).rglob("Raven_errors.txt")))
+
+
+def _communicate_wait4(
+    proc: subprocess.Popen, input: str, lock: Optional[threading.Lock] = None
+):
+    """Send `input` to the process, read its output until it exits and reap it with `os.wait4`.
+
+    The process is reaped and its exit status set while holding `lock`, so that `RavenProcess.kill` never signals
+    a pid that has been reaped, and possibly reused by another process. Waiting for the process to exit does not
+    hold `lock`, so that it can be killed in the meantime.
+
+    Returns the standard output, the exit status and the resource usage of the process.
+    """
+    try:
+        proc.stdin.write(input)
+        proc.stdin.close()
+    except BrokenPipeError:
+        # The process exited without reading its input
+        pass
+    stdout = proc.stdout.read()
+    proc.stdout.close()
+
+    lock = lock or threading.Lock()
+    if hasattr(os, "waitid"):
+        # Block until the process exits without reaping it, so that its pid can not be reused until it is reaped
+        # below, while holding `lock`
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        options = 0
+    else:
+        options = os.WNOHANG
+    while True:
+        with lock:
+            pid, status, ru = os.wait4(proc.pid, options)
+            if pid:
+                if os.WIFSIGNALED(status):
+                    proc.returncode = -os.WTERMSIG(status)
+                else:
+                    proc.returncode = os.WEXITSTATUS(status)
+                break
+        # Without `os.waitid` (e.g. on macOS), the process is polled. It usually exits as soon as its output is
+        # closed.
+        time.sleep(0.01)
+
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    rusage = dict(
+        max_rss=ru.ru_maxrss * scale,
+        user_time=ru.ru_utime,
+        system_time=ru.ru_stime,
+    )
+    return stdout, proc.returncode, rusage
+
+
+def is_transient(proc: RavenProcess) -> bool:
+    """Return whether a process failure is likely to be transient: a timeout or a kill by a signal."""
+    return proc.status == "timeout" or (
+        proc.status == "failed" and proc.returncode is not None and proc.returncode < 0
+    )
+
+
+@dataclass
+class RetryPolicy:
+    """Policy for running failed processes again.
+
+    Examples
+    --------
+    >>> model = GR4JCN(timeout=600, retry=RetryPolicy(attempts=3, delay=1))
+    """
+
+    attempts: int = 3
+    """Maximum number of times a process is started, including the first one."""
+    delay: float = 0.0
+    """Delay in seconds before the first retry."""
+    backoff: float = 2.0
+    """Factor by which the delay is multiplied after each retry."""
+    retry_on: Callable[[RavenProcess], bool] = is_transient
+    """Function returning whether a failed process should be run again. Defaults to timeouts and processes killed
+    by a signal, since errors reported by Raven itself do not go away by running it again."""
+
+    def __post_init__(self):
+        if self.attempts < 1:
+            raise ValueError(
+                f"`attempts` should be a positive integer: {self.attempts}"
+            )
+
+    def should_retry(self, proc: RavenProcess) -> bool:
+        """Return whether `proc` should be started again."""
+        return (
+            proc.status in ("failed", "timeout")
+            and proc.attempts < self.attempts
+            and self.retry_on(proc)
+        )
+
+    def wait(self, proc: RavenProcess) -> float:
+        """Return the delay before the next attempt of `proc`."""
+        return self.delay * self.backoff ** (proc.attempts - 1)
+
+
+class WorkerPool:
+    """Run Raven processes with a bounded number of concurrent workers.
+
+    Processes are queued and started as others finish, so that large ensembles do not oversubscribe the machine.
+    Failures do not interrupt the other processes: the status of each process tells whether it completed, failed,
+    timed out or was cancelled.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+      Maximum number of processes running at the same time. Defaults to the number of CPUs.
+    timeout : float, optional
+      Maximum wall-clock time in seconds for each process, after which it is killed.
+    retry : RetryPolicy, optional
+      Policy for running failed processes again. By default, processes are run once.
+    fail_fast : bool
+      Whether to cancel all remaining processes as soon as one of them fails.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        fail_fast: bool = False,
+    ):
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(
+                f"`max_workers` should be a positive integer: {max_workers}"
+            )
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.retry = retry
+        self.fail_fast = fail_fast
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._running: List[RavenProcess] = []
+        self._tasks: List[asyncio.Future] = []
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether `cancel` has been called."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Kill the running processes and skip the queued ones.
+
+        This method can be called from another thread than the one running the processes.
+        """
+        self._cancelled.set()
+        with self._lock:
+            for proc in self._running:
+                proc.kill("cancelled")
+            for task in self._tasks:
+                task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def _start(self, proc: RavenProcess) -> bool:
+        """Register `proc` as running, unless the pool has been cancelled."""
+        with self._lock:
+            if self.cancelled:
+                proc.status = "cancelled"
+                return False
+            proc.reset()
+            self._running.append(proc)
+            return True
+
+    def _stop(self, proc: RavenProcess) -> bool:
+        """Unregister `proc` and return whether it should be run again."""
+        with self._lock:
+            self._running.remove(proc)
+        if self.retry is not None and not self.cancelled:
+            if self.retry.should_retry(proc):
+                return True
+        if self.fail_fast and proc.failed and proc.status != "cancelled":
+            self.cancel()
+        return False
+
+    def _run(self, proc: RavenProcess) -> RavenProcess:
+        while self._start(proc):
+            proc.run(timeout=self.timeout)
+            if not self._stop(proc):
+                break
+            time.sleep(self.retry.wait(proc))
+        return proc
+
+    def run(self, procs: Sequence[RavenProcess]) -> List[RavenProcess]:
+        """Run all processes and return them once they have all exited."""
+        procs = list(procs)
+        if not procs:
+            return procs
+
+        n = min(self.max_workers, len(procs))
+        if n == 1:
+            return [self._run(p) for p in procs]
+
+        # Threads only wait on their child process, so they are cheap compared to the processes themselves.
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            return list(executor.map(self._run, procs))
+
+    async def arun(
+        self, procs: Sequence[RavenProcess], timeout: Optional[float] = None
+    ) -> List[RavenProcess]:
+        """Coroutine version of `run`.
+
+        Parameters
+        ----------
+        procs : sequence of RavenProcess
+          Processes to run.
+        timeout : float, optional
+          Maximum wall-clock time in seconds for each process. Defaults to the pool's `timeout`.
+
+        If the coroutine is cancelled, the processes still running are killed, those waiting in the queue are never
+        started, and `asyncio.CancelledError` is propagated.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def _run(proc):
+            try:
+                async with semaphore:
+                    while self._start(proc):
+                        await proc.arun(timeout=timeout)
+                        if not self._stop(proc):
+                            break
+                        await asyncio.sleep(self.retry.wait(proc))
+            except asyncio.CancelledError:
+                with self._lock:
+                    if proc in self._running:
+                        self._running.remove(proc)
+                if not self.cancelled:
+                    raise
+                # Cancelled by the pool rather than by the caller
+                proc.status = "cancelled"
+            return proc
+
+        tasks = [asyncio.ensure_future(_run(p)) for p in procs]
+        with self._lock:
+            self._tasks = tasks
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            with self._lock:
+                self._tasks = []
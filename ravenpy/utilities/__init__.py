@@ -1,4 +1,11 @@
-from .regionalization import read_gauged_params, read_gauged_properties, regionalize
+import importlib
+
+# Names imported on first access (PEP 562), to keep the import of this package cheap
+_ATTRIBUTES = {
+    "read_gauged_params": ".regionalization",
+    "read_gauged_properties": ".regionalization",
+    "regionalize": ".regionalization",
+}
 
 # TODO: Merge these into one message.
 gis_import_error_message = (
@@ -12,3 +19,15 @@ dev_import_error_message = (
     " `pip install ravenpy[dev]` recipe or via Anaconda (`conda env update -n ravenpy-env -f environment.yml`)"
     " from the RavenPy repository source files."
 )
+
+
+def __getattr__(name):
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTES))
@@ -5,12 +5,26 @@ Created on Sat Apr 30 16:18:54 2022
 @author: ets
 """
 
-import numpy as np
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, List, Tuple
+
 from spotpy.parameter import Uniform, generate
 
 
 class SpotpySetup:
-    def __init__(self, model, ts, obj_func=None):
+    def __init__(
+        self,
+        model,
+        ts,
+        obj_func=None,
+        diagnostic="DIAG_NASH_SUTCLIFFE",
+        store=None,
+    ):
         """
 
         Parameters
@@ -20,22 +34,48 @@ class SpotpySetup:
         ts: list
           Forcing files.
         obj_func: func
-          Objective function.
+          Objective function computed from the simulated and observed streamflows, of shape (1, time, nbasins) and
+          (time, nbasins), e.g. `ravenpy.utilities.metrics.objective("KLING_GUPTA")`. If None, the Raven
+          diagnostic is used.
+        diagnostic: str
+          Name of the Raven diagnostic used as objective function if `obj_func` is None.
+        store: EvaluationStore, optional
+          Store of the evaluated parameter sets, set as the `store` of the model. Parameter sets already evaluated
+          are not run again, so that a calibration killed before completion can be resumed by running the sampler
+          again with the same random seed. See `ravenpy.models.evaluations.EvaluationStore`.
+
+        Simulations can be run by spotpy's parallel samplers (`parallel="mpc"` or `"mpi"`), or from several threads:
+        each worker process and thread runs its own clone of the model, in a working directory created under
+        `<workdir>/workers`. Call `close`, or use the setup as a context manager, to remove the clones and their
+        working directories. Otherwise, they are removed when the setup is garbage collected or when the
+        interpreter exits.
+
+        The settings needed by the simulations (output files, error handling and `store`) are applied to the
+        clones, and to `model` only while it runs a simulation, so that `model` is left unchanged.
         """
         self.model = model
+        self.diagnostic = diagnostic
 
-        # Make sure no output is written to disk
-        self.model.config.rvi.suppress_output = True
+        self._owner = (os.getpid(), threading.get_ident())
+        self._init_workers()
 
         self.ts = ts
-
-        # Just a way to keep this example flexible and applicable to various examples
         self.obj_func = obj_func
+        self.store = store
 
-        # Initialize parameters
+        # Initialize parameters. The bounds are given explicitly, otherwise spotpy estimates them from random
+        # samples, and samplers seeded with `random_state` would not propose the same parameter sets when run again.
         self.params = []
         for i in range(0, len(model.low)):
-            self.params.append(Uniform(str(i), low=model.low[i], high=model.high[i]))
+            self.params.append(
+                Uniform(
+                    str(i),
+                    low=model.low[i],
+                    high=model.high[i],
+                    minbound=model.low[i],
+                    maxbound=model.high[i],
+                )
+            )
 
     def evaluation(self):
         """In theory this method should return the true value. Since Raven computes the objective function,
@@ -46,21 +86,125 @@ class SpotpySetup:
         """Return a random parameter combination."""
         return generate(self.params)
 
-    def simulation(self, x):
-        """Run the model, but return a placeholder value."""
+    def _init_workers(self):
+        # Clone run by each thread of this process, and all the clones created by this process
+        self._workers = threading.local()
+        self._clones = []
+        self._clones_lock = threading.Lock()
+        # Removes the clones when the setup is garbage collected or at exit, without referencing the setup
+        self._finalizer = weakref.finalize(
+            self,
+            _remove_clones,
+            self._clones,
+            self._clones_lock,
+            Path(self.model.workdir) / "workers",
+        )
+
+    def __getstate__(self):
+        # Parallel samplers send a copy of the setup to the worker processes, which create their own clones
+        state = self.__dict__.copy()
+        for key in ("_workers", "_clones", "_clones_lock", "_finalizer"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_workers()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _apply_settings(self, model) -> List[Tuple[Any, str, Any]]:
+        """Apply the settings of the simulations to `model`.
+
+        Returns the previous settings, as (object, attribute, value) tuples, so that they can be restored.
+        """
+        rvi = model.config.rvi
+        # Make sure no output is written to disk, except the hydrographs needed by `obj_func`
+        settings = [(rvi, "_suppress_output", self.obj_func is None)]
+        if self.obj_func is not None:
+            settings.append((rvi, "_write_watershed_storage", False))
+        # Failed simulations get a NaN objective function instead of stopping the sampler
+        settings.append((model, "errors", "warn"))
+        if self.store is not None:
+            settings.append((model, "store", self.store))
+
+        previous = [(obj, key, getattr(obj, key)) for obj, key, _ in settings]
+        for obj, key, value in settings:
+            setattr(obj, key, value)
+        return previous
+
+    def worker_model(self):
+        """Return the model run by the current process and thread.
+
+        This is the original model in the process and thread that created the setup, and a clone with its own
+        working directory in the others.
+        """
+        pid = os.getpid()
+        if (pid, threading.get_ident()) == self._owner:
+            return self.model
+
+        # The process id is checked in case the setup was inherited by a forked process
+        worker = getattr(self._workers, "model", None)
+        if worker is None or worker[0] != pid:
+            path = Path(self.model.workdir) / "workers"
+            path.mkdir(parents=True, exist_ok=True)
+            model = self.model.clone(tempfile.mkdtemp(prefix=f"{pid}-", dir=path))
+            self._apply_settings(model)
+            with self._clones_lock:
+                self._clones.append(model)
+            worker = self._workers.model = (pid, model)
+        return worker[1]
+
+    def close(self):
+        """Remove the clones of the model created by this process and their working directories."""
+        self._workers = threading.local()
+        _remove_clones(
+            self._clones, self._clones_lock, Path(self.model.workdir) / "workers"
+        )
 
-        # Update parameters
-        self.model.config.update("params", np.array(x))
+    def simulation(self, x):
+        """Run the model and return the objective function.
 
-        # Run the model
-        self.model._execute(self.ts)
-        return 1
+        The objective function is returned rather than read back from the working directory by
+        `objectivefunction`, since parallel samplers call it from another process. It is NaN if the simulation
+        fails, e.g. for parameters on the bounds that are not valid for the model.
+        """
+        model = self.worker_model()
+        previous = self._apply_settings(model) if model is self.model else []
+        try:
+            (obj,) = model.evaluate(
+                self.ts, [x], diagnostic=self.diagnostic, obj_func=self.obj_func
+            )
+        finally:
+            for target, key, value in previous:
+                setattr(target, key, value)
+        return [obj]
 
     def objectivefunction(self, evaluation, simulation, params=None):
         """Return the objective function.
 
         Note that we short-circuit the evaluation and simulation entries, since the objective function has already
-        been computed by Raven.
+        been computed by `simulation`.
         """
-        d = self.model.diagnostics
-        return d["DIAG_NASH_SUTCLIFFE"][0]
+        return simulation[0]
+
+
+def _remove_clones(clones: list, lock: threading.Lock, path: Path):
+    """Remove the `clones` of a model and their working directories, then `path` if it is empty."""
+    with lock:
+        removed = list(clones)
+        clones.clear()
+
+    for model in removed:
+        model._close_outputs()
+        shutil.rmtree(model.workdir, ignore_errors=True)
+    if removed:
+        try:
+            path.rmdir()
+        except OSError:
+            # Clones of other processes
+            pass
@@ -1,10 +1,15 @@
 from dataclasses import fields
+from functools import lru_cache
+from typing import Optional
 
 import numpy as np
 import xarray as xr
 
 import ravenpy.models as models
 
+# Number of time steps used to infer the frequency of time series
+FREQ_PREFIX = 10
+
 
 def realization(n):
     """Return a realization coordinate.
@@ -63,16 +68,61 @@ def infer_scale_and_offset(da: xr.DataArray, data_type: str) -> (float, float):
     float, float
       Scale and offset parameters.
     """
-    import pint
-    from xclim.core.units import FREQ_UNITS, parse_offset, units, units2pint
+    freq = infer_time_frequency(da.time) if "time" in da.coords else None
+    return scale_and_offset(da.attrs["units"], data_type, freq)
+
+
+def infer_time_frequency(time, n: int = FREQ_PREFIX) -> Optional[str]:
+    """Return the frequency of a time coordinate inferred from its first `n` steps, or None if it is unknown.
+
+    Parameters
+    ----------
+    time : xr.DataArray, pd.DatetimeIndex or xr.CFTimeIndex
+      Time coordinate.
+    n : int
+      Number of time steps used to infer the frequency, at least 3.
+    """
+    if len(time) < 3:
+        return None
+    try:
+        return xr.infer_freq(time[:n])
+    except (TypeError, ValueError):
+        return None
 
-    from ravenpy.config import defaults
 
-    # Read units attribute from netCDF file -- assuming CF-Compliance.
-    source = units2pint(da.attrs["units"])
+@lru_cache(maxsize=None)
+def scale_and_offset(units: str, data_type: str, freq: str = None) -> (float, float):
+    """Return scale and offset parameters converting `units` to the Raven units of `data_type`.
+
+    Results are memoized, and xclim and pint are only imported when the units differ from the Raven units.
+
+    Parameters
+    ----------
+    units : str
+      Units of the data, assuming CF-Compliance.
+    data_type : str
+      Raven data type, e.g. 'PRECIP', 'TEMP_AVE', etc.
+    freq : str, optional
+      Time frequency of the data, required to convert precipitation amounts to rates.
+
+    Returns
+    -------
+    float, float
+      Scale and offset parameters.
+    """
+    from ravenpy.config import defaults
 
     # Get default units for data type.
     target = defaults.units[data_type]
+    if units == target:
+        return 1.0, 0.0
+
+    import pint
+    from xclim.core.units import FREQ_UNITS, parse_offset
+    from xclim.core.units import units as ureg
+    from xclim.core.units import units2pint
+
+    source = units2pint(units)
 
     # Linear transform parameters
     try:
@@ -81,14 +131,17 @@ def infer_scale_and_offset(da: xr.DataArray, data_type: str) -> (float, float):
         if data_type in ["PRECIP", "PRECIP_DAILY_AVE", "RAINFALL", "SNOWFALL"]:
             # Source units are in total precipitation instead of rate. We need to infer the accumulation time
             # in order to find the transform.
-            freq = xr.infer_freq(da.time)
             if freq is None:
-                raise ValueError(f"Cannot infer time frequency of input data {da}")
+                raise ValueError(
+                    f"Cannot infer time frequency of input data in {units}"
+                )
             multi, base, start_anchor, _ = parse_offset(freq)
             if base in ["M", "Q", "A"]:
-                raise ValueError(f"Irregular time frequency for input data {da}")
-            real_source = source / multi / units(FREQ_UNITS[base])
+                raise ValueError(f"Irregular time frequency {freq} for input data")
+            real_source = source / multi / ureg(FREQ_UNITS[base])
             scale, offset = units_transform(real_source, target)
+        else:
+            raise
 
     return scale, offset
 
@@ -12,7 +12,8 @@ from typing import Dict, List, Sequence, Tuple, Union
 import numpy as np
 import xarray as xr
 
-from ravenpy.config.commands import HRUState
+from ravenpy.config.commands import BasinIndexCommand, HRUState
+from ravenpy.config.rvs import EnsembleState
 from ravenpy.models import Raven
 
 """
@@ -48,9 +49,9 @@ def assimilate(
         Perturbed time series.
     keys : tuple
         Name of hru_state attributes to be assimilated, for example ("soil0", "soil1").
-    basin_states : sequence
+    basin_states : sequence or EnsembleState
         Model initial conditions, BasinStateVariables instances.
-    hru_states : sequence
+    hru_states : sequence or EnsembleState
         Model initial conditions, HRUStateVariables instances.
     q_obs : xarray.Dataset
         The actual observed streamflow over the entire period.
@@ -78,8 +79,8 @@ def assimilate(
     )
 
     # Extract final states (n_states, n_members)
-    f_hru_states, f_basin_states = model.get_final_state()
-    x_matrix = np.array([[state.data[key] for key in keys] for state in f_hru_states]).T
+    state = EnsembleState.from_solutions(model.solution)
+    x_matrix = state.hru_values[:, _hru_position(state), _columns(state, keys)].T
 
     # Sanity check
     if x_matrix.shape != (len(keys), n_members):
@@ -414,10 +415,15 @@ def sequential_assimilation(
     -------
     xarray.DataArray
         Array of assimilated streamflows for the full period duration. Size is n_members x time.
-    ravenpy.Raven.hru_states instance
+    list of HRUState
         The Raven model states for the hru information at the end of the period (size n_members)
-    ravenpy.Raven.basin_states instance
+    tuple of BasinIndexCommand
         The Raven model states for the basin information at the end of the period (size n_members).
+
+    Notes
+    -----
+    The states are updated in an `EnsembleState` during the assimilation, and converted to the states of each
+    member on return.
     """
 
     # ==== Assimilation ====
@@ -447,12 +453,34 @@ def sequential_assimilation(
         model.config.rvi.start_date = sd
 
         # Get new initial conditions and feed assimilated values
-        hs, basin_states = model.get_final_state()
-        hru_states = [
-            HRUState(hs[i].index, data={**hs[i].data, **dict(zip(assim_var, xa[:, i]))})
-            for i in range(n_members)
-        ]
+        state = EnsembleState.from_solutions(model.solution)
+        state.hru_values[:, _hru_position(state), _columns(state, assim_var)] = xa.T
+        hru_states = basin_states = state
 
     q_assim = xr.concat(q_assim, dim="time")
 
+    if isinstance(hru_states, EnsembleState):
+        hru_states, basin_states = _member_states(hru_states)
+
     return q_assim, hru_states, basin_states
+
+
+def _hru_position(state: EnsembleState, index: int = 1) -> int:
+    """Return the position of an HRU in the ensemble state arrays."""
+    return int(np.flatnonzero(state.hru_index == index)[0])
+
+
+def _columns(state: EnsembleState, keys: Sequence[str]) -> List[int]:
+    """Return the positions of HRU state variables in the ensemble state arrays."""
+    return [state.hru_names.index(key) for key in keys]
+
+
+def _member_states(
+    state: EnsembleState, hru_index: int = 1, basin_index: int = 1
+) -> Tuple[List[HRUState], Tuple[BasinIndexCommand, ...]]:
+    """Return the states of an HRU and of a basin for each member, as returned by `Raven.get_final_state`."""
+    rvcs = [state.to_rvc(i) for i in range(len(state))]
+    return (
+        [rvc.hru_states[hru_index] for rvc in rvcs],
+        tuple(rvc.basin_states[basin_index] for rvc in rvcs),
+    )
@@ -0,0 +1,284 @@
+"""
+Vectorized goodness-of-fit metrics of simulated streamflows.
+
+Metrics are computed along the time axis of arrays of simulated and observed streamflows, typically of shape
+(member, time, basin) for the simulations of a population of parameter sets, or (time, basin) for a single
+simulation, the observations being broadcast against the simulations. Time steps where either the simulation or the
+observation is missing (NaN), or that are outside the evaluation period, are ignored.
+
+Metrics are keyed in `METRICS` by the name of the equivalent Raven evaluation metric, and `objective` turns them into
+calibration objective functions.
+"""
+import hashlib
+import pickle
+import warnings
+from typing import Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+# Axis of the time steps in (member, time, basin) and (time, basin) arrays
+TIME_AXIS = -2
+
+
+def period_mask(time, periods: Sequence[Tuple]) -> np.ndarray:
+    """Return a boolean mask of the time steps within evaluation periods.
+
+    Parameters
+    ----------
+    time : array_like
+      Time coordinate, convertible to `np.datetime64`.
+    periods : sequence of tuple
+      Start and end dates of the periods, both included. None leaves a period open-ended.
+
+    Returns
+    -------
+    np.ndarray
+      True for the time steps within any of the periods.
+    """
+    time = np.asarray(time, dtype="datetime64[ns]")
+    mask = np.zeros(time.shape, dtype=bool)
+    for start, end in periods:
+        inside = np.ones(time.shape, dtype=bool)
+        if start is not None:
+            inside &= time >= np.datetime64(start, "ns")
+        if end is not None:
+            inside &= time <= np.datetime64(end, "ns")
+        mask |= inside
+    return mask
+
+
+def _valid(sim, obs, mask=None, axis: int = TIME_AXIS):
+    """Broadcast simulations and observations, setting both to NaN where either is missing or outside `mask`.
+
+    Returns the arrays and the number of valid time steps.
+    """
+    sim, obs = np.broadcast_arrays(np.asarray(sim, float), np.asarray(obs, float))
+    valid = ~(np.isnan(sim) | np.isnan(obs))
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.ndim == 1:
+            shape = [1] * sim.ndim
+            shape[axis] = -1
+            mask = mask.reshape(shape)
+        valid &= mask
+    sim = np.where(valid, sim, np.nan)
+    obs = np.where(valid, obs, np.nan)
+    return sim, obs, valid.sum(axis=axis)
+
+
+def _mean(x, n, axis: int = TIME_AXIS):
+    """Mean of the non-NaN values of `x`, NaN if there are none."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nansum(x, axis=axis) / n
+
+
+def _ratio(a, b):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(b != 0, a / b, np.nan)
+
+
+def nash_sutcliffe(sim, obs, mask=None, axis: int = TIME_AXIS) -> np.ndarray:
+    """Nash-Sutcliffe efficiency.
+
+    Parameters
+    ----------
+    sim : array_like
+      Simulated streamflows.
+    obs : array_like
+      Observed streamflows, broadcast against `sim`.
+    mask : array_like, optional
+      Boolean mask of the time steps of the evaluation period, see `period_mask`. It is either one-dimensional, along
+      the time axis, or broadcast against `sim`.
+    axis : int
+      Time axis.
+
+    Returns
+    -------
+    np.ndarray
+      Metric along the other axes, NaN where there are no valid time steps.
+    """
+    sim, obs, n = _valid(sim, obs, mask, axis)
+    mo = np.expand_dims(_mean(obs, n, axis), axis)
+    return 1 - _ratio(
+        np.nansum((sim - obs) ** 2, axis=axis), np.nansum((obs - mo) ** 2, axis=axis)
+    )
+
+
+def log_nash_sutcliffe(
+    sim, obs, mask=None, axis: int = TIME_AXIS, eps: float = 0.0
+) -> np.ndarray:
+    """Nash-Sutcliffe efficiency of the logarithm of streamflows, emphasizing low flows.
+
+    `eps` is added to the streamflows before taking their logarithm, to handle zero flows. See `nash_sutcliffe` for
+    the other parameters.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ls = np.log(np.asarray(sim, float) + eps)
+        lo = np.log(np.asarray(obs, float) + eps)
+    ls[~np.isfinite(ls)] = np.nan
+    lo[~np.isfinite(lo)] = np.nan
+    return nash_sutcliffe(ls, lo, mask, axis)
+
+
+def kling_gupta(
+    sim,
+    obs,
+    mask=None,
+    axis: int = TIME_AXIS,
+    version: str = "2009",
+    scale: Tuple[float, float, float] = (1.0, 1.0, 1.0),
+) -> np.ndarray:
+    """Kling-Gupta efficiency.
+
+    The variability term is the ratio of the standard deviations in the original formulation (version "2009", Gupta
+    et al.), and the ratio of the coefficients of variation in the modified one (version "2012", Kling et al.).
+    `scale` weights the correlation, variability and bias terms. See `nash_sutcliffe` for the other parameters.
+    """
+    if version not in ("2009", "2012"):
+        raise ValueError(f"`version` should be '2009' or '2012': {version}")
+
+    sim, obs, n = _valid(sim, obs, mask, axis)
+    ms = _mean(sim, n, axis)
+    mo = _mean(obs, n, axis)
+    ds = sim - np.expand_dims(ms, axis)
+    do = obs - np.expand_dims(mo, axis)
+    ss = np.sqrt(_mean(ds**2, n, axis))
+    so = np.sqrt(_mean(do**2, n, axis))
+
+    r = _ratio(_mean(ds * do, n, axis), ss * so)
+    alpha = _ratio(ss, so)
+    beta = _ratio(ms, mo)
+    if version == "2012":
+        alpha = _ratio(alpha, beta)
+
+    sr, sa, sb = scale
+    return 1 - np.sqrt(
+        (sr * (r - 1)) ** 2 + (sa * (alpha - 1)) ** 2 + (sb * (beta - 1)) ** 2
+    )
+
+
+def rmse(sim, obs, mask=None, axis: int = TIME_AXIS) -> np.ndarray:
+    """Root mean square error. See `nash_sutcliffe` for the parameters."""
+    sim, obs, n = _valid(sim, obs, mask, axis)
+    return np.sqrt(_mean((sim - obs) ** 2, n, axis))
+
+
+def mean_absolute_error(sim, obs, mask=None, axis: int = TIME_AXIS) -> np.ndarray:
+    """Mean absolute error. See `nash_sutcliffe` for the parameters."""
+    sim, obs, n = _valid(sim, obs, mask, axis)
+    return _mean(np.abs(sim - obs), n, axis)
+
+
+def percent_bias(sim, obs, mask=None, axis: int = TIME_AXIS) -> np.ndarray:
+    """Bias of the total simulated volume, in percent of the observed volume. See `nash_sutcliffe` for the
+    parameters."""
+    sim, obs, _ = _valid(sim, obs, mask, axis)
+    return 100 * _ratio(np.nansum(sim - obs, axis=axis), np.nansum(obs, axis=axis))
+
+
+def fdc_bias(
+    sim,
+    obs,
+    mask=None,
+    axis: int = TIME_AXIS,
+    low: float = 0.0,
+    high: float = 0.02,
+    n: int = 50,
+) -> np.ndarray:
+    """Bias of a segment of the flow duration curve, in percent.
+
+    The segment covers exceedance probabilities from `low` to `high`: the defaults compare the volumes of the
+    highest 2% flows, 0.7 to 1 the volumes of low flows. The flow duration curves are sampled at `n` probabilities.
+    See `nash_sutcliffe` for the other parameters.
+    """
+    sim, obs, _ = _valid(sim, obs, mask, axis)
+    q = 1 - np.linspace(low, high, n)
+    with warnings.catch_warnings():
+        # All-NaN slices
+        warnings.simplefilter("ignore", RuntimeWarning)
+        fs = np.nanquantile(sim, q, axis=axis)
+        fo = np.nanquantile(obs, q, axis=axis)
+    return 100 * _ratio(np.sum(fs - fo, axis=0), np.sum(fo, axis=0))
+
+
+def weighted(values, weights=None, axis: int = -1) -> np.ndarray:
+    """Weighted mean of metrics across basins, ignoring basins where they are NaN.
+
+    Parameters
+    ----------
+    values : array_like
+      Metrics, e.g. of shape (member, basin).
+    weights : array_like, optional
+      Weights of the basins. Equal weights if None.
+    axis : int
+      Basin axis.
+    """
+    values = np.asarray(values, float)
+    if weights is None:
+        weights = np.ones(values.shape[axis])
+    shape = [1] * values.ndim
+    shape[axis] = -1
+    w = np.where(np.isnan(values), 0, np.reshape(weights, shape))
+    return _ratio(np.nansum(values * w, axis=axis), w.sum(axis=axis))
+
+
+# Metrics keyed by the name of the equivalent Raven evaluation metric, and whether their best values are the largest
+# ("max"), the smallest ("min"), or zero for signed metrics ("zero")
+METRICS: Dict[str, Tuple[Callable, str]] = {
+    "NASH_SUTCLIFFE": (nash_sutcliffe, "max"),
+    "LOG_NASH": (log_nash_sutcliffe, "max"),
+    "KLING_GUPTA": (kling_gupta, "max"),
+    "RMSE": (rmse, "min"),
+    "ABSERR": (mean_absolute_error, "min"),
+    "PCT_BIAS": (percent_bias, "zero"),
+}
+
+
+def objective(
+    metric="NASH_SUTCLIFFE",
+    weights=None,
+    mask=None,
+    **kwds,
+) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """Return an objective function computing a metric from simulated and observed streamflows.
+
+    The objective function takes (member, time, basin) or (time, basin) arrays, and returns the metric of each
+    member, averaged across basins. Signed metrics whose best value is zero, such as "PCT_BIAS", are taken in absolute
+    value before being averaged, so that their objective function is minimized.
+
+    Parameters
+    ----------
+    metric : str or callable
+      Name of a metric in `METRICS`, or function with the signature of `nash_sutcliffe`.
+    weights : array_like, optional
+      Weights of the basins, see `weighted`.
+    mask : array_like, optional
+      Boolean mask of the time steps of the evaluation period, see `period_mask`.
+    **kwds
+      Other arguments of the metric.
+
+    Examples
+    --------
+    >>> kge = objective("KLING_GUPTA", version="2012")
+    >>> kge(q_sim, q_obs)  # doctest: +SKIP
+    """
+    func, best = METRICS[metric] if isinstance(metric, str) else (metric, None)
+    absolute = best == "zero"
+
+    def obj_func(sim, obs):
+        values = func(sim, obs, mask, axis=TIME_AXIS, **kwds)
+        return weighted(np.abs(values) if absolute else values, weights)
+
+    # Identifies the objective function, e.g. in the keys of evaluation stores
+    options = pickle.dumps(
+        (
+            None if weights is None else np.asarray(weights, float),
+            None if mask is None else np.asarray(mask, bool),
+            sorted(kwds.items()),
+        )
+    )
+    digest = hashlib.sha256(options).hexdigest()[:12]
+    prefix = "abs:" if absolute else ""
+    obj_func.name = f"{prefix}{func.__module__}.{func.__qualname__}-{digest}"  # type: ignore
+
+    return obj_func
@@ -9,7 +9,8 @@ from collections import OrderedDict
 def parse_configuration(fn):
     """Parse Raven configuration file.
 
-    Returns a dictionary keyed by parameter name."""
+    Returns a dictionary keyed by parameter name. Use `ravenpy.config.parser.RVFile` to convert blocks (e.g. HRUs,
+    SoilClasses) to command objects."""
     import re
 
     main_param = re.compile(r"^:(\w+)\s+([^#]*)")
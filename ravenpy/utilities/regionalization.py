@@ -7,9 +7,7 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 import xarray as xr
-from haversine import haversine_vector
 
 import ravenpy.models as models
 
@@ -207,6 +205,8 @@ def distance(gauged: pd.DataFrame, ungauged: pd.Series):
       Coordinates of the ungauged catchment.
 
     """
+    from haversine import haversine_vector
+
     gauged_array = np.array(list(zip(gauged.latitude.values, gauged.longitude.values)))
 
     return pd.Series(
@@ -357,6 +357,9 @@ def multiple_linear_regression(source, params, target):
     (mrl_params, r2)
       A named tuple of the estimated model parameters and the R2 of the linear regression.
     """
+    # statsmodels is slow to import, so it is only imported when needed
+    import statsmodels.api as sm
+
     # Add constants to the gauged predictors
     x = sm.add_constant(source)
 
@@ -0,0 +1,287 @@
+"""
+Surrogate-assisted calibration of emulators.
+
+A radial basis function (RBF) surrogate of the objective function is fitted to the parameter sets evaluated so far,
+and only the candidates it deems most promising are run by Raven. Candidates are drawn around the best parameter set
+by perturbing a random subset of its parameters, with a perturbation scale adapted to the progress of the search
+(DYCORS, Regis and Shoemaker, 2013). Each batch of candidates is run in parallel with `Raven.evaluate`.
+
+Regis, R. G., & Shoemaker, C. A. (2013). Combining radial basis function surrogates and dynamic coordinate search in
+high-dimensional expensive black-box optimization. Engineering Optimization, 45(5), 529–555.
+"""
+import logging
+import math
+import os
+from dataclasses import astuple, dataclass, fields, is_dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+LOGGER = logging.getLogger("PYWPS")
+
+# Weights of the surrogate value against the distance to evaluated points when scoring candidates, cycled through
+# the candidates selected in a batch
+SCORE_WEIGHTS = (0.3, 0.5, 0.8, 0.95)
+
+# Initial, minimum and maximum perturbation scales, relative to the parameter ranges
+SIGMA_INIT = 0.2
+SIGMA_MIN = 0.2 * 0.5**6
+SIGMA_MAX = 0.2
+
+
+@dataclass
+class SurrogateResult:
+    """Result of a surrogate-assisted calibration.
+
+    Attributes
+    ----------
+    params : Params
+      Best parameter set, as an instance of the emulator's `Params` class.
+    objective : float
+      Objective function of the best parameter set.
+    x : np.ndarray
+      Parameter sets run by Raven, of shape (n_evaluations, n_params), in the order they were evaluated.
+    y : np.ndarray
+      Objective function of the parameter sets, NaN for failed simulations.
+    """
+
+    params: Any
+    objective: float
+    x: np.ndarray
+    y: np.ndarray
+
+    @property
+    def n_evaluations(self) -> int:
+        return len(self.y)
+
+
+def _bounds(model, low=None, high=None):
+    """Return the lower and upper parameter bounds as arrays.
+
+    They default to the `low` and `high` attributes of the model, then to the Ostrich bounds of `_OST` emulators.
+    """
+    if low is None:
+        low = getattr(model, "low", None)
+    if high is None:
+        high = getattr(model, "high", None)
+
+    ost = getattr(model.config, "ost", None)
+    if low is None and ost is not None:
+        low = ost.lowerBounds
+    if high is None and ost is not None:
+        high = ost.upperBounds
+
+    if low is None or high is None:
+        raise ValueError("Parameter bounds should be given by `low` and `high`.")
+
+    low, high = (
+        np.asarray(astuple(b) if is_dataclass(b) else b, dtype=float)
+        for b in (low, high)
+    )
+    if low.shape != high.shape or low.ndim != 1 or np.any(high <= low):
+        raise ValueError(f"Invalid parameter bounds: {low}, {high}")
+    return low, high
+
+
+def _fit(x, f):
+    """Fit a cubic RBF surrogate with a linear tail to the points `x` in the unit hypercube."""
+    from scipy.interpolate import RBFInterpolator
+
+    # Large values are clipped to the median, so that outliers do not flatten the surrogate around the minimum
+    f = np.minimum(f, np.median(f))
+    return RBFInterpolator(x, f, kernel="cubic", degree=1)
+
+
+def _min_distance(a, b):
+    """Distance from each point of `a` to the nearest point of `b`."""
+    return np.sqrt(((a[:, np.newaxis, :] - b[np.newaxis, :, :]) ** 2).sum(-1)).min(1)
+
+
+def _scale(v):
+    span = v.max() - v.min()
+    return (v - v.min()) / span if span > 0 else np.zeros_like(v)
+
+
+def _propose(rng, surrogate, x, best, n, sigma, prob, n_candidates):
+    """Select `n` candidates in the unit hypercube, minimizing a weighted sum of their surrogate value and of their
+    closeness to the evaluated and already selected points."""
+    d = x.shape[1]
+
+    # Perturb a random subset of the parameters of the best point, at least one
+    mask = rng.random((n_candidates, d)) < prob
+    mask[np.arange(n_candidates), rng.integers(0, d, n_candidates)] = True
+    cand = best + mask * rng.normal(0, sigma, (n_candidates, d))
+    # Reflect into the unit hypercube
+    cand = np.abs(cand)
+    cand = np.where(cand > 1, 2 - cand, cand).clip(0, 1)
+
+    value = _scale(surrogate(cand))
+    dist = _min_distance(cand, x)
+
+    selected = []
+    for i in range(n):
+        w = SCORE_WEIGHTS[i % len(SCORE_WEIGHTS)]
+        score = w * value + (1 - w) * (1 - _scale(dist))
+        # Never select points already evaluated
+        score[dist <= 1e-9] = np.inf
+        j = int(np.argmin(score))
+        if not np.isfinite(score[j]):
+            break
+        selected.append(cand[j])
+        dist = np.minimum(dist, _min_distance(cand, cand[j : j + 1]))
+    return np.array(selected)
+
+
+def calibrate(
+    model,
+    ts,
+    max_evaluations: int = 200,
+    batch_size: Optional[int] = None,
+    low=None,
+    high=None,
+    diagnostic: str = "DIAG_NASH_SUTCLIFFE",
+    obj_func=None,
+    maximize: bool = True,
+    n_initial: Optional[int] = None,
+    seed=None,
+    **kwds,
+) -> SurrogateResult:
+    """Calibrate an emulator with a surrogate-assisted optimizer.
+
+    The objective function is evaluated on a Latin hypercube design of `n_initial` parameter sets, then on batches
+    of `batch_size` candidates proposed by an RBF surrogate of the objective function, until `max_evaluations`
+    parameter sets have been run. Failed simulations are given a NaN objective function and do not stop the search;
+    a `ValueError` is raised if none of them succeeded.
+
+    If an evaluation store is set as the `store` of the model, parameter sets already evaluated are not run again,
+    so that a calibration killed before completion can be resumed by calling this function again with the same seed.
+
+    Parameters
+    ----------
+    model : Raven emulator subclass instance
+      Configured emulator, defining a `Params` dataclass.
+    ts : path or sequence
+      Input forcing files.
+    max_evaluations : int
+      Maximum number of parameter sets run by Raven.
+    batch_size : int, optional
+      Number of parameter sets run in parallel. Defaults to the model's `max_workers`, or the number of CPUs.
+    low, high : sequence or Params, optional
+      Parameter bounds. Default to the `low` and `high` attributes of the model, or to the Ostrich bounds for `_OST`
+      emulators.
+    diagnostic : str
+      Name of the Raven diagnostic used as objective function.
+    obj_func : callable, optional
+      Objective function computed from the simulated and observed streamflows, see `Raven.evaluate`.
+    maximize : bool
+      Whether the objective function is maximized, e.g. NSE, or minimized, e.g. RMSE.
+    n_initial : int, optional
+      Size of the initial design. Defaults to 2 * (n_params + 1).
+    seed : int or np.random.Generator, optional
+      Seed of the random number generator.
+    **kwds
+      Other parameters of the run, see `Raven.run`.
+
+    Returns
+    -------
+    SurrogateResult
+      Best parameter set and history of the evaluations.
+    """
+    from scipy.stats import qmc
+
+    low, high = _bounds(model, low, high)
+    d = len(low)
+    names = [f.name for f in fields(model.Params)]
+    if len(names) != d:
+        raise ValueError(f"Expected {len(names)} parameter bounds, got {d}.")
+
+    rng = np.random.default_rng(seed)
+    batch_size = batch_size or model.max_workers or os.cpu_count() or 1
+    n_initial = min(n_initial or 2 * (d + 1), max_evaluations)
+    if n_initial < d + 1:
+        raise ValueError(f"The initial design needs at least {d + 1} parameter sets.")
+    n_candidates = min(100 * d, 5000)
+    sign = -1 if maximize else 1
+
+    def evaluate(u):
+        # Failed simulations get a NaN objective function instead of stopping the search
+        errors, model.errors = model.errors, "warn"
+        try:
+            y = model.evaluate(
+                ts,
+                low + u * (high - low),
+                diagnostic=diagnostic,
+                obj_func=obj_func,
+                **kwds,
+            )
+        finally:
+            model.errors = errors
+        return np.asarray(y, dtype=float)
+
+    def best(y):
+        """Return the index of the best objective function, failed simulations being ignored."""
+        f = sign * y
+        if not np.isfinite(f).any():
+            raise ValueError("The objective function could not be evaluated.")
+        return int(np.nanargmin(f))
+
+    # Parameter sets in the unit hypercube, and their objective function
+    u = qmc.LatinHypercube(d=d, seed=rng).random(n_initial)
+    y = evaluate(u)
+
+    sigma = SIGMA_INIT
+    successes = failures = 0
+    fail_tol = max(1, math.ceil(max(5, d) / batch_size))
+
+    while len(y) < max_evaluations:
+        # Failed simulations get the worst objective function
+        ibest = best(y)
+        f = sign * y
+        valid = np.isfinite(f)
+        f = np.where(valid, f, f[valid].max())
+
+        # Probability of perturbing each parameter, decreasing as the budget is used
+        n = len(y) - n_initial
+        prob = min(20 / d, 1) * (
+            1 - math.log(n + 1) / math.log(max_evaluations - n_initial + 1)
+        )
+        prob = max(prob, 1 / d)
+
+        batch = _propose(
+            rng,
+            _fit(u, f),
+            u,
+            u[ibest],
+            min(batch_size, max_evaluations - len(y)),
+            sigma,
+            prob,
+            n_candidates,
+        )
+        if not len(batch):
+            break
+        yb = evaluate(batch)
+
+        fb = sign * yb
+        if np.nanmin(fb, initial=np.inf) < f[ibest] - 1e-3 * abs(f[ibest]):
+            successes, failures = successes + 1, 0
+        else:
+            successes, failures = 0, failures + 1
+        if successes >= 3:
+            sigma, successes = min(2 * sigma, SIGMA_MAX), 0
+        elif failures >= fail_tol:
+            sigma, failures = max(sigma / 2, SIGMA_MIN), 0
+
+        u = np.vstack([u, batch])
+        y = np.concatenate([y, yb])
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(
+                "Surrogate calibration: %s evaluations, best objective %s",
+                len(y),
+                y[np.nanargmin(sign * y)],
+            )
+
+    x = low + u * (high - low)
+    ibest = best(y)
+    return SurrogateResult(
+        params=model.Params(*x[ibest]), objective=float(y[ibest]), x=x, y=y
+    )
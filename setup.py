@@ -38,7 +38,7 @@ requirements = [
     "pint>=0.20",
     "pydantic",
     "requests",
-    "scipy",
+    "scipy>=1.7",
     "spotpy",
     "statsmodels",
     "wheel",
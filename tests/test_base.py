@@ -1,11 +1,15 @@
+import asyncio
+import subprocess
 import zipfile
 from pathlib import Path
 
 import numpy as np
 import pytest
+import xarray as xr
 
-from ravenpy.models import Ostrich, Raven, RavenError
+from ravenpy.models import Ostrich, Raven, RavenError, RavenWarning
 from ravenpy.models.base import get_diff_level
+from ravenpy.models.scheduler import RavenProcess
 
 has_singularity = False  # ravenpy.raven_simg.exists()
 
@@ -54,11 +58,111 @@ class TestRaven:
 
         assert "Unrecognized command in .rvh file" in str(exc.value)
 
+    def test_incomplete(self, tmp_path):
+        model = Raven()
+        model.processes = [
+            RavenProcess(
+                index=i,
+                cmd=[],
+                cwd=tmp_path,
+                returncode=0,
+                status="completed",
+                messages=dict(
+                    ERROR=[], WARNING=[], ADVISORY=[], **{"SIMULATION COMPLETE": c}
+                ),
+            )
+            for i, c in enumerate([True, False])
+        ]
+        with pytest.raises(RavenError, match="Simulation 1 did not complete"):
+            model._check_messages()
+
+        model.errors = "warn"
+        with pytest.warns(RavenWarning, match="Simulation 1 did not complete"):
+            model._check_messages()
+
+    def test_parse_completed_error(self, tmp_path, monkeypatch):
+        model = Raven(workdir=tmp_path)
+        model.processes = [RavenProcess(index=0, cmd=[], cwd=tmp_path)]
+        model.processes[0].status = "completed"
+
+        def execute(*args, **kwds):
+            raise RavenError("Simulation failed.")
+
+        def parse_results():
+            raise IOError("Output not found.")
+
+        monkeypatch.setattr(model, "_execute", execute)
+        monkeypatch.setattr(model, "_aexecute", execute)
+        monkeypatch.setattr(model, "parse_results", parse_results)
+
+        # Errors raised while parsing the completed simulations do not hide the simulation error
+        with pytest.warns(RavenWarning, match="Output not found"):
+            with pytest.raises(RavenError, match="Simulation failed"):
+                model(None)
+
+        with pytest.warns(RavenWarning, match="Output not found"):
+            with pytest.raises(RavenError, match="Simulation failed"):
+                asyncio.run(model.acall(None))
+
+    def test_close_outputs_before_run(self, tmp_path, monkeypatch):
+        fn = tmp_path / "Hydrographs.nc"
+        xr.Dataset({"q_sim": ("time", [1.0])}).to_netcdf(fn)
+        model = Raven(workdir=tmp_path)
+
+        def setup(overwrite):
+            # Datasets opened from the previous outputs are closed before they are overwritten
+            assert model._output_handles == {}
+            raise RuntimeError("Setup called")
+
+        monkeypatch.setattr(model, "setup", setup)
+        for execute in [model._execute, lambda ts: asyncio.run(model._aexecute(ts))]:
+            model._output_handles = {"hydrograph": xr.open_dataset(fn)}
+            with pytest.raises(RuntimeError, match="Setup called"):
+                execute(None)
+
+    def test_member_outputs(self, tmp_path):
+        model = Raven(workdir=tmp_path)
+        model.processes = [
+            RavenProcess(index=i, cmd=[], cwd=model.exec_path / "model" / f"p{i:02}")
+            for i in range(3)
+        ]
+        for proc in model.processes:
+            proc.status = "completed"
+            (proc.cwd / "output").mkdir(parents=True)
+        model.processes[2].status = "failed"
+
+        # Completed simulations without diagnostics, e.g. without observations
+        with pytest.raises(RavenError, match="No diagnostics"):
+            model._check_member_outputs(
+                model._member_outputs("*Diagnostics.csv"), "diagnostics"
+            )
+
+        (model.processes[0].cwd / "output" / "Diagnostics.csv").touch()
+        outputs = model._member_outputs("*Diagnostics.csv")
+        assert list(outputs) == [0]
+        with pytest.warns(RavenWarning, match="Simulation 1 did not write"):
+            model._check_member_outputs(outputs, "diagnostics")
+
+        (model.processes[0].cwd / "output" / "run_Diagnostics.csv").touch()
+        with pytest.raises(RavenError, match="several files"):
+            model._member_outputs("*Diagnostics.csv")
+
     def test_raven_version(self):
         model = Raven()
 
         assert model.config.rvi.raven_version == model.raven_version
 
+    def test_raven_version_cache(self, monkeypatch):
+        version = Raven().raven_version
+
+        def check_output(*args, **kwds):
+            raise AssertionError("The Raven executable should not be run again.")
+
+        # The version is probed lazily, once per executable
+        monkeypatch.setattr(subprocess, "check_output", check_output)
+        model = Raven()
+        assert model.raven_version == version
+
     def test_gr4j(self, get_file, get_local_testdata):
         rvs = get_local_testdata("raven-gr4j-cemaneige/raven-gr4j-salmon.rv?")
         ts = get_file(
@@ -416,3 +520,13 @@ def test_get_diff_level():
     assert get_diff_level(files) == 2
     assert files[0].relative_to(Path(*fn.parts[:2])) == Path("b/c.txt")
     assert files[1].relative_to(Path(*files[1].parts[:2])) == Path("b1/b2/c.txt")
+
+
+def test_get_output_order(tmp_path):
+    for i in [0, 2, 10, 100]:
+        out = tmp_path / "model" / f"p{i:02}" / "output"
+        out.mkdir(parents=True)
+        (out / "Hydrographs.nc").touch()
+
+    fns = Raven()._get_output("*Hydrographs.nc", path=tmp_path)
+    assert [fn.parent.parent.name for fn in fns] == ["p00", "p02", "p10", "p100"]
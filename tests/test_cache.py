@@ -0,0 +1,84 @@
+import os
+import shutil
+
+from ravenpy.models.cache import ResultCache
+
+
+def make_output(path, size=10):
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "Hydrographs.nc").write_bytes(b"0" * size)
+    (path / "Raven_errors.txt").write_text("SIMULATION COMPLETE :)\n")
+    return path
+
+
+class TestResultCache:
+    def test_key(self, tmp_path):
+        ts = tmp_path / "forcing.nc"
+        ts.write_text("data")
+        rv = ":CreationDate 2022-01-01 00:00:00\n:RunName run-0\n"
+
+        k = ResultCache.key([rv], [ts], "3.6")
+        assert k == ResultCache.key(
+            [rv.replace("2022-01-01", "2022-12-31")], [ts], "3.6"
+        )
+        assert k != ResultCache.key([rv.replace("run-0", "run-1")], [ts], "3.6")
+        assert k != ResultCache.key([rv], [ts], "3.5")
+
+        ts.write_text("modified data")
+        assert k != ResultCache.key([rv], [ts], "3.6")
+
+    def test_get_put(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache")
+        src = make_output(tmp_path / "src")
+
+        assert not cache.get("abc", tmp_path / "dest")
+        cache.put("abc", src)
+        assert cache.get("abc", tmp_path / "dest")
+        assert (tmp_path / "dest" / "Hydrographs.nc").read_bytes() == b"0" * 10
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.size == 10 + len("SIMULATION COMPLETE :)\n")
+
+        cache.clear()
+        assert cache.size == 0
+        assert cache.hits == cache.misses == 0
+
+    def test_evict(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_size=3500)
+        for i, key in enumerate("abc"):
+            cache.put(key, make_output(tmp_path / key, size=1000))
+            entry = cache.path / key
+            os.utime(entry, (i, i))
+
+        # Using `a` makes `b` the least recently used entry.
+        assert cache.get("a", tmp_path / "dest")
+        cache.put("d", make_output(tmp_path / "d", size=1000))
+
+        assert sorted(e.name for e in cache._entries()) == ["a", "c", "d"]
+
+    def test_running_size(self, tmp_path, monkeypatch):
+        cache = ResultCache(tmp_path / "cache", max_size=3500)
+        cache.put("a", make_output(tmp_path / "a", size=1000))
+
+        # Entries are only listed again when the cache grows over its maximum size
+        calls = []
+        stats = cache._stats
+        monkeypatch.setattr(cache, "_stats", lambda: calls.append(1) or stats())
+        for key in "bc":
+            cache.put(key, make_output(tmp_path / key, size=1000))
+        assert not calls
+
+        cache.put("d", make_output(tmp_path / "d", size=1000))
+        assert len(calls) == 1
+        assert cache.size <= cache.low_water * cache.max_size
+
+    def test_concurrent_eviction(self, tmp_path, monkeypatch):
+        cache = ResultCache(tmp_path / "cache")
+        cache.put("a", make_output(tmp_path / "a"))
+
+        def copy2(src, dst):
+            raise FileNotFoundError(src)
+
+        # The entry is removed by another process while being copied
+        monkeypatch.setattr(shutil, "copy2", copy2)
+        assert not cache.get("a", tmp_path / "dest")
+        assert (cache.hits, cache.misses) == (0, 1)
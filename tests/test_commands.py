@@ -1,6 +1,8 @@
 import re
+from dataclasses import replace
 from textwrap import dedent
 
+import numpy as np
 import pytest
 
 from ravenpy.config import options
@@ -9,17 +11,27 @@ from ravenpy.config.commands import (
     PL,
     SOIL,
     AdiabaticLapseRate,
+    BasinIndexCommand,
+    DataCommand,
     EvaluationMetrics,
+    EvaluationPeriod,
+    GaugeCommand,
+    GridWeightsCommand,
+    HRUsCommand,
     HRUState,
     HRUStateVariableTableCommand,
+    HRUTable,
     LandUseClassesCommand,
     LandUseParameterListCommand,
     LinearTransform,
     PotentialMeltMethod,
+    RedirectToFileCommand,
     RunName,
     SoilClassesCommand,
     SoilParameterListCommand,
     SoilProfilesCommand,
+    SubBasinsCommand,
+    SubBasinTable,
     SuppressOutput,
     VegetationClassesCommand,
     VegetationParameterListCommand,
@@ -205,3 +217,222 @@ class TestHRUStateVariableTableCommand:
         assert len(sv.hru_states) == 1
         assert sv.hru_states[1].index == 1
         assert sv.hru_states[1].data["ATMOS_PRECIP"] == -0.16005
+
+    def test_parse_arrays(self):
+        # Raven splits the state variables over multiple tables
+        solution = """
+:TimeStamp 2002-01-01 00:00:00.00
+:HRUStateVariableTable
+  :Attributes,SOIL[0],SOIL[1],
+  :Units,mm,mm,
+  1,0.10000,1.00000,
+  2,0.20000,2.00000,
+  3,0.30000,3.00000,
+:EndHRUStateVariableTable
+:HRUStateVariableTable
+  :Attributes,SNOW
+  :Units,mm
+  1,10.00000
+  2,20.00000
+  3,30.00000
+:EndHRUStateVariableTable
+        """
+        index, names, values = HRUStateVariableTableCommand.parse_arrays(solution)
+        np.testing.assert_array_equal(index, [1, 2, 3])
+        assert names == ["SOIL[0]", "SOIL[1]", "SNOW"]
+        np.testing.assert_array_equal(
+            values, [[0.1, 1.0, 10.0], [0.2, 2.0, 20.0], [0.3, 3.0, 30.0]]
+        )
+
+        sv = HRUStateVariableTableCommand.parse(solution)
+        assert len(sv.hru_states) == 3
+        assert sv.hru_states[2].data["SNOW"] == 20.0
+        assert (
+            HRUStateVariableTableCommand.format_arrays(index, names, values)
+            == sv.to_rv()
+        )
+
+    def test_parse_arrays_mismatch(self):
+        table = """
+:HRUStateVariableTable
+  :Attributes,SOIL[0]
+  :Units,mm
+  {}
+:EndHRUStateVariableTable
+"""
+        # Same HRUs in a different order are realigned
+        solution = table.format("1,0.1\n2,0.2") + table.format("2,2.0\n1,1.0")
+        _, _, values = HRUStateVariableTableCommand.parse_arrays(solution)
+        np.testing.assert_array_equal(values, [[0.1, 1.0], [0.2, 2.0]])
+
+        solution = table.format("1,0.1\n2,0.2") + table.format("1,1.0\n3,3.0")
+        with pytest.raises(ValueError, match="same HRUs"):
+            HRUStateVariableTableCommand.parse_arrays(solution)
+
+        solution = ":HRUStateVariableTable\n1,0.1\n:EndHRUStateVariableTable"
+        with pytest.raises(ValueError, match="Attributes"):
+            HRUStateVariableTableCommand.parse_arrays(solution)
+
+
+class TestRecordTable:
+    def test_hrus(self):
+        data = np.zeros(
+            3,
+            dtype=[
+                ("hru_id", int),
+                ("area", np.float32),
+                ("elevation", int),
+                ("latitude", float),
+                ("land_use_class", "U10"),
+            ],
+        )
+        data["hru_id"] = [1, 2, 3]
+        data["area"] = [100, 0.1, 2.5e-7]
+        data["elevation"] = [843, 10, 0]
+        data["latitude"] = [54.4848, -1 / 3, 12345678.9]
+        data["land_use_class"] = ["LU_ALL", "", "LU_LAKE"]
+
+        table = HRUTable(data)
+        assert len(table) == 3
+        assert table[-1].land_use_class == "LU_LAKE"
+
+        # Values are converted as by the record validation, and rendered identically
+        records = table.to_records()
+        assert records[0].area == 100.0
+        assert table.to_rv() == HRUsCommand(records).to_rv()
+        assert HRUTable.from_records(records).to_rv() == table.to_rv()
+
+    def test_subbasins(self):
+        table = SubBasinTable(
+            dict(
+                subbasin_id=[10, 20],
+                name=["sub_10", "sub_20"],
+                downstream_id=[20, -1],
+                profile=["chn_10", "chn_20"],
+                reach_length=[0, 12.5],
+                gauged=[False, True],
+            )
+        )
+        out = table.to_rv()
+        assert out == SubBasinsCommand(table.to_records()).to_rv()
+        assert "ZERO-" in out
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError):
+            HRUTable(dict(hru_id=[1], basin=[1]))
+
+
+class TestConstruct:
+    def test_construct(self):
+        kwds = dict(index=2, data={"SOIL[0]": 1.0})
+        assert HRUState.construct(**kwds) == HRUState(**kwds)
+        assert str(HRUState.construct(**kwds)) == str(HRUState(**kwds))
+
+        # Defaults are used for missing fields
+        assert BasinIndexCommand.construct(index=3) == BasinIndexCommand(index=3)
+
+        # Values are not validated
+        assert HRUState.construct(index="a").index == "a"
+        with pytest.raises(TypeError):
+            EvaluationPeriod.construct(name="all")
+
+    def test_parse(self):
+        cmd = BasinIndexCommand(
+            index=1, name="sub", channel_storage=1, qout=(1, 2.5, 0), qin=(3, 4)
+        )
+        parsed = BasinIndexCommand.parse(cmd.to_rv())
+        assert parsed == cmd
+        assert parsed.to_rv() == cmd.to_rv()
+
+        gw = GridWeightsCommand(number_hrus=2, data=((1, 0, 0.5), (2, 0, 1)))
+        assert GridWeightsCommand.parse(gw.to_rv()) == gw
+
+
+class TestGridWeightsCommand:
+    def test_default(self):
+        gw = GridWeightsCommand()
+        assert gw.data.dtype.names == ("hru_id", "cell_id", "weight")
+        assert (
+            gw.to_rv()
+            == dedent(
+                """
+            :GridWeights
+                :NumberHRUs 1
+                :NumberGridCells 1
+                1 0 1.0
+            :EndGridWeights
+            """
+            ).strip()
+        )
+
+    def test_data(self):
+        gw = GridWeightsCommand(number_hrus=2, data=((1, 0, 0.5), (2, 3, 1)))
+        assert gw.data["cell_id"].tolist() == [0, 3]
+        assert tuple(gw.data[1]) == (2, 3, 1.0)
+        assert gw == GridWeightsCommand(
+            number_hrus=2, data=np.array([[1, 0, 0.5], [2, 3, 1]])
+        )
+        assert gw != GridWeightsCommand(number_hrus=2, data=((1, 0, 0.5), (2, 3, 0)))
+
+        assert gw.to_rv(indent_level=1).splitlines()[3] == "        1 0 0.5"
+
+    def test_chunks(self, tmp_path):
+        n = 2500
+        gw = GridWeightsCommand(
+            number_hrus=n,
+            number_grid_cells=10 * n,
+            data=[(i + 1, 10 * i, 1 / (i + 3)) for i in range(n)],
+        )
+
+        rtf = RedirectToFileCommand(tmp_path / "weights.rvt")
+        gw.write(rtf, chunk_size=1000)
+        assert rtf.path.read_text() == gw.to_rv() + "\n"
+
+        parsed = GridWeightsCommand.read(rtf.path, chunk_size=1000)
+        assert parsed == gw
+        assert parsed.data["weight"][-1] == 1 / (n + 2)
+
+    def test_parse(self):
+        s = """
+        # Grid weights
+        :GridWeights
+            :NumberHRUs 2
+            :NumberGridCells 4
+            # HRU cell weight
+            1 0 0.25
+            1 3 0.75
+
+            2 2 1.0
+        :EndGridWeights
+        """
+        gw = GridWeightsCommand.parse(dedent(s))
+        assert gw.number_grid_cells == 4
+        assert gw.data.tolist() == [(1, 0, 0.25), (1, 3, 0.75), (2, 2, 1.0)]
+
+        with pytest.raises(ValueError):
+            GridWeightsCommand.parse(":NumberHRUs 2\n1 0 1.0\n")
+
+
+def test_gauge_network():
+    data_cmds = (
+        DataCommand(data_type="PRECIP", units="mm/d", var_name_nc="pr", scale=2),
+        DataCommand(data_type="TEMP_AVE", units="degC", var_name_nc="{tas}"),
+    )
+    kwds = dict(rain_correction="par_x1", monthly_ave_temperature=(1, 2))
+    names = ["A", "B", "C"]
+    lat = np.array([45.1, 46.2, 47.3], dtype="float32")
+    lon = [-70.1, -71.2, -72.3]
+    elev = [100, 200.5, 300]
+
+    expected = []
+    for i, gauge in enumerate(zip(names, lat, lon, elev)):
+        cmds = [replace(cmd, index=i + 4) for cmd in data_cmds]
+        expected.append(
+            GaugeCommand(*gauge, data_cmds=tuple(cmds), **kwds).to_rv()  # type: ignore
+        )
+
+    out = GaugeCommand.format_network(
+        names, lat, lon, elev, np.arange(4, 7), data_cmds=data_cmds, **kwds
+    )
+    assert out == "\n".join(expected)
+    assert data_cmds[0].index == 1
@@ -1,6 +1,15 @@
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
 import xarray as xr
 
-from ravenpy.utilities.coords import infer_scale_and_offset
+from ravenpy.utilities.coords import (
+    infer_scale_and_offset,
+    infer_time_frequency,
+    scale_and_offset,
+)
 from ravenpy.utilities.testdata import open_dataset
 
 
@@ -28,3 +37,42 @@ def test_infer_scale_and_offset():
     with open_dataset(fn) as ds:
         p = infer_scale_and_offset(ds.Streaminputs, "PRECIP")
         assert p == (4, 0)
+
+
+def test_scale_and_offset():
+    assert scale_and_offset("K", "TEMP_AVE") == (1, -273.15)
+    assert scale_and_offset("mm", "PRECIP", "6H") == (4, 0)
+
+    with pytest.raises(ValueError):
+        scale_and_offset("mm", "PRECIP")
+
+    with pytest.raises(ValueError):
+        scale_and_offset("mm", "PRECIP", "MS")
+
+
+def test_scale_and_offset_memo():
+    scale_and_offset.cache_clear()
+    for _ in range(3):
+        scale_and_offset("K", "TEMP_AVE")
+    info = scale_and_offset.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+    # Identical units do not require xclim
+    code = (
+        "import sys\n"
+        "from ravenpy.utilities.coords import scale_and_offset\n"
+        "assert scale_and_offset('mm/d', 'PRECIP') == (1, 0)\n"
+        "assert 'xclim' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_infer_time_frequency():
+    time = pd.date_range("2000-01-01", periods=100, freq="6H")
+    assert infer_time_frequency(time) == "6H"
+    assert infer_time_frequency(time[:2]) is None
+
+    # Only the first steps are used
+    irregular = time[:10].append(pd.DatetimeIndex(["2001-01-01"]))
+    assert infer_time_frequency(irregular) == "6H"
+    assert infer_time_frequency(irregular, n=11) is None
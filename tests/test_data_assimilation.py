@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import xarray as xr
 
+from ravenpy.config.commands import HRUState
 from ravenpy.models import GR4JCN
 from ravenpy.utilities.data_assimilation import (
     assimilation_initialization,
@@ -134,6 +135,8 @@ class TestAssimilationGR4JCN:
             n_members=n_members,
             assim_step_days=assim_step_days,
         )
+        assert len(hru_states) == len(basin_states) == n_members
+        assert all(isinstance(s, HRUState) for s in hru_states)
 
         # ==== Reference run ====
         model.config.rvi.run_name = "ref"
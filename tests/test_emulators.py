@@ -1,3 +1,4 @@
+import asyncio
 import datetime as dt
 import zipfile
 from dataclasses import astuple
@@ -5,6 +6,7 @@ from pathlib import Path
 
 import numpy as np
 import pytest
+import xarray as xr
 
 from ravenpy.config import options
 from ravenpy.config.commands import (  # GriddedForcingCommand,; LandUseClassesCommand,; ObservationDataCommand,; SoilClassesCommand,; SoilProfilesCommand,; VegetationClassesCommand,
@@ -17,7 +19,7 @@ from ravenpy.config.commands import (  # GriddedForcingCommand,; LandUseClassesC
     SBGroupPropertyMultiplierCommand,
     Sub,
 )
-from ravenpy.config.rvs import RVI
+from ravenpy.config.rvs import RVI, EnsembleState
 from ravenpy.models import (
     GR4JCN,
     GR4JCN_OST,
@@ -29,8 +31,11 @@ from ravenpy.models import (
     MOHYSE_OST,
     Raven,
     RavenError,
+    RavenWarning,
     get_average_annual_runoff,
 )
+from ravenpy.models.cache import ResultCache
+from ravenpy.models.profiling import Profiler
 
 # Link to THREDDS Data Server netCDF testdata
 TDS = "https://pavics.ouranos.ca/twitcher/ows/proxy/thredds/dodsC/birdhouse/testdata/raven"
@@ -66,6 +71,27 @@ salmon_river_2d = (
     "raven-gr4j-cemaneige/Salmon-River-Near-Prince-George_meteo_daily_2d.nc"
 )
 
+# Run of the Salmon river used to test the execution options
+salmon_kwds = dict(
+    start_date=dt.datetime(2000, 1, 1),
+    end_date=dt.datetime(2002, 1, 1),
+    hrus=(GR4JCN.LandHRU(**salmon_land_hru_1),),
+)
+salmon_params = [
+    (0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+    (0.528, -3.4, 407.3, 1.07, 17, 0.95),
+]
+
+
+@pytest.fixture(scope="module")
+def parallel_run(get_file):
+    """Forcing file, arguments and reference model of a run of two parameter sets in parallel."""
+    ts = get_file(salmon_river)
+    kwds = dict(salmon_kwds, parallel={"params": salmon_params})
+    model = GR4JCN()
+    model(ts, **kwds)
+    return ts, kwds, model
+
 
 class TestGR4JCN:
     def test_error(self, tmp_path, get_file):
@@ -415,6 +441,30 @@ class TestGR4JCN:
         # Should be 13.25446 to be identical to 1D case
         np.testing.assert_almost_equal(model.q_sim.isel(time=-1).data, 12.51634, 5)
 
+    def test_redirect_to_file_write(self, tmpdir, input2d, get_file):
+        """Grid weights written by `GridWeightsCommand.write` are read by Raven."""
+        ts = get_file(salmon_river)
+
+        model = GR4JCN()
+        model.config.rvi.start_date = dt.datetime(2000, 1, 1)
+        model.config.rvi.end_date = dt.datetime(2002, 1, 1)
+        model.config.rvh.hrus = (GR4JCN.LandHRU(**salmon_land_hru_1),)
+        model.config.rvp.params = model.Params(
+            0.529, -3.396, 407.29, 1.072, 16.9, 0.947
+        )
+        model.config.rvp.avg_annual_runoff = get_average_annual_runoff(
+            ts, model.config.rvh.hrus[0].area * 1000 * 1000
+        )
+
+        gw = GridWeightsCommand()
+        rtf = RedirectToFileCommand(tmpdir / Path("grid_weights.rvt"))
+        gw.write(rtf)
+        assert rtf.path.read_text() == gw.to_rv() + "\n"
+        model.config.rvt.grid_weights = rtf
+
+        model(input2d)
+        np.testing.assert_almost_equal(model.q_sim.isel(time=-1).data, 12.51634, 5)
+
     def test_config_update(self):
         model = GR4JCN()
 
@@ -739,10 +789,196 @@ class TestGR4JCN:
         )
 
         assert len(model.diagnostics) == 2
+        assert [len(d["DIAG_NASH_SUTCLIFFE"]) for d in model.diagnostics] == [1, 1]
         assert model.hydrograph.dims["params"] == 2
         z = zipfile.ZipFile(model.outputs["rv_config"])
         assert len(z.filelist) == 10
 
+    def test_evaluate(self, get_file):
+        ts = get_file(salmon_river)
+        params = np.array(salmon_params + [(1.0, -1.0, 300.0, 2.0, 10.0, 0.5)])
+
+        model = GR4JCN(max_workers=2)
+        obj, q = model.evaluate(ts, params, q_sim=True, **salmon_kwds)
+        assert obj.shape == (3,)
+        assert q.shape[0] == 3
+
+        # Initial states are derived from each parameter set
+        for i, p in enumerate(params):
+            model.config.rvc.reset()
+            model(ts, params=p, overwrite=True, **salmon_kwds)
+            np.testing.assert_almost_equal(
+                obj[i], model.diagnostics["DIAG_NASH_SUTCLIFFE"][0]
+            )
+            np.testing.assert_array_almost_equal(
+                q[i], model.q_sim.values.reshape(q[i].shape)
+            )
+
+    @pytest.mark.parametrize(
+        "options",
+        [dict(max_workers=1), dict(share_rv=True), dict(virtual_merge=True)],
+        ids=["max_workers", "share_rv", "virtual_merge"],
+    )
+    @pytest.mark.parametrize("run", ["call", "acall"])
+    def test_parallel_options(self, parallel_run, options, run):
+        """Execution options do not change the outputs of parallel runs."""
+        ts, kwds, reference = parallel_run
+        model = GR4JCN(**options)
+        if run == "acall":
+            asyncio.run(model.acall(ts, timeout=60, **kwds))
+        else:
+            model(ts, **kwds)
+
+        assert [p.returncode for p in model.processes] == [0, 0]
+        np.testing.assert_array_equal(model.q_sim, reference.q_sim)
+
+    def test_partial_failure(self, get_file):
+        ts = get_file(salmon_river)
+        bad_hru = dict(salmon_land_hru_1, area=0)
+        kwds = dict(
+            salmon_kwds,
+            params=salmon_params[0],
+            parallel={
+                "hrus": [
+                    (GR4JCN.LandHRU(**salmon_land_hru_1),),
+                    (GR4JCN.LandHRU(**bad_hru),),
+                    (GR4JCN.LandHRU(**salmon_land_hru_1),),
+                ]
+            },
+        )
+
+        model = GR4JCN()
+        with pytest.raises(RavenError) as exc:
+            model(ts, **kwds)
+        assert list(exc.value.failures) == [1]
+        assert "negative or zero area" in str(exc.value)
+        # The outputs of completed simulations are parsed before raising
+        assert len(model.ind_outputs["hydrograph"]) == 2
+
+        # The outputs of completed simulations are kept
+        model = GR4JCN(errors="warn")
+        with pytest.warns(RavenWarning, match="Simulation 1 failed"):
+            model(ts, **kwds)
+        assert [p.status for p in model.processes] == [
+            "completed",
+            "failed",
+            "completed",
+        ]
+        assert list(model.failures) == [1]
+        assert len(model.ind_outputs["hydrograph"]) == 2
+        # Failed members are missing values in the merged outputs
+        assert model.hydrograph.dims["pdim"] == 3
+        q = model.q_sim.values
+        assert np.isnan(q[1]).all()
+        assert not np.isnan(q[[0, 2]]).all()
+        np.testing.assert_array_equal(q[0], q[2])
+
+    def test_cache(self, parallel_run, tmp_path):
+        ts, kwds, reference = parallel_run
+        cache = ResultCache(tmp_path / "cache")
+
+        model = GR4JCN()
+        model.cache = cache
+        model(ts, **kwds)
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert not any(p.cached for p in model.processes)
+
+        cached = GR4JCN()
+        cached.cache = cache
+        cached(ts, **kwds)
+        assert (cache.hits, cache.misses) == (2, 2)
+        assert all(p.cached for p in cached.processes)
+        np.testing.assert_array_equal(cached.q_sim, reference.q_sim)
+
+    def test_share_rv(self, parallel_run):
+        ts, kwds, _ = parallel_run
+        shared = GR4JCN(share_rv=True)
+        shared(ts, **kwds)
+
+        p0, p1 = (shared.exec_path / "model" / f"p{i:02}" for i in range(2))
+        for rvx in ["rvh", "rvt"]:
+            assert (p0 / f"gr4jcn.{rvx}").samefile(p1 / f"gr4jcn.{rvx}")
+        for rvx in ["rvp", "rvi"]:
+            assert not (p0 / f"gr4jcn.{rvx}").samefile(p1 / f"gr4jcn.{rvx}")
+
+    def test_virtual_merge(self, parallel_run):
+        ts, kwds, reference = parallel_run
+        assert reference.outputs["hydrograph"].exists()
+
+        virtual = GR4JCN(virtual_merge=True)
+        virtual(ts, **kwds)
+        assert isinstance(virtual.outputs["hydrograph"], xr.Dataset)
+        assert not list(virtual.final_path.glob("*.nc"))
+        xr.testing.assert_equal(virtual.hydrograph, reference.hydrograph)
+        assert virtual.q_sim.shape == (2, 732, 1)
+
+    def test_output_handles(self, get_file):
+        ts = get_file(salmon_river)
+        model = GR4JCN()
+        model(ts, params=salmon_params[0], **salmon_kwds)
+
+        hydrograph = model.hydrograph
+        assert model.hydrograph is hydrograph
+        q = model.q_sim_values
+        assert model.q_sim_values is q
+        assert not q.flags.writeable
+        np.testing.assert_array_equal(q, model.q_sim.values)
+
+        # Handles are invalidated by a new run
+        model(ts, params=(0.1, -3.396, 407.29, 1.072, 16.9, 0.947), overwrite=True)
+        assert model.hydrograph is not hydrograph
+        assert not np.array_equal(model.q_sim_values, q)
+        np.testing.assert_array_equal(model.q_sim_values, model.q_sim.values)
+
+    def test_ensemble_state(self, get_file):
+        ts = get_file(salmon_river)
+        model = GR4JCN()
+        model(
+            ts,
+            start_date=dt.datetime(2000, 1, 1),
+            end_date=dt.datetime(2000, 2, 1),
+            hrus=(GR4JCN.LandHRU(**salmon_land_hru_1),),
+            params=(0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+        )
+
+        state = EnsembleState.from_solutions([model.solution] * 3)
+        state.hru_values[2, :, state.hru_names.index("SOIL[0]")] *= 0.5
+
+        model(
+            ts,
+            start_date=dt.datetime(2000, 2, 1),
+            end_date=dt.datetime(2000, 3, 1),
+            parallel=dict(hru_state=state, basin_state=state),
+            overwrite=True,
+        )
+        q = model.q_sim.isel(nbasins=0).values
+        assert q.shape == (3, 30)
+        np.testing.assert_array_equal(q[0], q[1])
+        assert not np.allclose(q[0], q[2])
+
+    def test_profiler_resource_usage(self, parallel_run):
+        ts, kwds, _ = parallel_run
+        model = GR4JCN()
+        model.profiler = Profiler()
+        model(ts, **kwds)
+
+        s = model.profiler.summary()
+        for phase in ["setup", "run", "execute", "parse_results", "merge_output"]:
+            assert s[phase]["count"] >= 1
+        assert s["dump_rv"]["count"] == 2
+        assert s["dump_rv"]["size"] > 0
+        assert s["merge_output"]["size"] > 0
+
+        procs = [e for e in model.profiler.events if e["phase"] == "process"]
+        assert [e["member"] for e in procs] == [0, 1]
+        assert all(e["duration"] > 0 for e in procs)
+
+        usage = model.resource_usage
+        assert usage.max_rss.dims == ("params",)
+        assert usage.sizes["params"] == 2
+        assert (usage.wall_time > 0).all()
+        assert (usage.bytes_written > 0).all()
+
     def test_parallel_basins(self, input2d):
         ts = input2d
         model = GR4JCN()
@@ -0,0 +1,198 @@
+import datetime as dt
+import pickle
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from ravenpy.models import GR4JCN, GR4JCN_OST
+from ravenpy.models.evaluations import EvaluationStore, config_hash, objective_name
+from ravenpy.utilities.metrics import objective
+
+salmon_river = "raven-gr4j-cemaneige/Salmon-River-Near-Prince-George_meteo_daily.nc"
+salmon_land_hru_1 = dict(
+    area=4250.6, elevation=843.0, latitude=54.4848, longitude=-123.3659
+)
+
+
+class TestEvaluationStore:
+    def test_get_put(self):
+        store = EvaluationStore(digits=4)
+        assert store.get("a", [1.0, 2.0]) is None
+
+        store.put("a", [1.0, 2.0], 0.5)
+        assert store.get("a", [1.00001, 2.0]) == 0.5
+        assert ("a", [1.0, 2.0]) in store
+        assert store.get("b", [1.0, 2.0]) is None
+        assert (store.hits, store.misses) == (1, 2)
+
+        # Duplicates are not stored again
+        store.put("a", [1.00001, 2.0], 0.6)
+        assert len(store) == 1
+        assert store.get("a", [1.0, 2.0]) == 0.5
+
+    def test_resume(self, tmp_path):
+        fn = tmp_path / "evaluations.jsonl"
+        store = EvaluationStore(fn)
+        store.put("a", [1.0, 2.0], 0.5)
+        store.put("a", [3.0, 4.0], 0.7)
+
+        # Record cut short by a killed process
+        with open(fn, "a") as f:
+            f.write('{"config": "a", "params": [5.0')
+
+        store = EvaluationStore(fn)
+        assert len(store) == 2
+        assert store.get("a", [3.0, 4.0]) == 0.7
+        # The file is not truncated, the next record starts on a new line
+        assert fn.read_text().endswith("[5.0")
+        store.put("a", [5.0, 6.0], 0.9)
+        assert len(fn.read_text().splitlines()) == 4
+
+        store = EvaluationStore(fn)
+        x, y = store.history()
+        np.testing.assert_array_equal(x, [[1, 2], [3, 4], [5, 6]])
+        np.testing.assert_array_equal(y, [0.5, 0.7, 0.9])
+
+    def test_history(self):
+        store = EvaluationStore()
+        store.put("a", [1.0, 2.0], 0.5)
+        store.put("b", [1.0, 2.0, 3.0], 0.7)
+        assert store.configs == ["a", "b"]
+
+        with pytest.raises(ValueError):
+            store.history()
+        x, y = store.history("b")
+        assert x.shape == (1, 3)
+
+        x, y = EvaluationStore().history()
+        assert x.shape == (0, 0) and y.shape == (0,)
+
+    def test_export(self, tmp_path):
+        store = EvaluationStore()
+        store.put("a", [1.0, 2.0], 0.5)
+        store.put("a", [3.0, 4.0], 0.7)
+
+        df = store.to_dataframe(names=["X1", "X2"])
+        assert list(df.columns) == ["time", "objective", "X1", "X2"]
+        np.testing.assert_array_equal(df["X2"], [2, 4])
+
+        store.to_netcdf(tmp_path / "history.nc", names=["X1", "X2"])
+        with xr.open_dataset(tmp_path / "history.nc") as ds:
+            assert ds.params.dims == ("evaluation", "param")
+            assert list(ds.param.values) == ["X1", "X2"]
+            np.testing.assert_array_equal(ds.objective, [0.5, 0.7])
+            assert ds.attrs["config"] == "a"
+
+        with pytest.raises(ValueError):
+            store.to_dataframe(names=["X1"])
+
+    def test_pickle(self, tmp_path):
+        store = EvaluationStore(tmp_path / "evaluations.jsonl")
+        store.put("a", [1.0, 2.0], 0.5)
+        copy = pickle.loads(pickle.dumps(store))
+        copy.put("a", [3.0, 4.0], 0.7)
+        assert len(EvaluationStore(store.path)) == 2
+
+
+def test_config_hash(tmp_path):
+    ts = tmp_path / "forcing.nc"
+    ts.write_text("data")
+    rv = ":CreationDate 2022-01-01 00:00:00\n:RunName run-0\n"
+
+    h = config_hash([rv], [ts], "3.6", "DIAG_NASH_SUTCLIFFE")
+    assert h == config_hash(
+        [rv.replace("run-0", "run-1")], [ts], "3.6", "DIAG_NASH_SUTCLIFFE"
+    )
+    assert h != config_hash([rv], [ts], "3.6", "DIAG_RMSE")
+
+
+def test_objective_name():
+    assert objective_name("DIAG_RMSE") == "DIAG_RMSE"
+    nse = objective_name("DIAG_RMSE", objective("NASH_SUTCLIFFE"))
+    assert nse == objective_name("DIAG_RMSE", objective("NASH_SUTCLIFFE"))
+    assert nse != objective_name("DIAG_RMSE", objective("KLING_GUPTA"))
+    assert nse != objective_name(
+        "DIAG_RMSE", objective("NASH_SUTCLIFFE", mask=[True, False])
+    )
+
+
+class TestModelStore:
+    def test_evaluate(self, get_file, tmp_path):
+        ts = get_file(salmon_river)
+        params = np.array(
+            [
+                (0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+                (1.0, -1.0, 300.0, 2.0, 10.0, 0.5),
+                (0.529, -3.396, 407.29, 1.072, 16.9, 0.947),
+            ]
+        )
+        kwds = dict(
+            start_date=dt.datetime(2000, 1, 1), end_date=dt.datetime(2002, 1, 1)
+        )
+
+        def make_model():
+            model = GR4JCN()
+            model.config.rvh.hrus = (GR4JCN.LandHRU(**salmon_land_hru_1),)
+            model.store = EvaluationStore(tmp_path / "evaluations.jsonl")
+            return model
+
+        model = make_model()
+        obj = model.evaluate(ts, params, **kwds)
+        # Duplicates are only run once
+        assert len(model.processes) == 2
+        assert obj[0] == obj[2]
+        assert len(model.store) == 2
+
+        obj_func = objective("NASH_SUTCLIFFE")
+        np.testing.assert_allclose(
+            model.evaluate(ts, params[:1], obj_func=obj_func, **kwds),
+            obj[:1],
+            rtol=1e-5,
+        )
+        assert len(model.store.configs) == 2
+
+        # Resume with a new model
+        model = make_model()
+        model.processes = []
+        np.testing.assert_array_equal(model.evaluate(ts, params[::-1], **kwds), obj)
+        assert model.processes == []
+        assert model.store.hits == 2
+
+    def test_ostrich_warm_start(self, get_file, tmp_path):
+        ts = get_file(salmon_river)
+        model = GR4JCN_OST()
+        model.config.rvh.hrus = (GR4JCN.LandHRU(**salmon_land_hru_1),)
+        model.config.update("lowerBounds", (0.01, -15.0, 10.0, 0.0, 1.0, 0.0))
+        model.config.update("upperBounds", (2.5, 10.0, 700.0, 7.0, 30.0, 1.0))
+        model.store = EvaluationStore(tmp_path / "evaluations.jsonl")
+        kwds = dict(
+            start_date=dt.datetime(2000, 1, 1), end_date=dt.datetime(2002, 1, 1)
+        )
+
+        # Only write the configuration files, as done before running Ostrich
+        model.setup()
+        model.run(ts, **kwds)
+        assert not model.config.ost.warm_start
+        config = model._store_key
+
+        model.store.put(config, (0.5, -3.0, 400.0, 1.0, 16.0, 0.9), 0.5)
+        # Outside the bounds
+        model.store.put(config, (5.0, -3.0, 400.0, 1.0, 16.0, 0.9), 0.7)
+        model.run(ts, **kwds)
+        assert "OstrichWarmStart   yes" in (model.exec_path / "ostIn.txt").read_text()
+        data = np.loadtxt(model.exec_path / "OstModel0.txt", skiprows=1, ndmin=2)
+        # Ostrich minimizes the negative NSE
+        np.testing.assert_array_equal(
+            data, [[0, -0.5, 0.5, -3.0, 400.0, 1.0, 16.0, 0.9]]
+        )
+
+        # Evaluations of a killed Ostrich run are imported in the store
+        with open(model.exec_path / "OstModel0.txt", "a") as f:
+            f.write(
+                "1  -6.0E-01  6.0E-01  -3.0E+00  4.0E+02  1.0E+00  1.6E+01  9.0E-01\n"
+            )
+            f.write("2  -7.0E-01  7.0E-01")
+        model.run(ts, **kwds)
+        assert model.store.get(config, (0.6, -3.0, 400.0, 1.0, 16.0, 0.9)) == 0.6
+        assert len(model.store) == 3
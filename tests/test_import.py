@@ -0,0 +1,78 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Modules that should only be imported when models are used
+HEAVY = [
+    "haversine",
+    "netCDF4",
+    "pydantic",
+    "ravenpy.models.base",
+    "ravenpy.models.emulators.gr4jcn",
+    "statsmodels",
+    "xarray",
+    "xclim",
+]
+
+
+def imported(code):
+    """Run `code` in a fresh interpreter and return the names of the imported modules."""
+    code = f"{code}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return set(json.loads(proc.stdout.splitlines()[-1]))
+
+
+class TestLazyImport:
+    def test_packages(self):
+        modules = imported(
+            "import ravenpy, ravenpy.models, ravenpy.models.emulators, ravenpy.utilities"
+        )
+        assert modules.isdisjoint(HEAVY)
+
+    def test_unknown_attribute(self):
+        # Unknown names do not import the emulator modules
+        modules = imported(
+            "import ravenpy.models.emulators as emulators\n"
+            "try:\n"
+            "    emulators.NotAModel\n"
+            "except AttributeError:\n"
+            "    pass\n"
+        )
+        assert not any(m.startswith("ravenpy.models.emulators.") for m in modules)
+
+    def test_emulator(self):
+        modules = imported("from ravenpy.models import GR4JCN")
+        assert "ravenpy.models.emulators.gr4jcn" in modules
+        assert "ravenpy.models.emulators.hmets" not in modules
+
+    def test_attributes(self):
+        import ravenpy.models as models
+        import ravenpy.utilities as utilities
+        from ravenpy.models.emulators.gr4jcn import GR4JCN
+
+        assert models.GR4JCN is GR4JCN
+        assert models.get_model("gr4jcn") is GR4JCN
+        assert "GR4JCN" in dir(models)
+        assert callable(utilities.regionalize)
+
+        # Classes imported by the emulator modules are still available
+        from ravenpy.config.commands import HRU
+        from ravenpy.models.emulators import HRU as reexported
+
+        assert reexported is HRU
+
+        from ravenpy.config import options
+        from ravenpy.models import options as models_options
+        from ravenpy.models.emulators import options as emulators_options
+
+        assert emulators_options is models_options is options
+
+        with pytest.raises(AttributeError):
+            models.NotAModel
+
+        with pytest.raises(ValueError):
+            models.get_model("not_a_model")
@@ -0,0 +1,179 @@
+import datetime as dt
+import os
+import urllib.error
+import urllib.request
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from ravenpy.config import rvs
+from ravenpy.config.metadata import clear_nc_metadata, get_nc_metadata
+
+
+def make_forcing(fn, n=3):
+    time = pd.date_range("2000-01-01", periods=10)
+    ds = xr.Dataset(
+        {
+            "pr": (("station", "time"), np.ones((n, 10)), {"units": "mm/d"}),
+            "tas": (("station", "time"), np.zeros((n, 10)), {"units": "K"}),
+            "lat": ("station", np.linspace(45, 46, n), {"standard_name": "latitude"}),
+            "lon": (
+                "station",
+                np.linspace(-70, -71, n),
+                {"standard_name": "longitude"},
+            ),
+            "elevation": ("station", np.full(n, 100.0)),
+            "station_id": ("station", np.array([f"S{i}" for i in range(n)])),
+        },
+        coords={"time": time},
+    )
+    ds.to_netcdf(fn)
+    return fn
+
+
+class TestNcMetadata:
+    def test_metadata(self, tmp_path):
+        meta = get_nc_metadata(make_forcing(tmp_path / "in.nc"))
+
+        assert set(meta.variables) == {
+            "pr",
+            "tas",
+            "lat",
+            "lon",
+            "elevation",
+            "station_id",
+        }
+        assert meta.variables["pr"].dims == ("station", "time")
+        assert meta.variables["pr"].size == 30
+        assert meta.variables["pr"].shape == (3, 10)
+        assert meta.variables["tas"].units == "K"
+        assert meta.latitude.name == "lat"
+        assert meta.longitude.values.tolist() == [-70, -70.5, -71]
+        assert meta.elevation.name == "elevation"
+        assert meta.station_id.values.tolist() == ["S0", "S1", "S2"]
+        assert meta.ntime == 10
+        assert meta.start == pd.Timestamp("2000-01-01")
+        assert meta.end == pd.Timestamp("2000-01-10")
+        assert meta.freq == "D"
+
+    def test_cache(self, tmp_path, monkeypatch):
+        fn = make_forcing(tmp_path / "in.nc")
+        clear_nc_metadata()
+
+        opened = []
+        open_dataset = xr.open_dataset
+
+        def spy(*args, **kwargs):
+            opened.append(args[0])
+            return open_dataset(*args, **kwargs)
+
+        monkeypatch.setattr(xr, "open_dataset", spy)
+
+        meta = get_nc_metadata(fn)
+        assert get_nc_metadata(str(fn)) is meta
+        assert len(opened) == 1
+
+        # The cache is invalidated when the file changes
+        make_forcing(fn, n=4)
+        st = os.stat(fn)
+        os.utime(fn, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert get_nc_metadata(fn).variables["pr"].size == 40
+        assert len(opened) == 2
+
+    def test_cache_url(self, tmp_path, monkeypatch):
+        fn = make_forcing(tmp_path / "in.nc")
+        url = "https://example.com/dodsC/in.nc"
+        clear_nc_metadata()
+
+        opened = []
+        open_dataset = xr.open_dataset
+
+        def spy(source, *args, **kwargs):
+            opened.append(source)
+            return open_dataset(fn, *args, **kwargs)
+
+        requests = []
+        etag = ["a"]
+
+        def urlopen(req, timeout=None):
+            requests.append(req.get_method())
+            if etag[0] is None:
+                raise urllib.error.URLError("offline")
+            response = mock.MagicMock()
+            response.__enter__.return_value.headers = {"ETag": etag[0]}
+            return response
+
+        monkeypatch.setattr(xr, "open_dataset", spy)
+        monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+
+        meta = get_nc_metadata(url)
+        assert (requests, opened) == (["HEAD"], [url])
+
+        # The server is not contacted again by default
+        assert get_nc_metadata(url) is meta
+        assert len(requests) == 1
+
+        assert get_nc_metadata(url, revalidate=True) is meta
+        assert len(requests) == 2
+
+        # Cached metadata are used if the server cannot be reached
+        etag[0] = None
+        assert get_nc_metadata(url, revalidate=True) is meta
+        assert len(opened) == 1
+
+        etag[0] = "b"
+        assert get_nc_metadata(url, revalidate=True) is not meta
+        assert len(opened) == 2
+
+    def test_configure(self, tmp_path, monkeypatch):
+        fn = make_forcing(tmp_path / "in.nc")
+        get_nc_metadata(fn)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("File opened")
+
+        monkeypatch.setattr(xr, "open_dataset", fail)
+        monkeypatch.setattr(xr, "open_mfdataset", fail)
+
+        rvi = rvs.RVI(config=None)
+        rvi.configure_from_nc_data([fn])
+        assert rvi.start_date == dt.datetime(2000, 1, 1)
+        assert rvi.calendar == "PROLEPTIC_GREGORIAN"
+
+        rvt = rvs.RVT(config=None)
+        rvt.meteo_idx = [0, 2]
+        rvt.configure_from_nc_data([fn])
+        assert rvt._var_cmds["tas"].offset == -273.15
+
+        out = rvt.to_rv()
+        assert ":Gauge S2" in out
+        assert ":Latitude 46.0" in out
+
+    def test_configure_without_time(self, tmp_path):
+        fn = make_forcing(tmp_path / "in.nc")
+        static = tmp_path / "static.nc"
+        xr.Dataset({"pr": ("station", np.ones(3), {"units": "mm/d"})}).to_netcdf(static)
+
+        # Files without time coordinate are ignored to set the simulation period
+        rvi = rvs.RVI(config=None)
+        rvi.configure_from_nc_data([static, fn])
+        assert rvi.start_date == dt.datetime(2000, 1, 1)
+        assert rvi.calendar == "PROLEPTIC_GREGORIAN"
+
+        rvt = rvs.RVT(config=None)
+        rvt.configure_from_nc_data([static])
+        assert rvt._number_grid_cells == 3
+
+    def test_configure_calendars(self, tmp_path):
+        fn = make_forcing(tmp_path / "in.nc")
+        other = tmp_path / "noleap.nc"
+        ds = xr.open_dataset(fn)
+        ds.time.encoding["calendar"] = "noleap"
+        ds.to_netcdf(other)
+        ds.close()
+
+        with pytest.raises(ValueError, match="different calendars"):
+            rvs.RVI(config=None).configure_from_nc_data([fn, other])
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from ravenpy.utilities import metrics
+
+
+@pytest.fixture
+def flows():
+    rng = np.random.default_rng(42)
+    obs = 10 + 5 * np.sin(np.linspace(0, 12, 365))[:, np.newaxis] + np.zeros((1, 2))
+    sim = obs * rng.uniform(0.8, 1.2, (3, 1, 1)) + rng.normal(0, 1, (3, 365, 2))
+    return sim, obs
+
+
+def _nse(s, o):
+    return 1 - np.sum((s - o) ** 2) / np.sum((o - o.mean()) ** 2)
+
+
+def _kge(s, o):
+    r = np.corrcoef(s, o)[0, 1]
+    return 1 - np.sqrt(
+        (r - 1) ** 2 + (s.std() / o.std() - 1) ** 2 + (s.mean() / o.mean() - 1) ** 2
+    )
+
+
+class TestMetrics:
+    def test_shape(self, flows):
+        sim, obs = flows
+        for name, (func, _) in metrics.METRICS.items():
+            assert func(sim, obs).shape == (3, 2), name
+            assert func(sim[0], obs).shape == (2,), name
+
+    def test_reference(self, flows):
+        sim, obs = flows
+        nse = metrics.nash_sutcliffe(sim, obs)
+        kge = metrics.kling_gupta(sim, obs)
+        for m in range(3):
+            for b in range(2):
+                s, o = sim[m, :, b], obs[:, b]
+                np.testing.assert_allclose(nse[m, b], _nse(s, o))
+                np.testing.assert_allclose(kge[m, b], _kge(s, o))
+
+        np.testing.assert_allclose(metrics.nash_sutcliffe(obs, obs), 1)
+        np.testing.assert_allclose(metrics.kling_gupta(obs, obs, version="2012"), 1)
+        np.testing.assert_allclose(metrics.rmse(obs + 2, obs), 2)
+        np.testing.assert_allclose(metrics.mean_absolute_error(obs - 2, obs), 2)
+        np.testing.assert_allclose(metrics.percent_bias(obs * 1.1, obs), 10)
+        np.testing.assert_allclose(metrics.fdc_bias(obs * 1.1, obs, 0.7, 1), 10)
+
+    def test_missing(self, flows):
+        sim, obs = flows
+        obs = obs.copy()
+        obs[:100] = np.nan
+        sim = sim.copy()
+        sim[1, 200:] = np.nan
+
+        out = metrics.nash_sutcliffe(sim, obs)
+        np.testing.assert_allclose(out[1, 0], _nse(sim[1, 100:200, 0], obs[100:200, 0]))
+
+        # No valid time steps
+        sim[2] = np.nan
+        for func, _ in metrics.METRICS.values():
+            assert np.isnan(func(sim, obs)[2]).all()
+        assert np.isnan(metrics.fdc_bias(sim, obs)[2]).all()
+
+    def test_period(self, flows):
+        sim, obs = flows
+        time = np.arange("2000-01-01", "2000-12-31", dtype="datetime64[D]")
+        mask = metrics.period_mask(time, [(None, "2000-01-31"), ("2000-12-01", None)])
+        assert mask.sum() == 31 + 30
+
+        expected = metrics.rmse(sim[:, mask], obs[mask])
+        np.testing.assert_allclose(metrics.rmse(sim, obs, mask), expected)
+
+    def test_objective(self, flows):
+        sim, obs = flows
+        kge = metrics.kling_gupta(sim, obs, version="2012")
+        obj = metrics.objective("KLING_GUPTA", weights=[3, 1], version="2012")
+        np.testing.assert_allclose(obj(sim, obs), (3 * kge[:, 0] + kge[:, 1]) / 4)
+
+        # Signed metrics are minimized in absolute value
+        bias = metrics.objective("PCT_BIAS")
+        np.testing.assert_allclose(bias(obs * 0.9, obs), bias(obs * 1.1, obs))
+        np.testing.assert_allclose(bias(obs * 0.9, obs), 10)
+        assert bias.name != metrics.objective(metrics.percent_bias).name
+
+        # NaN basins are ignored
+        np.testing.assert_allclose(metrics.weighted([[np.nan, 2.0]]), [2.0])
+
+        with pytest.raises(ValueError):
+            metrics.kling_gupta(sim, obs, version="2021")
@@ -0,0 +1,226 @@
+from textwrap import dedent
+
+import numpy as np
+import pytest
+
+from ravenpy.config.commands import (
+    CustomOutput,
+    DataCommand,
+    EvaluationPeriod,
+    GaugeCommand,
+    GridWeightsCommand,
+    GriddedForcingCommand,
+    HRUTable,
+    ObservationDataCommand,
+    RedirectToFileCommand,
+    SoilClassesCommand,
+    SoilProfilesCommand,
+    StationForcingCommand,
+    SubBasinTable,
+)
+from ravenpy.config.parser import RVFile, split, tokenize
+from ravenpy.config.rvs import Config
+from ravenpy.utilities.ravenio import parse_configuration
+
+RVH = dedent(
+    """\
+    # Header comment
+    :SubBasins
+      :Attributes   NAME  DOWNSTREAM_ID  PROFILE  REACH_LENGTH  GAUGED
+      :Units        none  none           none     km            none
+      1             sub1  -1             chn_10   ZERO-         1
+      2             sub2  1              chn_10   2.5           0
+    :EndSubBasins
+
+    :HRUs
+      :Attributes   AREA  ELEVATION  LATITUDE  LONGITUDE  BASIN_ID  LAND_USE_CLASS  VEG_CLASS  SOIL_PROFILE  AQUIFER_PROFILE  TERRAIN_CLASS  SLOPE  ASPECT
+      :Units        km2   m          deg       deg        none      none            none       none          none             none           deg    deg
+      1             100.0 300.0      45.0      -75.0      1         LU_ALL          VEG_ALL    DEFAULT_P     [NONE]           [NONE]         0.0    0.0
+      2             50.0  250.0      45.5      -75.5      2         LU_ALL          VEG_ALL    DEFAULT_P     [NONE]           [NONE]         0.0    0.0
+    :EndHRUs
+
+    :RedirectToFile  data/weights.txt   # trailing comment
+    :SubBasinProperties
+      :Parameters, GAMMA_SHAPE
+    :EndSubBasinProperties
+    """
+)
+
+
+def test_tokenize():
+    assert tokenize(":Alias  A  B # comment\n") == ("Alias", ["A", "B"])
+    assert tokenize("  :Parameters, X1, X2\n") == ("Parameters", ["X1", "X2"])
+    assert tokenize("1 2 3\n") is None
+    assert tokenize("# :Commented\n") is None
+    assert split("1, 2 # 3") == ["1", "2"]
+
+
+class TestRVFile:
+    def test_round_trip(self):
+        rvh = RVFile.parse(RVH)
+        assert rvh.to_rv() == RVH
+
+        names = [n.name for n in rvh.nodes if n.name]
+        assert names == ["SubBasins", "HRUs", "RedirectToFile", "SubBasinProperties"]
+        assert rvh.find("Parameters").args == ["GAMMA_SHAPE"]
+        assert "Units" in rvh
+        assert "Gauge" not in rvh
+        with pytest.raises(KeyError):
+            rvh["Gauge"]
+
+    def test_tables(self):
+        rvh = RVFile.parse(RVH)
+
+        sb = rvh["SubBasins"]
+        assert isinstance(sb, SubBasinTable)
+        np.testing.assert_array_equal(sb.columns["subbasin_id"], [1, 2])
+        np.testing.assert_array_equal(sb.columns["reach_length"], [0, 2.5])
+        np.testing.assert_array_equal(sb.columns["gauged"], [True, False])
+
+        hrus = rvh["HRUs"]
+        assert isinstance(hrus, HRUTable)
+        np.testing.assert_array_equal(hrus.columns["area"], [100, 50])
+        np.testing.assert_array_equal(hrus.columns["subbasin_id"], [1, 2])
+        assert hrus.columns["soil_profile"][0] == "DEFAULT_P"
+
+        assert rvh["RedirectToFile"] == RedirectToFileCommand("data/weights.txt")
+        # Unknown commands
+        assert rvh["SubBasinProperties"] is None
+
+    def test_replace(self):
+        rvh = RVFile.parse(RVH)
+        hrus = rvh["HRUs"]
+        hrus.columns["area"] = hrus.columns["area"] * 2
+        rvh["HRUs"] = hrus
+
+        out = rvh.to_rv()
+        assert out.startswith(RVH[: RVH.index(":HRUs")])
+        assert out.endswith(RVH[RVH.index("\n:RedirectToFile") :])
+        assert RVFile.parse(out)["HRUs"].columns["area"][0] == 200
+
+        rvh["SoilClasses"] = SoilClassesCommand((SoilClassesCommand.Record("TOPSOIL"),))
+        assert rvh.to_rv().rstrip().endswith(":EndSoilClasses")
+
+    def test_unmatched(self):
+        s = ":Block\n  :Open A\n  1 2\n:EndBlock\n:Open B\n"
+        rv = RVFile.parse(s)
+        assert rv.to_rv() == s
+        (block,) = [n for n in rv.nodes if n.name == "Block"]
+        assert [n.name for n in block.children] == ["Open", None]
+        assert not rv.find("Open").is_block
+
+    def test_nested(self):
+        s = ":A\n :B\n  :C\n  :EndC\n :EndB\n:EndA\n"
+        rv = RVFile.parse(s)
+        assert [n.name for n in rv.iter()] == ["A", "B", "C"]
+        assert rv.find("C").is_block
+        assert rv.to_rv() == s
+
+    def test_grid_weights(self):
+        s = dedent(
+            """\
+            :GridWeights
+              :NumberHRUs 1
+              :NumberGridCells 2
+              1 0 0.25
+              1 1 0.75
+            :EndGridWeights
+            """
+        )
+        gw = RVFile.parse(s)["GridWeights"]
+        assert isinstance(gw, GridWeightsCommand)
+        assert gw.number_grid_cells == 2
+        np.testing.assert_array_equal(gw.data["weight"], [0.25, 0.75])
+
+    def test_soil_profiles(self):
+        s = ":SoilProfiles\n  DEFAULT_P, 2, TOPSOIL, 0.5, FAST_RES, 100.0\n:EndSoilProfiles\n"
+        (rec,) = RVFile.parse(s)["SoilProfiles"].soil_profiles
+        assert rec == SoilProfilesCommand.Record(
+            "DEFAULT_P", ("TOPSOIL", "FAST_RES"), (0.5, 100.0)
+        )
+
+    def test_rvt(self):
+        data = DataCommand(
+            data_type="RAINFALL",
+            units="mm/d",
+            file_name_nc="forcing.nc",
+            var_name_nc="pr",
+            index=2,
+            scale=2.0,
+            offset=1.0,
+            deaccumulate=True,
+        )
+        gauge = GaugeCommand(
+            name="G1",
+            latitude=45,
+            longitude=-70,
+            elevation=100,
+            snow_correction=None,
+            monthly_ave_temperature=(1.0, 2.0),
+            data_cmds=(data,),
+        )
+        obs = ObservationDataCommand(
+            data_type="HYDROGRAPH",
+            subbasin_id=3,
+            units="m3/s",
+            file_name_nc="qobs.nc",
+            var_name_nc="qobs",
+            time_shift=0.5,
+        )
+        forcing = StationForcingCommand(
+            name="PRECIP",
+            units="mm/d",
+            data_type="PRECIP",
+            file_name_nc="forcing.nc",
+            var_name_nc="pr",
+            grid_weights=RedirectToFileCommand("weights.txt"),
+        )
+        gridded = GriddedForcingCommand(
+            name="TEMP",
+            data_type="TEMP_AVE",
+            file_name_nc="forcing.nc",
+            var_name_nc="tas",
+            dim_names_nc=("lon", "lat", "time"),
+        )
+        cmds = [gauge, obs, forcing, gridded]
+        rvt = RVFile.parse("\n".join(map(str, cmds)))
+        for name, cmd in zip(
+            ["Gauge", "ObservationData", "StationForcing", "GriddedForcing"], cmds
+        ):
+            assert rvt[name] == cmd
+        assert rvt["Gauge"].snow_correction is None
+
+    def test_rvi(self):
+        period = EvaluationPeriod("CALIBRATION", "2000-01-01", "2005-12-31")
+        histogram = CustomOutput("DAILY", "HISTOGRAM 0 10 5", "SNOW", "BY_HRU")
+        average = CustomOutput("YEARLY", "AVERAGE", "PRECIP", "BY_BASIN", "out.nc")
+        rvi = RVFile.parse("\n".join(map(str, [period, histogram, average])) + "\n")
+        assert rvi["EvaluationPeriod"] == period
+        assert [n.command for n in rvi.iter("CustomOutput")] == [histogram, average]
+
+    def test_large_file(self):
+        lines = [":HRUs\n", "  :Attributes AREA ELEVATION\n"]
+        lines += [f"  {i} 1.0 100.0\n" for i in range(1, 50_001)]
+        lines += [":EndHRUs\n"]
+        rv = RVFile(lines)
+        assert len(rv["HRUs"].columns["area"]) == 50_000
+
+
+def test_config_rv_file(tmp_path):
+    fn = tmp_path / "model.rvh"
+    fn.write_text(RVH)
+
+    conf = Config(model=None)
+    conf.set_rv_file(fn)
+    assert conf.rvh.content == RVH
+
+    hrus = conf.rvh.rv_file["HRUs"]
+    hrus.columns["elevation"] = hrus.columns["elevation"] + 10
+    conf.rvh.rv_file["HRUs"] = hrus
+    assert RVFile.parse(conf.rvh.content)["HRUs"].columns["elevation"][0] == 310
+
+    # Blocks are not converted to command objects
+    out = parse_configuration(fn)
+    assert out["HRUs"] is True
+    assert out["RedirectToFile"] == "data/weights.txt"
+    assert out["SubBasinProperties"] is True
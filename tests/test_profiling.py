@@ -0,0 +1,65 @@
+import json
+import logging
+import time
+
+from ravenpy.models.profiling import JSONLinesSink, LoggingSink, Profiler, timed
+
+
+class Model:
+    psim = 3
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+
+    @timed("work", member=True, size=lambda self, out: out)
+    def work(self, n):
+        time.sleep(0.01)
+        return n
+
+
+class TestProfiler:
+    def test_phase(self):
+        events = []
+        p = Profiler(sinks=[events.append])
+        with p.phase("a", member=1) as extra:
+            extra["size"] = 10
+        p.record("a", duration=1.0, size=5)
+        p.record("b", duration=2.0)
+
+        assert events == p.events
+        assert events[0]["phase"] == "a"
+        assert events[0]["member"] == 1
+        assert events[0]["size"] == 10
+
+        s = p.summary()
+        assert s["a"]["count"] == 2
+        assert s["a"]["size"] == 15
+        assert s["a"]["max"] == 1.0
+        assert s["b"]["mean"] == 2.0
+
+        p.reset()
+        assert p.events == []
+        assert p.summary() == {}
+
+    def test_timed(self):
+        assert Model().work(5) == 5
+
+        p = Profiler()
+        assert Model(p).work(5) == 5
+        (event,) = p.events
+        assert event["phase"] == "work"
+        assert event["member"] == 3
+        assert event["size"] == 5
+        assert event["duration"] >= 0.01
+
+    def test_sinks(self, tmp_path, caplog):
+        fn = tmp_path / "events.jsonl"
+        p = Profiler(sinks=[JSONLinesSink(fn), LoggingSink()], keep_events=False)
+        with caplog.at_level(logging.INFO, logger="ravenpy.profiling"):
+            p.record("a", duration=1.0)
+            p.record("b", duration=2.0)
+
+        assert p.events == []
+        lines = [json.loads(line) for line in fn.read_text().splitlines()]
+        assert [e["phase"] for e in lines] == ["a", "b"]
+        assert len(caplog.records) == 2
@@ -1,10 +1,17 @@
 import datetime as dt
 import re
+from dataclasses import asdict
 
+import numpy as np
 import pytest
 
-from ravenpy.config.commands import EvaluationPeriod, GriddedForcingCommand
-from ravenpy.config.rvs import OST, RVC, RVH, RVI, RVP, RVT, Config
+from ravenpy.config.commands import (
+    EvaluationPeriod,
+    GriddedForcingCommand,
+    HRUTable,
+    SubBasinTable,
+)
+from ravenpy.config.rvs import OST, RVC, RVH, RVI, RVP, RVT, Config, EnsembleState
 from ravenpy.extractors import (
     RoutingProductGridWeightExtractor,
     RoutingProductShapefileExtractor,
@@ -75,6 +82,17 @@ class TestRVI:
         rvi.suppress_output = False
         assert rvi.suppress_output == ""
 
+    def test_write_watershed_storage(self):
+        rvi = RVI(None)
+        assert rvi.write_watershed_storage == ""
+
+        rvi.write_watershed_storage = False
+        assert rvi.write_watershed_storage == ":DontWriteWatershedStorage\n"
+
+        # Included in the :SuppressOutput tag
+        rvi.suppress_output = True
+        assert rvi.write_watershed_storage == ""
+
 
 class TestRVC:
     @pytest.fixture(autouse=True)
@@ -96,6 +114,77 @@ class TestRVC:
         assert ":BasinIndex 1 watershed" in rv
 
 
+class TestEnsembleState:
+    solution = """
+:HRUStateVariableTable
+  :Attributes,SOIL[0],SOIL[1],
+  :Units,mm,mm,
+  1,{s0:.5f},1.00000,
+  2,2.00000,3.00000,
+:EndHRUStateVariableTable
+:BasinStateVariables
+  :BasinIndex 1,sub_001
+    :ChannelStorage, 0.00000
+    :RivuletStorage, {r:.5f}
+    :Qout,1,11.34678,11.39291
+    :Qlat,1,0.50000,0.60000
+:EndBasinStateVariables
+"""
+
+    def test_from_solutions(self):
+        state = EnsembleState.from_solutions(
+            [self.solution.format(s0=i, r=10 * i) for i in range(3)]
+        )
+        assert len(state) == 3
+        np.testing.assert_array_equal(state.hru_index, [1, 2])
+        assert state.hru_names == ["SOIL[0]", "SOIL[1]"]
+        assert state.hru_values.shape == (3, 2, 2)
+        np.testing.assert_array_equal(state.hru_values[:, 0, 0], [0, 1, 2])
+
+        assert state.basin_names == ["sub_001"]
+        assert state.basin_fields == [
+            "channel_storage",
+            "rivulet_storage",
+            "qout[0]",
+            "qout[1]",
+            "qlat[0]",
+            "qlat[1]",
+        ]
+        np.testing.assert_array_equal(state.basin_values[:, 0, 1], [0, 10, 20])
+        np.testing.assert_array_equal(state.basin_values[:, 0, 2], 11.34678)
+        assert state.basin_counts.dtype.kind == "i"
+        np.testing.assert_array_equal(state.basin_counts[:, 0], [[1, -1, 1]] * 3)
+
+    def test_to_rvc(self):
+        state = EnsembleState.from_solutions([self.solution.format(s0=0, r=0)] * 2)
+        state.hru_values[1, 1, 0] = 5
+        # Perturbing all basin values leaves the segment counts unchanged
+        state.basin_values[1] *= 2
+
+        rvc = state.to_rvc(1)
+        assert rvc.hru_states[2].data["SOIL[0]"] == 5
+        assert rvc.basin_states[1].qout == (1, 2 * 11.34678, 2 * 11.39291)
+        assert rvc.basin_states[1].qlat == (1, 1.0, 1.2)
+        assert rvc.basin_states[1].qin is None
+        assert ":Qout 1 " in state.to_rv(1)
+
+        # Round trip through the RVC text
+        other = EnsembleState.from_solutions([state.to_rv(0), state.to_rv(1)])
+        np.testing.assert_array_equal(other.hru_values, state.hru_values)
+        np.testing.assert_array_equal(other.basin_values, state.basin_values)
+
+    def test_members(self):
+        state = EnsembleState.from_solutions([self.solution.format(s0=0, r=0)] * 4)
+        assert len(state[1]) == 1
+        assert len(state[1:3]) == 2
+
+        rvc = RVC(None)
+        rvc.set_hru_state(state[2])
+        rvc.set_basin_state(state[2])
+        assert len(rvc.hru_states) == 2
+        assert rvc.basin_states[1].name == "sub_001"
+
+
 class TestRVH:
     @pytest.fixture(autouse=True)
     def setup(self, get_file):
@@ -137,6 +226,21 @@ class TestRVH:
 
         assert res.count(":Reservoir") == len(self.rvh.reservoirs)
 
+    def test_table(self):
+        import pandas as pd
+
+        res = self.rvh.to_rv()
+
+        hrus = pd.DataFrame([asdict(hru) for hru in self.rvh.hrus])
+        self.rvh.hrus = hrus
+        self.rvh.subbasins = pd.DataFrame([asdict(sb) for sb in self.rvh.subbasins])
+        assert isinstance(self.rvh.hrus, HRUTable)
+        assert isinstance(self.rvh.subbasins, SubBasinTable)
+        assert len(self.rvh.hrus) == 51
+        assert self.rvh.hrus[0].hru_id == hrus.hru_id[0]
+
+        assert self.rvh.to_rv() == res
+
 
 class TestRVP:
     @pytest.fixture(autouse=True)
@@ -0,0 +1,324 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from ravenpy.models.scheduler import (
+    RavenProcess,
+    RetryPolicy,
+    WorkerPool,
+    _communicate_wait4,
+    parse_raven_messages,
+)
+
+# Record the start and end times of the process in a file named after its index.
+script = """
+import sys, time
+t0 = time.time()
+time.sleep(0.2)
+open(sys.argv[1], "w").write(f"{t0} {time.time()}")
+"""
+
+
+def max_overlap(intervals):
+    events = sorted([(s, 1) for s, e in intervals] + [(e, -1) for s, e in intervals])
+    n = m = 0
+    for _, inc in events:
+        n += inc
+        m = max(m, n)
+    return m
+
+
+class TestWorkerPool:
+    def test_bounded(self, tmp_path):
+        procs = [
+            RavenProcess(
+                index=i, cmd=[sys.executable, "-c", script, f"{i}.txt"], cwd=tmp_path
+            )
+            for i in range(6)
+        ]
+        out = WorkerPool(max_workers=2).run(procs)
+
+        assert [p.index for p in out] == list(range(6))
+        assert all(p.returncode == 0 for p in out)
+
+        intervals = [
+            tuple(map(float, (tmp_path / f"{i}.txt").read_text().split()))
+            for i in range(6)
+        ]
+        assert max_overlap(intervals) <= 2
+
+    def test_exit_status_and_messages(self, tmp_path):
+        for i in range(2):
+            (tmp_path / f"p{i}").mkdir()
+        (tmp_path / "p1" / "Raven_errors.txt").write_text(
+            "WARNING : Something odd\nERROR : Something bad\n"
+        )
+
+        procs = [
+            RavenProcess(
+                index=i,
+                cmd=[sys.executable, "-c", f"raise SystemExit({i})"],
+                cwd=tmp_path / f"p{i}",
+            )
+            for i in range(2)
+        ]
+        p0, p1 = WorkerPool().run(procs)
+
+        assert p0.returncode == 0
+        assert p0.messages["ERROR"] == []
+        assert p1.returncode == 1
+        assert p1.messages["ERROR"] == ["Something bad"]
+        assert p1.messages["WARNING"] == ["Something odd"]
+
+    def test_arun(self, tmp_path):
+        procs = [
+            RavenProcess(
+                index=i, cmd=[sys.executable, "-c", script, f"{i}.txt"], cwd=tmp_path
+            )
+            for i in range(4)
+        ]
+        out = asyncio.run(WorkerPool(max_workers=2).arun(procs, timeout=30))
+
+        assert all(p.returncode == 0 for p in out)
+        intervals = [
+            tuple(map(float, (tmp_path / f"{i}.txt").read_text().split()))
+            for i in range(4)
+        ]
+        assert max_overlap(intervals) <= 2
+
+    def test_arun_timeout(self, tmp_path):
+        procs = [
+            RavenProcess(
+                index=i,
+                cmd=[sys.executable, "-c", f"import time; time.sleep({30 * i})"],
+                cwd=tmp_path,
+            )
+            for i in range(3)
+        ]
+        t0 = time.perf_counter()
+        asyncio.run(WorkerPool(max_workers=2).arun(procs, timeout=0.5))
+        assert time.perf_counter() - t0 < 10
+
+        # Processes exceeding the timeout are killed without interrupting the others.
+        assert [p.status for p in procs] == ["completed", "timeout", "timeout"]
+        assert procs[0].returncode == 0
+        assert procs[1].returncode < 0
+
+    def test_arun_cancel(self, tmp_path):
+        procs = [
+            RavenProcess(
+                index=i,
+                cmd=[sys.executable, "-c", "import time; time.sleep(30)"],
+                cwd=tmp_path,
+            )
+            for i in range(3)
+        ]
+
+        async def main():
+            task = asyncio.ensure_future(WorkerPool(max_workers=2).arun(procs))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(main())
+
+        # Running processes are killed, and queued ones are never started.
+        assert all(p.returncode is None for p in procs)
+        assert [p.attempts for p in procs] == [1, 1, 0]
+
+    def test_timeout(self, tmp_path):
+        procs = [
+            RavenProcess(
+                index=i,
+                cmd=[sys.executable, "-c", f"import time; time.sleep({30 * i})"],
+                cwd=tmp_path,
+            )
+            for i in range(2)
+        ]
+        t0 = time.perf_counter()
+        p0, p1 = WorkerPool(timeout=0.5).run(procs)
+        assert time.perf_counter() - t0 < 10
+
+        assert p0.returncode == 0
+        assert p1.status == "timeout"
+        assert p1.failed
+        assert p1.reason.startswith("Timed out")
+
+    def test_timeout_at_exit(self, tmp_path):
+        # The time limit is reached as the process exits: the status should match its exit status
+        for _ in range(10):
+            proc = RavenProcess(
+                index=0, cmd=[sys.executable, "-c", "pass"], cwd=tmp_path
+            )
+            duration = proc.run().duration
+            proc.reset()
+            proc.run(timeout=duration)
+            assert proc.status in ("completed", "timeout")
+            assert (proc.status == "timeout") == (proc.returncode < 0)
+
+    def test_timeout_closed_output(self, tmp_path):
+        # The process is killed while waiting for it to exit, once its output is closed
+        code = "import os, time; os.close(1); time.sleep(30)"
+        proc = RavenProcess(index=0, cmd=[sys.executable, "-c", code], cwd=tmp_path)
+        proc.run(timeout=0.5)
+        assert proc.status == "timeout"
+        assert proc.duration < 10
+
+    @pytest.mark.skipif(not hasattr(os, "waitid"), reason="Requires os.waitid")
+    def test_kill_exited(self, tmp_path):
+        proc = RavenProcess(index=0, cmd=[sys.executable, "-c", "pass"], cwd=tmp_path)
+        popen = proc._popen = proc.launch()
+        # Wait for the process to exit without reaping it
+        os.waitid(os.P_PID, popen.pid, os.WEXITED | os.WNOWAIT)
+
+        proc.kill("timeout")
+        proc.stdout, proc.returncode, _ = _communicate_wait4(popen, "\n", proc._lock)
+        proc._popen = None
+        proc._finish()
+        assert proc.returncode == 0
+        assert proc.status == "completed"
+
+        # Reaped processes are not signalled
+        proc.kill("timeout")
+        proc._finish()
+        assert proc.status == "completed"
+
+    def test_retry(self, tmp_path):
+        # Killed by a signal on the first attempt only
+        code = (
+            "import os, signal\n"
+            "if not os.path.exists('done'):\n"
+            "    open('done', 'w').close()\n"
+            "    os.kill(os.getpid(), signal.SIGTERM)\n"
+        )
+        proc = RavenProcess(index=0, cmd=[sys.executable, "-c", code], cwd=tmp_path)
+        WorkerPool(retry=RetryPolicy(attempts=3, delay=0.01)).run([proc])
+        assert proc.returncode == 0
+        assert proc.attempts == 2
+
+        # Errors are not retried by default
+        proc = RavenProcess(
+            index=0,
+            cmd=[sys.executable, "-c", "raise SystemExit(1)"],
+            cwd=tmp_path,
+            strict=True,
+        )
+        WorkerPool(retry=RetryPolicy(attempts=3)).run([proc])
+        assert proc.status == "failed"
+        assert proc.attempts == 1
+
+        proc = RavenProcess(
+            index=0,
+            cmd=[sys.executable, "-c", "raise SystemExit(1)"],
+            cwd=tmp_path,
+            strict=True,
+        )
+        WorkerPool(retry=RetryPolicy(attempts=3, retry_on=lambda p: True)).run([proc])
+        assert proc.attempts == 3
+
+    def test_cancel(self, tmp_path):
+        procs = [
+            RavenProcess(
+                index=i,
+                cmd=[sys.executable, "-c", "import time; time.sleep(30)"],
+                cwd=tmp_path,
+            )
+            for i in range(3)
+        ]
+        pool = WorkerPool(max_workers=2)
+        threading.Timer(0.5, pool.cancel).start()
+        t0 = time.perf_counter()
+        pool.run(procs)
+        assert time.perf_counter() - t0 < 10
+
+        assert [p.status for p in procs] == ["cancelled"] * 3
+        assert [p.attempts for p in procs] == [1, 1, 0]
+
+    def test_fail_fast(self, tmp_path):
+        procs = [
+            RavenProcess(
+                index=i,
+                cmd=[sys.executable, "-c", code],
+                cwd=tmp_path,
+                strict=True,
+            )
+            for i, code in enumerate(
+                ["raise SystemExit(1)", "import time; time.sleep(30)"]
+            )
+        ]
+        t0 = time.perf_counter()
+        WorkerPool(max_workers=2, fail_fast=True).run(procs)
+        assert time.perf_counter() - t0 < 10
+        assert [p.status for p in procs] == ["failed", "cancelled"]
+
+    @pytest.mark.skipif(not hasattr(os, "wait4"), reason="Requires os.wait4")
+    def test_resource_usage(self, tmp_path):
+        code = (
+            "open('output/out.txt', 'w').write('x' * 1000); b = bytearray(50 * 2**20)"
+        )
+        (tmp_path / "output").mkdir()
+        proc = RavenProcess(
+            index=0,
+            cmd=[sys.executable, "-c", code],
+            cwd=tmp_path,
+            output_path=tmp_path / "output",
+        ).run()
+
+        assert proc.returncode == 0
+        assert proc.rusage["max_rss"] > 50 * 2**20
+        assert proc.rusage["user_time"] + proc.rusage["system_time"] > 0
+        assert proc.bytes_written == 1000
+        assert proc.duration > 0
+
+    def test_signal(self, tmp_path):
+        code = "import os, signal; os.kill(os.getpid(), signal.SIGTERM)"
+        proc = RavenProcess(index=0, cmd=[sys.executable, "-c", code], cwd=tmp_path)
+        assert proc.run().returncode == -15
+        assert proc.status == "failed"
+        assert proc.reason == "Killed by signal 15"
+
+    def test_strict(self, tmp_path):
+        (tmp_path / "p0").mkdir()
+        (tmp_path / "p0" / "Raven_errors.txt").write_text("SIMULATION COMPLETE :)\n")
+        (tmp_path / "p1").mkdir()
+
+        def run(i, code, strict):
+            return RavenProcess(
+                index=0,
+                cmd=[sys.executable, "-c", code],
+                cwd=tmp_path / f"p{i}",
+                strict=strict,
+            ).run()
+
+        # Only errors, signals and timeouts are failures by default
+        assert run(0, "raise SystemExit(1)", False).status == "completed"
+        assert run(1, "pass", False).status == "completed"
+
+        proc = run(0, "raise SystemExit(1)", True)
+        assert proc.status == "failed"
+        assert proc.reason == "Exited with status 1"
+        proc = run(1, "pass", True)
+        assert proc.status == "failed"
+        assert proc.reason == "Simulation did not complete"
+        assert run(0, "pass", True).status == "completed"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            WorkerPool(max_workers=0)
+
+
+def test_parse_raven_messages(tmp_path):
+    fn = tmp_path / "Raven_errors.txt"
+    fn.write_text(
+        "ERROR : Unrecognized command in .rvh file:\n   :Subbasins\n"
+        "ERROR : Errors found in input data. See Raven_errors.txt for details\n"
+        "SIMULATION COMPLETE :)\n"
+    )
+    m = parse_raven_messages([fn])
+    assert m["ERROR"] == ["Unrecognized command in .rvh file: :Subbasins"]
+    assert m["SIMULATION COMPLETE"]
@@ -1,9 +1,13 @@
 import datetime as dt
+import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import spotpy
 
 from ravenpy.models import GR4JCN
+from ravenpy.models.evaluations import EvaluationStore
 from ravenpy.utilities.calibration import SpotpySetup
 
 salmon_river = "raven-gr4j-cemaneige/Salmon-River-Near-Prince-George_meteo_daily.nc"
@@ -56,3 +60,99 @@ class TestGR4JCNSpotpy:
         model(ts)
         objfun = model.diagnostics["DIAG_NASH_SUTCLIFFE"][0]
         print(objfun)
+
+    def test_parallel(self, get_file):
+        model = GR4JCN()
+        ts = get_file(salmon_river)
+        model.config.rvh.hrus = (
+            GR4JCN.LandHRU(
+                area=4250.6, elevation=843.0, latitude=54.4848, longitude=-123.3659
+            ),
+        )
+        model.low = (0.01, -15.0, 10.0, 0.0, 1.0, 0.0)
+        model.high = (2.5, 10.0, 700.0, 7.0, 30.0, 1.0)
+        model.config.rvi.start_date = dt.datetime(2000, 1, 1)
+        model.config.rvi.end_date = dt.datetime(2002, 1, 1)
+
+        spot_setup = SpotpySetup(model=model, ts=ts)
+        xs = [
+            np.array(model.low) + (np.array(model.high) - model.low) * f
+            for f in np.linspace(0.1, 0.9, 4)
+        ]
+        serial = [spot_setup.simulation(x)[0] for x in xs]
+
+        # The settings of the simulations are not kept on the model
+        assert model.errors == "raise"
+        assert model.config.rvi.suppress_output == ""
+
+        # Each thread runs a clone of the model in its own directory
+        with ThreadPoolExecutor(2) as ex:
+            threaded = [
+                spot_setup.objectivefunction(None, sim)
+                for sim in ex.map(spot_setup.simulation, xs)
+            ]
+        np.testing.assert_allclose(threaded, serial)
+        assert 1 <= len(list((model.workdir / "workers").iterdir())) <= 2
+
+        # Clones are not shared with other setups
+        other = SpotpySetup(model=model, ts=ts)
+        with ThreadPoolExecutor(1) as ex:
+            assert ex.submit(other.worker_model).result() is not model
+        assert len(list((model.workdir / "workers").iterdir())) <= 3
+
+        # Clones and their directories are removed when the setups are closed
+        spot_setup.close()
+        del other
+        assert not (model.workdir / "workers").exists()
+
+        # Copies sent to worker processes create their own clones
+        copy = pickle.loads(pickle.dumps(spot_setup))
+        assert copy._clones == []
+        with ThreadPoolExecutor(1) as ex:
+            np.testing.assert_allclose(
+                ex.submit(copy.simulation, xs[0]).result(), serial[:1]
+            )
+        copy.close()
+
+        with SpotpySetup(model=model, ts=ts) as setup:
+            with ThreadPoolExecutor(1) as ex:
+                ex.submit(setup.simulation, xs[0]).result()
+            assert (model.workdir / "workers").exists()
+        assert not (model.workdir / "workers").exists()
+
+        clone = model.clone()
+        assert clone.workdir != model.workdir
+        assert clone.config is not model.config
+        assert clone.config.rvh.hrus == model.config.rvh.hrus
+
+    def test_resume(self, get_file, tmp_path):
+        ts = get_file(salmon_river)
+
+        def run(rep):
+            model = GR4JCN()
+            model.config.rvh.hrus = (
+                GR4JCN.LandHRU(
+                    area=4250.6, elevation=843.0, latitude=54.4848, longitude=-123.3659
+                ),
+            )
+            model.low = (0.01, -15.0, 10.0, 0.0, 1.0, 0.0)
+            model.high = (2.5, 10.0, 700.0, 7.0, 30.0, 1.0)
+            model.config.rvi.start_date = dt.datetime(2000, 1, 1)
+            model.config.rvi.end_date = dt.datetime(2002, 1, 1)
+
+            store = EvaluationStore(tmp_path / "evaluations.jsonl")
+            spot_setup = SpotpySetup(model=model, ts=ts, store=store)
+            sampler = spotpy.algorithms.dds(
+                spot_setup, dbformat="ram", save_sim=False, random_state=42
+            )
+            sampler.sample(rep, trials=1)
+            assert model.store is None
+            return store, sampler.getdata()
+
+        store, first = run(10)
+        assert (store.hits, store.misses) == (0, 10)
+
+        # Running the seeded sampler again only evaluates new parameter sets
+        store, again = run(10)
+        assert (store.hits, store.misses) == (10, 0)
+        np.testing.assert_array_equal(again["like1"], first["like1"])
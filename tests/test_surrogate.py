@@ -0,0 +1,154 @@
+import datetime as dt
+from dataclasses import astuple, dataclass
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ravenpy.models import GR4JCN, RavenError
+from ravenpy.utilities import surrogate
+
+salmon_river = "raven-gr4j-cemaneige/Salmon-River-Near-Prince-George_meteo_daily.nc"
+salmon_land_hru_1 = dict(
+    area=4250.6, elevation=843.0, latitude=54.4848, longitude=-123.3659
+)
+
+
+class Sphere:
+    """Model with an analytic objective function, maximal at `optimum`."""
+
+    @dataclass
+    class Params:
+        X1: float
+        X2: float
+        X3: float
+
+    optimum = np.array([0.3, -2.0, 40.0])
+    low = (0.0, -5.0, 0.0)
+    high = (1.0, 5.0, 100.0)
+    max_workers = 4
+
+    def __init__(self, fail=None):
+        self.config = SimpleNamespace()
+        self.calls = []
+        self.fail = fail
+        self.errors = "raise"
+
+    def evaluate(self, ts, params, diagnostic=None, obj_func=None, **kwds):
+        self.calls.append(len(params))
+        scale = np.subtract(Sphere.high, Sphere.low)
+        y = -(((params - self.optimum) / scale) ** 2).sum(axis=1)
+        if self.fail is not None:
+            failed = self.fail(params)
+            # Like `Raven.evaluate`, failures only give a NaN objective function with errors="warn"
+            if np.any(failed) and self.errors == "raise":
+                raise RavenError("Simulation failed.")
+            y[failed] = np.nan
+        return y
+
+
+class TestCalibrate:
+    def test_sphere(self):
+        model = Sphere()
+        out = surrogate.calibrate(model, None, max_evaluations=60, seed=0)
+
+        assert isinstance(out.params, Sphere.Params)
+        assert out.n_evaluations == 60
+        assert out.x.shape == (60, 3)
+        assert sum(model.calls) == 60
+        # Initial design, then batches of `max_workers` candidates
+        assert model.calls[:2] == [8, 4]
+        assert np.all(out.x >= model.low) and np.all(out.x <= model.high)
+        assert out.objective == np.nanmax(out.y)
+        assert out.objective > -1e-3
+        np.testing.assert_allclose(
+            [out.params.X1, out.params.X2, out.params.X3], model.optimum, rtol=0.1
+        )
+
+        # Same seed, same result
+        again = surrogate.calibrate(Sphere(), None, max_evaluations=60, seed=0)
+        np.testing.assert_array_equal(again.x, out.x)
+
+    def test_minimize(self):
+        model = Sphere()
+        model.evaluate = lambda *args, **kwds: -Sphere.evaluate(model, *args, **kwds)
+        out = surrogate.calibrate(
+            model, None, max_evaluations=40, batch_size=2, maximize=False, seed=1
+        )
+        assert out.objective == np.nanmin(out.y)
+        assert out.objective < 0.01
+
+    def test_failures(self):
+        model = Sphere(fail=lambda p: p[:, 0] > 0.8)
+        out = surrogate.calibrate(model, None, max_evaluations=40, seed=2)
+        assert np.isnan(out.y).any()
+        assert np.isfinite(out.objective)
+        assert model.errors == "raise"
+
+        # A single failed candidate does not stop the search
+        model = Sphere(fail=lambda p: np.arange(len(p)) == 0)
+        out = surrogate.calibrate(model, None, max_evaluations=12, seed=0)
+        assert out.n_evaluations == 12
+        assert np.isnan(out.y[[0, 8]]).all()
+        assert np.isfinite(out.objective)
+
+        # All simulations failed, including when there is only the initial design
+        for n in [8, 16]:
+            model = Sphere(fail=lambda p: np.ones(len(p), bool))
+            with pytest.raises(ValueError, match="could not be evaluated"):
+                surrogate.calibrate(model, None, max_evaluations=n, seed=0)
+            assert model.errors == "raise"
+
+    def test_bounds(self):
+        model = Sphere()
+        out = surrogate.calibrate(
+            model,
+            None,
+            max_evaluations=10,
+            low=Sphere.Params(0.2, -3, 30),
+            high=Sphere.Params(0.4, -1, 50),
+            seed=0,
+        )
+        assert np.all(out.x >= (0.2, -3, 30)) and np.all(out.x <= (0.4, -1, 50))
+
+        # Ostrich bounds
+        model = Sphere()
+        model.low = model.high = None
+        model.config.ost = SimpleNamespace(
+            lowerBounds=Sphere.Params(0, 0, 0), upperBounds=Sphere.Params(1, 1, 1)
+        )
+        assert surrogate.calibrate(model, None, max_evaluations=8).n_evaluations == 8
+
+        with pytest.raises(ValueError):
+            surrogate.calibrate(Sphere(), None, low=(0, 0), high=(1, 1))
+
+        with pytest.raises(ValueError):
+            surrogate.calibrate(Sphere(), None, low=(1, 0, 0), high=(0, 1, 1))
+
+
+class TestGR4JCN:
+    def test_calibrate(self, get_file):
+        ts = get_file(salmon_river)
+        model = GR4JCN(max_workers=2)
+        kwds = dict(
+            start_date=dt.datetime(2000, 1, 1),
+            end_date=dt.datetime(2001, 1, 1),
+            hrus=(GR4JCN.LandHRU(**salmon_land_hru_1),),
+        )
+        low = GR4JCN.Params(0.4, -4.0, 300.0, 1.0, 15.0, 0.9)
+        high = GR4JCN.Params(0.6, -3.0, 500.0, 1.2, 20.0, 1.0)
+
+        out = surrogate.calibrate(
+            model, ts, max_evaluations=16, low=low, high=high, seed=0, **kwds
+        )
+        assert isinstance(out.params, GR4JCN.Params)
+        assert out.n_evaluations == 16
+        assert np.all(np.isfinite(out.y))
+        assert np.all(out.x >= astuple(low)) and np.all(out.x <= astuple(high))
+
+        # The best objective is the Nash-Sutcliffe efficiency of a run of the best parameters
+        model.config.rvc.reset()
+        model(ts, params=out.params, overwrite=True, **kwds)
+        np.testing.assert_almost_equal(
+            out.objective, model.diagnostics["DIAG_NASH_SUTCLIFFE"][0]
+        )